@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""合成 DXF 规模基准：python benchmark.py --sizes 10 100 1000 --save-baseline"""
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
+
+if __name__ == "__main__":
+    from src.benchmark import main
+    sys.exit(main())
@@ -0,0 +1,161 @@
+import numpy as np
+import shapely
+
+from . import profiling
+from .collision import candidate_pairs, overlapping_pairs
+
+FITNESS_MODES = ('binary', 'penalty')
+
+
+def penalty_score(total_area, used_area, overlap_area, outside_area, weight):
+    """罚函数适应度：材料利用率按重叠面积与越界面积的比例衰减
+
+    合法排样的得分等于材料利用率，与 binary 模式一致；不合法排样仍有连续的梯度。
+    """
+    used_area = np.asarray(used_area, dtype=np.float64)
+    utilization = total_area / np.where(used_area > 0, used_area, np.inf)
+    violation = (np.asarray(overlap_area) + np.asarray(outside_area)) / total_area
+    return utilization / (1.0 + weight * violation)
+
+
+def _pair_groups(sheet_idx):
+    """(pop, parts) 的板材号转换为“个体+板材”的分组编号"""
+    span = sheet_idx.max() - sheet_idx.min() + 1
+    return (np.arange(len(sheet_idx))[:, np.newaxis] * span
+            + (sheet_idx - sheet_idx.min())).ravel()
+
+
+class BatchFitnessEvaluator:
+    """批量适应度计算：整个种群以 (pop, parts, 4) 数组一次性评估"""
+
+    def __init__(self, parts, sheet_set, chunk_size=64, geometry_cache=None, mode='binary',
+                 penalty_weight=10.0):
+        if mode not in FITNESS_MODES:
+            raise ValueError(f"Unknown fitness mode: {mode}")
+        self.parts = np.empty(len(parts), dtype=object)
+        self.parts[:] = list(parts)
+        self.n_parts = len(self.parts)
+        self.sheet_set = sheet_set
+        # 提供几何缓存时，旋转结果直接取自缓存，只需做平移
+        self.geometry_cache = geometry_cache
+        self.chunk_size = max(1, int(chunk_size))
+        self.mode = mode
+        self.penalty_weight = penalty_weight
+
+        # 与 rotate(..., origin='centroid') 一致，绕各零件自身质心旋转
+        self.centroids = shapely.get_coordinates(shapely.centroid(self.parts))
+        self.vertex_counts = shapely.get_num_coordinates(self.parts)
+        self.total_area = float(shapely.area(self.parts).sum())
+
+    def as_population_array(self, population):
+        """将种群（列表或数组）转换为 (pop, parts, 4) 的 float64 数组"""
+        arr = np.asarray(population, dtype=np.float64)
+        if arr.ndim == 2:
+            arr = arr[np.newaxis]
+        if arr.ndim != 3 or arr.shape[1:] != (self.n_parts, 4):
+            raise ValueError(f"Invalid population shape: {arr.shape}")
+        return arr
+
+    def transform(self, population):
+        """对种群中每个个体的所有零件做旋转+平移，返回 (pop, parts) 的几何数组"""
+        population = self.as_population_array(population)
+        pop = population.shape[0]
+        idx = np.tile(np.arange(self.n_parts), pop)
+        return self.place(idx, population.reshape(-1, 4)).reshape(pop, self.n_parts)
+
+    def place(self, idx, genes):
+        """零件 idx[k] 按 genes[k] 的 (x, y, angle) 旋转+平移，返回一维几何数组
+
+        增量评估只变换变化的零件时也走这里，与整体评估得到完全相同的几何体。
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        genes = np.asarray(genes, dtype=np.float64).reshape(-1, 4)
+        angles = genes[:, 2]
+        xoff = genes[:, 0] + self.centroids[idx, 0]
+        yoff = genes[:, 1] + self.centroids[idx, 1]
+        if self.geometry_cache is not None:
+            rotated = self.geometry_cache.polygons(angles, idx)
+            if rotated is not None:
+                # 缓存中的旋转形状质心位于原点，只需平移
+                geom_index = np.repeat(np.arange(len(idx)), shapely.get_num_coordinates(rotated))
+                profiling.count('vertices', len(geom_index))
+
+                def _translate(coords):
+                    return np.column_stack((coords[:, 0] + xoff[geom_index],
+                                            coords[:, 1] + yoff[geom_index]))
+
+                return shapely.transform(rotated, _translate)
+            # 重复的 (形状, 角度) 太少，缓存帮不上忙：按量化后的角度直接旋转
+            angles = self.geometry_cache.quantize_many(angles, idx)
+
+        theta = np.radians(angles)
+        cos_a = np.cos(theta)
+        sin_a = np.sin(theta)
+        cx = self.centroids[idx, 0]
+        cy = self.centroids[idx, 1]
+        # 每个坐标点所属的几何体序号，用于按几何体取对应的仿射矩阵
+        geom_index = np.repeat(np.arange(len(idx)), self.vertex_counts[idx])
+        profiling.count('vertices', len(geom_index))
+
+        def _affine(coords):
+            c = cos_a[geom_index]
+            s = sin_a[geom_index]
+            dx = coords[:, 0] - cx[geom_index]
+            dy = coords[:, 1] - cy[geom_index]
+            return np.column_stack((c * dx - s * dy + xoff[geom_index],
+                                    s * dx + c * dy + yoff[geom_index]))
+
+        return shapely.transform(self.parts[idx], _affine)
+
+    def evaluate(self, population):
+        """返回每个个体的适应度（材料利用率），重叠或越界的个体为 0.0"""
+        population = self.as_population_array(population)
+        scores = np.zeros(population.shape[0], dtype=np.float64)
+        for start in range(0, population.shape[0], self.chunk_size):
+            chunk = population[start:start + self.chunk_size]
+            scores[start:start + len(chunk)] = self._evaluate_chunk(chunk)
+        return scores
+
+    def _evaluate_chunk(self, population):
+        placed = self.transform(population)
+        sheet_idx = population[..., 3].astype(np.int64)
+
+        bounds = shapely.bounds(placed)
+        inside = self.sheet_set.contains(placed, sheet_idx, bounds)
+        used_area = self.sheet_set.used_area(sheet_idx)
+        if self.mode == 'penalty':
+            return self._penalty_chunk(placed, sheet_idx, bounds, inside, used_area)
+
+        # 所有零件都必须在各自的板材内
+        valid = inside.all(axis=1)
+
+        # 同一板材上的零件：先用包围盒粗检测，再对候选对做精确相交检测
+        if self.n_parts > 1 and valid.any():
+            rows = np.nonzero(valid)[0]
+            flat = placed[rows].ravel()
+            left, _ = overlapping_pairs(flat, _pair_groups(sheet_idx[rows]))
+            overlapped = np.bincount(left // self.n_parts, minlength=len(rows)) > 0
+            valid[rows[overlapped]] = False
+
+        scores = self.total_area / np.where(used_area > 0, used_area, np.inf)
+        return np.where(valid, scores, 0.0)
+
+    def _penalty_chunk(self, placed, sheet_idx, bounds, inside, used_area):
+        pop = len(placed)
+        # 越界面积：只对包围盒检测未通过的零件求交
+        outside = np.zeros(pop)
+        rows, cols = np.nonzero(~inside)
+        if len(rows):
+            np.add.at(outside, rows,
+                      self.sheet_set.outside_area(placed[rows, cols], sheet_idx[rows, cols]))
+
+        # 重叠面积：对粗检测得到的候选对批量求交并求面积
+        overlap = np.zeros(pop)
+        if self.n_parts > 1:
+            left, right = candidate_pairs(bounds.reshape(-1, 4), _pair_groups(sheet_idx))
+            if len(left):
+                flat = placed.ravel()
+                areas = shapely.area(shapely.intersection(flat[left], flat[right]))
+                np.add.at(overlap, left // self.n_parts, areas)
+
+        return penalty_score(self.total_area, used_area, overlap, outside, self.penalty_weight)
@@ -0,0 +1,186 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+
+from .inventory import SheetInventory
+from .pipeline import run_pipeline
+from .profiling import PipelineProfiler
+from .synthetic import generate_dxf
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+
+# 旋转自由度：零件按该策略写入图层名，排样引擎的候选角度与之对应
+ROTATIONS = {
+    'free': (0, 90, 180, 270),
+    'fixed': (0,),
+    'flip': (0, 180),
+    'ortho': (0, 90, 180, 270),
+}
+
+# 低于该耗时（秒）的阶段计时噪声太大，不参与回归判断
+MIN_COMPARABLE_TIME = 0.05
+
+# 超过 LARGE_JOB_PARTS 个零件时使用较小的引擎预算：压实每一遍都要对所有零件做碰撞试探，
+# 10000 个零件时默认的 3 遍约需 90 秒，1 遍约 26 秒且用板数相同
+LARGE_JOB_PARTS = 2000
+LARGE_JOB_OPTIONS = {
+    'compact': {'passes': 1},
+    'anneal': {'iterations': 200},
+    'ga': {'population_size': 20, 'generations': 10},
+}
+
+
+def engine_options(engine, n_parts, full_budget=False):
+    """该规模下传给引擎的参数；full_budget=True 时一律使用引擎默认预算"""
+    if full_budget or n_parts <= LARGE_JOB_PARTS:
+        return {}
+    return dict(LARGE_JOB_OPTIONS.get(engine, {}))
+
+
+def run_case(n_parts, workdir, vertices=4, holes=0, rotation='ortho', engine='compact',
+             seed=0, trace_memory=True, full_budget=False):
+    """生成一个 n_parts 个零件的合成任务并跑完整条流水线，返回各阶段的耗时、吞吐量与峰值内存"""
+    options = engine_options(engine, n_parts, full_budget)
+    dxf_path = generate_dxf(os.path.join(workdir, f"synthetic-{n_parts}.dxf"), n_parts,
+                            vertices=vertices, holes=holes, seed=seed, rotation=rotation)
+    profiler = PipelineProfiler(job=os.path.basename(dxf_path), trace_memory=trace_memory)
+    # 标准板数量足够多，基准只衡量速度与利用率，不受库存限制
+    inventory = SheetInventory.default(2440, 1220, quantity=max(10, n_parts))
+    with contextlib.redirect_stdout(io.StringIO()):
+        optimizer, _, _ = run_pipeline(dxf_path, inventory=inventory, profiler=profiler,
+                                       gcode_path=os.path.join(workdir, 'output.nc'),
+                                       output_dir=workdir, manifest_dir=None, engine=engine,
+                                       rotations=ROTATIONS[rotation], seed=seed, **options)
+    stages = {}
+    for stage in profiler.stages:
+        wall = stage['wall_time']
+        stages[stage['name']] = {
+            'time': wall,
+            'throughput': n_parts / wall if wall > 0 else None,
+            'peak_memory': stage.get('peak_memory'),
+            'counters': stage['counters'],
+        }
+    used_area = sum(sheet.area for sheet in optimizer.used_sheets())
+    return {
+        'parts': n_parts,
+        'engine_options': options,
+        'stages': stages,
+        'total_time': sum(s['time'] for s in stages.values()),
+        'sheets_used': len(optimizer.sheets),
+        'utilization': float(sum(p.area for p in optimizer.parts) / used_area) if used_area else 0.0,
+    }
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, vertices=4, holes=0, rotation='ortho', engine='compact',
+                  seed=0, trace_memory=True, workdir=None, progress=None, full_budget=False):
+    """依次运行各规模的合成任务，返回可保存为基线的结果字典
+
+    compact 引擎、4 边形零件时 10000 个零件一轮约 30 秒（排样约 26 秒）；tracemalloc 会使
+    耗时增加数倍（trace_memory=True 时约 150 秒）。full_budget=True 时大规模任务也使用引擎
+    默认预算，不开启内存跟踪时约 100 秒。
+    """
+    config = {'vertices': vertices, 'holes': holes, 'rotation': rotation, 'engine': engine,
+              'seed': seed, 'trace_memory': trace_memory, 'full_budget': full_budget}
+    results = {}
+    with contextlib.ExitStack() as stack:
+        if workdir is None:
+            workdir = stack.enter_context(tempfile.TemporaryDirectory())
+        for n in sizes:
+            results[str(n)] = run_case(n, workdir, vertices, holes, rotation, engine, seed,
+                                       trace_memory, full_budget)
+            if progress is not None:
+                progress(results[str(n)])
+    return {
+        'config': config,
+        'platform': {'python': platform.python_version(), 'machine': platform.machine()},
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25):
+    """与基线比较，返回回归列表 [(规模, 阶段, 指标, 基线值, 当前值), ...]
+
+    耗时或峰值内存超过基线的 (1 + tolerance) 倍、或用板数增加时记为回归；
+    基线中没有的规模、以及耗时过短的阶段不参与比较。
+    """
+    regressions = []
+    for size, result in current['results'].items():
+        base = baseline['results'].get(size)
+        if base is None:
+            continue
+        for name, stage in result['stages'].items():
+            ref = base['stages'].get(name)
+            if ref is None:
+                continue
+            if (ref['time'] >= MIN_COMPARABLE_TIME
+                    and stage['time'] > ref['time'] * (1 + tolerance)):
+                regressions.append((size, name, 'time', ref['time'], stage['time']))
+            if (ref.get('peak_memory') and stage.get('peak_memory')
+                    and stage['peak_memory'] > ref['peak_memory'] * (1 + tolerance)):
+                regressions.append((size, name, 'peak_memory', ref['peak_memory'],
+                                    stage['peak_memory']))
+        if result['sheets_used'] > base['sheets_used']:
+            regressions.append((size, 'nest', 'sheets_used', base['sheets_used'],
+                                result['sheets_used']))
+    return regressions
+
+
+def format_result(result):
+    stages = ', '.join(f"{name} {s['time']:.3f}s" for name, s in result['stages'].items())
+    return (f"{result['parts']:>6} parts: {stages}; sheets={result['sheets_used']}, "
+            f"utilization={result['utilization']:.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic DXF scaling benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--vertices', type=int, default=4)
+    parser.add_argument('--holes', type=int, default=0)
+    parser.add_argument('--rotation', choices=sorted(ROTATIONS), default='ortho')
+    parser.add_argument('--engine', default='compact')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip tracemalloc (faster, no peak memory figures)")
+    parser.add_argument('--full-budget', action='store_true',
+                        help=f"use the engine's default budget above {LARGE_JOB_PARTS} parts "
+                             f"(about 100 s for 10000 parts instead of about 30 s)")
+    parser.add_argument('--baseline', default=os.path.join('benchmarks', 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--output', help="write the results JSON to this path")
+    args = parser.parse_args(argv)
+
+    current = run_benchmark(args.sizes, args.vertices, args.holes, args.rotation, args.engine,
+                            args.seed, not args.no_memory,
+                            progress=lambda r: print(format_result(r)),
+                            full_budget=args.full_budget)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['config'] != current['config']:
+        print(f"Warning: baseline config {baseline['config']} differs from {current['config']}")
+    regressions = compare(current, baseline, args.tolerance)
+    for size, stage, metric, before, after in regressions:
+        print(f"REGRESSION {size} parts / {stage} / {metric}: {before:.4g} -> {after:.4g}")
+    if not regressions:
+        print("No regressions against baseline")
+    return 1 if regressions else 0
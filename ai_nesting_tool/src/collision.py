@@ -0,0 +1,49 @@
+import numpy as np
+import shapely
+
+from . import profiling
+
+
+def candidate_pairs(bounds, groups=None):
+    """粗检测：返回包围盒相交的零件对 (i, j)，i < j
+
+    bounds 为 (n, 4) 的 (minx, miny, maxx, maxy) 数组；groups 给出每个零件所属的
+    分组（例如板材号），只有同组的零件才会成为候选对。
+    """
+    bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+    n = len(bounds)
+    if n < 2:
+        empty = np.empty(0, dtype=np.intp)
+        return empty, empty
+
+    if groups is not None:
+        # 将各组的包围盒沿 x 方向错开，一棵 STRtree 即可同时处理所有分组
+        _, group_ids = np.unique(np.asarray(groups), return_inverse=True)
+        stride = (bounds[:, 2].max() - bounds[:, 0].min()) + 1.0
+        offset = group_ids.ravel() * stride
+        bounds = bounds.copy()
+        bounds[:, 0] += offset
+        bounds[:, 2] += offset
+
+    boxes = shapely.box(bounds[:, 0], bounds[:, 1], bounds[:, 2], bounds[:, 3])
+    tree = shapely.STRtree(boxes)
+    left, right = tree.query(boxes)
+    keep = left < right
+    return left[keep], right[keep]
+
+
+def overlapping_pairs(geoms, groups=None):
+    """粗检测 + 精确 intersects 检测，返回真正相交的零件对"""
+    geoms = np.asarray(geoms, dtype=object).ravel()
+    left, right = candidate_pairs(shapely.bounds(geoms), groups)
+    if len(left) == 0:
+        return left, right
+    profiling.count('intersects', len(left))
+    hits = shapely.intersects(geoms[left], geoms[right])
+    return left[hits], right[hits]
+
+
+def has_overlap(geoms, groups=None):
+    """判断同组零件之间是否存在相交"""
+    left, _ = overlapping_pairs(geoms, groups)
+    return len(left) > 0
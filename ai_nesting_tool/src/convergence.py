@@ -0,0 +1,84 @@
+import threading
+import time
+
+
+class CancellationToken:
+    """跨线程取消标记：UI 或任务队列调用 cancel() 后优化器在下一代结束时停止"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class ConvergenceController:
+    """遗传算法终止条件：目标利用率、停滞代数、时间预算、取消标记与最大代数
+
+    每代结束时调用 update(best)，返回 True 表示应当停止，停止原因见 stop_reason。
+    """
+
+    REASONS = ('target', 'stall', 'time_budget', 'cancelled', 'generations')
+
+    def __init__(self, max_generations=None, target=None, stall_generations=None,
+                 time_budget=None, cancel_token=None, min_improvement=1e-9):
+        self.max_generations = max_generations
+        self.target = target
+        self.stall_generations = stall_generations
+        self.time_budget = time_budget
+        self.cancel_token = cancel_token
+        self.min_improvement = min_improvement
+        self.start()
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.generation = 0
+        self.best = None
+        self.best_generation = 0
+        self.stop_reason = None
+        self.history = []  # 每代的最优值
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def should_abort(self):
+        """不依赖本代结果的检查：取消与超时，可在一代中途调用"""
+        if self.cancel_token is not None and self.cancel_token.cancelled:
+            self.stop_reason = 'cancelled'
+        elif self.time_budget is not None and self.elapsed >= self.time_budget:
+            self.stop_reason = 'time_budget'
+        return self.stop_reason is not None
+
+    def update(self, best):
+        """记录本代最优值并判断是否停止"""
+        self.generation += 1
+        best = float(best)
+        self.history.append(best)
+        if self.best is None or best > self.best + self.min_improvement:
+            self.best = best
+            self.best_generation = self.generation
+
+        if self.target is not None and self.best >= self.target:
+            self.stop_reason = 'target'
+        elif (self.stall_generations is not None
+              and self.generation - self.best_generation >= self.stall_generations):
+            self.stop_reason = 'stall'
+        elif self.should_abort():
+            pass
+        elif self.max_generations is not None and self.generation >= self.max_generations:
+            self.stop_reason = 'generations'
+        return self.stop_reason is not None
+
+    def summary(self):
+        return {
+            'stop_reason': self.stop_reason,
+            'generations': self.generation,
+            'best': self.best,
+            'best_generation': self.best_generation,
+            'elapsed': self.elapsed,
+        }
@@ -2,7 +2,11 @@ import ezdxf
 import math
 from shapely.geometry import Polygon
 
-def parse_dxf(file_path):
+from .rotation import policy_from_layer
+
+def parse_dxf(file_path, layer_policies=None):
+    """layer_policies 为 {图层名: 旋转策略}，未列出的图层按图层名中的标记推断（缺省 'free'）"""
+    layer_policies = layer_policies or {}
     doc = ezdxf.readfile(file_path)
     msp = doc.modelspace()
     parts = []
@@ -15,6 +19,10 @@ def parse_dxf(file_path):
             if len(points) >= 3:  # 确保至少有3个点以形成有效多边形
                 poly = Polygon(points)
                 main_polylines.append({
+                    'part_id': len(main_polylines),  # 稳定的零件编号，与返回的 parts 下标一致
+                    # 旋转策略：纹理方向等约束，由图层映射或图层名标记（如 110OO_GRAIN）给出
+                    'rotation': layer_policies.get(entity.dxf.layer,
+                                                   policy_from_layer(entity.dxf.layer)),
                     'polygon': poly,
                     'entity': entity,
                     'children': []  # 将存储此多边形内的其他实体
@@ -0,0 +1,241 @@
+import math
+import random
+
+import numpy as np
+import shapely
+
+from .convergence import ConvergenceController
+from .placement import BottomLeftDecoder
+
+
+class NestingEngine:
+    """排样搜索策略接口：run(optimizer) 返回 [(x, y, angle, sheet_idx), ...] 并写入 optimizer.sheets"""
+
+    name = None
+
+    def run(self, optimizer):
+        raise NotImplementedError
+
+    def config(self):
+        """构造参数：create_engine(name, **config) 可重建同样的引擎，用于写入运行清单"""
+        raise ValueError(f"Engine {type(self).__name__} cannot be recorded in a run manifest")
+
+
+def engine_spec(engine):
+    """引擎的可记录形式：名称原样返回，实例转换为 {'name': 名称, **构造参数}
+
+    未注册到 ENGINES 的实例（包括已注册引擎的子类）无法按名称重建，抛出 ValueError。
+    """
+    if not isinstance(engine, NestingEngine):
+        return engine
+    if ENGINES.get(engine.name) is not type(engine):
+        raise ValueError(f"Engine {type(engine).__name__} is not registered and cannot be "
+                         f"recorded in a run manifest")
+    return dict(engine.config(), name=engine.name)
+
+
+def _area_order(parts):
+    return sorted(range(len(parts)), key=lambda i: parts[i].area, reverse=True)
+
+
+def _decoder(optimizer, rotations, placer):
+    return BottomLeftDecoder(optimizer.nfp_engine, optimizer.sheet_width, optimizer.sheet_height,
+                             rotations=rotations, placer=placer, spacing=optimizer.spacing,
+                             sheet_set=optimizer.sheet_set, rotation_set=optimizer._rotations)
+
+
+class GeneticEngine(NestingEngine):
+    """现有遗传算法，构造参数原样传给 NestingOptimizer.genetic_algorithm"""
+
+    name = 'ga'
+
+    def __init__(self, **options):
+        self.options = options
+
+    def run(self, optimizer):
+        return optimizer.genetic_algorithm(**self.options)
+
+    def config(self):
+        return dict(self.options)
+
+
+class AnnealingEngine(NestingEngine):
+    """对放置顺序+旋转索引做模拟退火，由底部-左侧解码器解码，每个状态都是可行解
+
+    邻域操作为交换两个零件的放置顺序或改变一个零件的旋转；接受概率为
+    exp(Δ利用率 / T)，温度每步乘以 cooling。
+    """
+
+    name = 'anneal'
+
+    def __init__(self, iterations=2000, initial_temperature=0.05, cooling=0.995,
+                 rotations=(0, 90, 180, 270), placer='skyline', compact=True, seed=None,
+                 target_utilization=None, stall_generations=None, time_budget=None,
+                 cancel_token=None):
+        self.iterations = iterations
+        self.initial_temperature = initial_temperature
+        self.cooling = cooling
+        self.rotations = tuple(rotations)
+        self.placer = placer
+        self.compact = compact
+        self.seed = seed
+        self.termination = (target_utilization, stall_generations, time_budget, cancel_token)
+
+    def config(self):
+        target_utilization, stall_generations, time_budget, cancel_token = self.termination
+        return {'iterations': self.iterations, 'initial_temperature': self.initial_temperature,
+                'cooling': self.cooling, 'rotations': self.rotations, 'placer': self.placer,
+                'compact': self.compact, 'seed': self.seed,
+                'target_utilization': target_utilization, 'stall_generations': stall_generations,
+                'time_budget': time_budget, 'cancel_token': cancel_token}
+
+    def _neighbor(self, rng, order, rot):
+        order, rot = list(order), list(rot)
+        n = len(order)
+        if n > 1 and (len(self.rotations) == 1 or rng.random() < 0.5):
+            i, j = rng.sample(range(n), 2)
+            order[i], order[j] = order[j], order[i]
+        else:
+            rot[rng.randrange(n)] = rng.randrange(len(self.rotations))
+        return order, rot
+
+    def run(self, optimizer):
+        decoder = _decoder(optimizer, self.rotations, self.placer)
+        rng = random.Random(optimizer._resolve_seed(self.seed))
+        optimizer.convergence = ConvergenceController(self.iterations, *self.termination)
+
+        state = (_area_order(optimizer.parts), [0] * len(optimizer.parts))
+        solution, score = decoder.decode(*state)
+        optimizer.evaluations += 1
+        best_solution, best_score = solution, score
+        temperature = self.initial_temperature
+        step = 0
+        while not optimizer.convergence.update(best_score):
+            candidate = self._neighbor(rng, *state)
+            cand_solution, cand_score = decoder.decode(*candidate)
+            optimizer.evaluations += 1
+            delta = cand_score - score
+            if delta >= 0 or rng.random() < math.exp(delta / max(temperature, 1e-12)):
+                state, solution, score = candidate, cand_solution, cand_score
+                if score > best_score:
+                    best_solution, best_score = solution, score
+            temperature *= self.cooling
+            # 退火没有种群，mean 记为当前状态的得分
+            optimizer._report_generation(self.name, step, best_score, score)
+            step += 1
+
+        if self.compact:
+            best_solution = compact(optimizer, best_solution)
+        optimizer.sheets = optimizer._layout_sheets(best_solution)
+        return best_solution
+
+
+class CompactionEngine(NestingEngine):
+    """压实引擎：先得到一个初始排样，再把零件向下、向左滑动直到接触
+
+    base 为 None 时用“面积从大到小”的天际线贪心排样作为初始解，小任务毫秒级完成；
+    也可传入其他引擎（或其名称）作为前置阶段，压实即作为后处理。
+    """
+
+    name = 'compact'
+
+    def __init__(self, base=None, passes=3, tolerance=0.5, rotations=(0, 90, 180, 270),
+                 placer='skyline'):
+        self.base = base
+        self.passes = passes
+        self.tolerance = tolerance
+        self.rotations = tuple(rotations)
+        self.placer = placer
+
+    def config(self):
+        return {'base': engine_spec(self.base), 'passes': self.passes,
+                'tolerance': self.tolerance, 'rotations': self.rotations, 'placer': self.placer}
+
+    def run(self, optimizer):
+        if self.base is None:
+            decoder = _decoder(optimizer, self.rotations, self.placer)
+            solution, _ = decoder.decode(_area_order(optimizer.parts), [0] * len(optimizer.parts))
+        else:
+            solution = create_engine(self.base, len(optimizer.parts)).run(optimizer)
+        solution = compact(optimizer, solution, self.passes, self.tolerance)
+        optimizer.sheets = optimizer._layout_sheets(solution)
+        return solution
+
+
+def compact(optimizer, solution, passes=3, tolerance=0.5):
+    """爬山式压实：按从下到上、从左到右的顺序把每个零件向下再向左滑动到接触为止
+
+    每次移动先以零件最小尺寸的一半为步长前进，碰撞后步长减半，直到小于 tolerance；
+    零件只会向下、向左移动，因此各板材的已用高度不会增加。
+    """
+    cache = optimizer.geometry_cache
+    sheet_set = optimizer.sheet_set
+    solution = [tuple(gene) for gene in solution]
+    n = len(solution)
+    geoms = np.empty(n, dtype=object)
+    geoms[:] = [cache.place(i, a, x, y) for i, (x, y, a, _) in enumerate(solution)]
+    bounds = shapely.bounds(geoms)
+    sheet_idx = np.array([int(s) for _, _, _, s in solution])
+
+    def fits(i, geom):
+        if not sheet_set.contains([geom], [sheet_idx[i]])[0]:
+            return False
+        b = geom.bounds
+        mask = ((sheet_idx == sheet_idx[i]) & (bounds[:, 0] <= b[2]) & (bounds[:, 2] >= b[0])
+                & (bounds[:, 1] <= b[3]) & (bounds[:, 3] >= b[1]))
+        mask[i] = False
+        return not shapely.intersects(geom, geoms[mask]).any()
+
+    for _ in range(passes):
+        moved = False
+        for i in sorted(range(n), key=lambda k: (sheet_idx[k], bounds[k, 1], bounds[k, 0])):
+            x, y, angle, s = solution[i]
+            minx, miny, maxx, maxy = cache.get(i, angle).bounds
+            for axis in (1, 0):
+                pos = [x, y]
+                step = max(min(maxx - minx, maxy - miny) / 2, tolerance)
+                while step >= tolerance:
+                    trial = list(pos)
+                    trial[axis] -= step
+                    geom = cache.place(i, angle, trial[0], trial[1])
+                    if fits(i, geom):
+                        pos = trial
+                        geoms[i] = geom
+                        bounds[i] = geom.bounds
+                    else:
+                        step /= 2
+                if pos != [x, y]:
+                    moved = True
+                    x, y = pos
+            solution[i] = (x, y, angle, s)
+        if not moved:
+            break
+    return solution
+
+
+ENGINES = {
+    GeneticEngine.name: GeneticEngine,
+    AnnealingEngine.name: AnnealingEngine,
+    CompactionEngine.name: CompactionEngine,
+}
+
+# 自动选择：零件数不超过该值时只做贪心排样+压实，否则先退火再压实
+SMALL_JOB_PARTS = 20
+
+
+def create_engine(engine='auto', n_parts=0, **options):
+    """按名称（或 'auto' 按零件数）创建引擎；传入 NestingEngine 实例时原样返回
+
+    engine 也可以是 engine_spec() 给出的 {'name': 名称, **构造参数}，其中的参数优先于 options。
+    """
+    if isinstance(engine, NestingEngine):
+        return engine
+    if isinstance(engine, dict):
+        spec = dict(engine)
+        engine = spec.pop('name')
+        options = dict(options, **spec)
+    if engine == 'auto':
+        engine = CompactionEngine.name if n_parts <= SMALL_JOB_PARTS else AnnealingEngine.name
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    return ENGINES[engine](**options)
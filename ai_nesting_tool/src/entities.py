@@ -0,0 +1,56 @@
+import numpy as np
+import shapely
+
+
+def transform_children(children_lists, centroids, angles, offsets):
+    """批量变换子实体（孔、圆等）
+
+    children_lists[k] 为第 k 个放置零件的子实体列表，centroids/angles/offsets 为
+    该零件的质心、旋转角度和平移量。每个零件对应一个仿射矩阵：绕父零件质心旋转
+    后平移，与主轮廓的变换一致。所有子实体的坐标一次性完成变换，返回与
+    children_lists 结构相同的新列表。
+    """
+    counts = [len(children) for children in children_lists]
+    flat = [child for children in children_lists for child in children]
+    if not flat:
+        return [[] for _ in children_lists]
+
+    owner = np.repeat(np.arange(len(children_lists)), counts)
+    radians = np.radians(np.asarray(angles, dtype=np.float64))[owner]
+    cos_a, sin_a = np.cos(radians), np.sin(radians)
+    centroids = np.asarray(centroids, dtype=np.float64).reshape(-1, 2)[owner]
+    shift = centroids + np.asarray(offsets, dtype=np.float64).reshape(-1, 2)[owner]
+
+    def _affine(coords, index):
+        c, s = cos_a[index], sin_a[index]
+        dx = coords[:, 0] - centroids[index, 0]
+        dy = coords[:, 1] - centroids[index, 1]
+        return np.column_stack((c * dx - s * dy + shift[index, 0],
+                                s * dx + c * dy + shift[index, 1]))
+
+    polygons = np.empty(len(flat), dtype=object)
+    polygons[:] = [child['polygon'] for child in flat]
+    geom_index = np.repeat(np.arange(len(flat)), shapely.get_num_coordinates(polygons))
+    polygons = shapely.transform(polygons, lambda coords: _affine(coords, geom_index))
+
+    circles = [k for k, child in enumerate(flat) if child['type'] == 'circle']
+    centers = {}
+    if circles:
+        points = np.array([flat[k]['center'] for k in circles], dtype=np.float64)
+        centers = dict(zip(circles, _affine(points, np.asarray(circles)).tolist()))
+
+    result = [[] for _ in children_lists]
+    for k, (child, poly, o) in enumerate(zip(flat, polygons, owner.tolist())):
+        if child['type'] == 'circle':
+            result[o].append({
+                'type': 'circle',
+                'center': tuple(centers[k]),
+                'radius': child['radius'],
+                'polygon': poly,
+            })
+        elif child['type'] == 'polyline':
+            result[o].append({
+                'type': 'polyline',
+                'polygon': poly,
+            })
+    return result
@@ -0,0 +1,116 @@
+class Event:
+    """事件基类：kind 为事件类型名，as_dict() 便于写入 JSON 或跨线程传递"""
+
+    __slots__ = ()
+    kind = 'event'
+
+    def as_dict(self):
+        result = {'kind': self.kind}
+        result.update({name: getattr(self, name) for name in self.__slots__})
+        return result
+
+    def __repr__(self):
+        fields = ', '.join(f"{k}={v!r}" for k, v in self.as_dict().items() if k != 'kind')
+        return f"{type(self).__name__}({fields})"
+
+
+class RunStarted(Event):
+    __slots__ = ('method', 'seed', 'parts', 'sheets')
+    kind = 'run_started'
+
+    def __init__(self, method, seed, parts, sheets):
+        self.method = method
+        self.seed = seed
+        self.parts = parts
+        self.sheets = sheets
+
+
+class GenerationEvent(Event):
+    """每代（或每次迭代）的进度：最优值、均值、累计评估数、评估速度、缓存命中率与耗时"""
+
+    __slots__ = ('source', 'generation', 'best', 'mean', 'evaluations', 'evals_per_sec',
+                 'cache_hit_rate', 'elapsed')
+    kind = 'generation'
+
+    def __init__(self, source, generation, best, mean, evaluations, evals_per_sec,
+                 cache_hit_rate, elapsed):
+        self.source = source
+        self.generation = generation
+        self.best = best
+        self.mean = mean
+        self.evaluations = evaluations
+        self.evals_per_sec = evals_per_sec
+        self.cache_hit_rate = cache_hit_rate
+        self.elapsed = elapsed
+
+
+class RunFinished(Event):
+    __slots__ = ('method', 'seed', 'best', 'stop_reason', 'sheets_used', 'evaluations',
+                 'elapsed', 'manifest_path')
+    kind = 'run_finished'
+
+    def __init__(self, method, seed, best, stop_reason, sheets_used, evaluations, elapsed,
+                 manifest_path=None):
+        self.method = method
+        self.seed = seed
+        self.best = best
+        self.stop_reason = stop_reason
+        self.sheets_used = sheets_used
+        self.evaluations = evaluations
+        self.elapsed = elapsed
+        self.manifest_path = manifest_path
+
+
+class MessageEvent(Event):
+    """不属于进度的提示或警告，level 为 'info' 或 'warning'"""
+
+    __slots__ = ('level', 'text')
+    kind = 'message'
+
+    def __init__(self, level, text):
+        self.level = level
+        self.text = text
+
+
+class EventBus:
+    """优化器事件流：监听器为接收 Event 的可调用对象（回调函数或 queue.Queue.put）
+
+    没有监听器时 active 为 False，调用方据此跳过事件的构造与指标计算，不产生任何开销。
+    """
+
+    def __init__(self):
+        self._listeners = []
+
+    @property
+    def active(self):
+        return bool(self._listeners)
+
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def emit(self, event):
+        for listener in list(self._listeners):
+            listener(event)
+
+
+def console_listener(event):
+    """把事件格式化为一行简短文本输出到控制台"""
+    if event.kind == 'generation':
+        rate = '-' if event.cache_hit_rate is None else f"{event.cache_hit_rate:.0%}"
+        print(f"[{event.source}] gen {event.generation}: best={event.best:.4f} "
+              f"mean={event.mean:.4f} evals={event.evaluations} "
+              f"({event.evals_per_sec:.0f}/s) cache={rate} t={event.elapsed:.2f}s")
+    elif event.kind == 'run_started':
+        print(f"{event.method} started: seed={event.seed}, parts={event.parts}, "
+              f"sheets={event.sheets}")
+    elif event.kind == 'run_finished':
+        best = '-' if event.best is None else f"{event.best:.4f}"
+        print(f"{event.method} finished: best={best}, stop={event.stop_reason}, "
+              f"sheets={event.sheets_used}, evals={event.evaluations}, t={event.elapsed:.2f}s")
+    elif event.kind == 'message':
+        print(f"{event.level}: {event.text}")
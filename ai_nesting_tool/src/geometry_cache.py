@@ -0,0 +1,143 @@
+import numpy as np
+import shapely
+from shapely.affinity import rotate, translate
+
+from .parts import PartLibrary
+from .population import quantize_angles
+from .utils import LRUCache
+
+
+class RotatedPart:
+    """零件在某一角度下的缓存形状：质心位于原点，附带包围盒、面积与 prepare 状态"""
+
+    __slots__ = ('polygon', 'bounds', 'area')
+
+    def __init__(self, polygon, bounds=None, area=None):
+        shapely.prepare(polygon)
+        self.polygon = polygon
+        self.bounds = tuple(polygon.bounds) if bounds is None else bounds
+        self.area = float(polygon.area) if area is None else area
+
+
+class PartGeometryCache:
+    """按 (形状哈希, 相对规范形状的角度) 缓存旋转后的零件形状
+
+    angle_step 为角度量化步长（如 1 或 90 度），为 None 时不量化。评估个体时只需
+    对缓存形状做平移；缓存容量由 LRU 限制，避免上千零件的零件库占满内存。
+    相同轮廓的多件零件通过 PartLibrary 共享缓存条目。给出 rotations（RotationSet）时，
+    受约束零件的角度取最近的允许角度，缓存中每个零件最多只有允许角度个数的条目。
+    """
+
+    def __init__(self, parts, angle_step=None, maxsize=20000, library=None, rotations=None):
+        self.parts = list(parts)
+        self.library = library if library is not None else PartLibrary(self.parts)
+        self.angle_step = angle_step
+        self.rotations = rotations if rotations is not None and not rotations.free else None
+        self.cache = LRUCache(maxsize)
+        self.centroids = [(p.centroid.x, p.centroid.y) for p in self.parts]
+        self.shape_ids = np.asarray(self.library.shape_ids, dtype=np.int64)
+        self.base_angles = np.asarray(self.library.base_angles, dtype=np.float64)
+
+    def quantize(self, angle, idx=None):
+        """将角度量化到 angle_step 的整数倍（或零件 idx 最近的允许角度），并归一化到 [0, 360)"""
+        angle = float(angle)
+        if idx is not None and self.rotations is not None and self.rotations.constrained[idx]:
+            angle = self.rotations.snap(idx, angle)
+        elif self.angle_step:
+            angle = round(angle / self.angle_step) * self.angle_step
+        angle %= 360.0
+        return angle + 0.0  # 避免 -0.0 产生不同的缓存键
+
+    def key(self, idx, angle):
+        """零件 idx 旋转 angle 度后的缓存键，形状相同且朝向相同的零件键相同"""
+        library = self.library
+        total = round(self.quantize(angle, idx) + library.base_angles[idx], 9) % 360.0
+        return library.shape(idx).key, total + 0.0
+
+    def get(self, idx, angle):
+        """返回零件 idx 旋转 angle 度后的 RotatedPart"""
+        return self._entry(self.library.shape(idx), self.key(idx, angle)[1])
+
+    def _columns(self, angles, idx):
+        if idx is None:
+            return np.broadcast_to(np.arange(angles.shape[-1]), angles.shape)
+        return np.broadcast_to(np.asarray(idx, dtype=np.int64), angles.shape)
+
+    def quantize_many(self, angles, idx=None):
+        """向量化的 quantize：idx 给出每个角度的零件序号，缺省时 angles 的最后一维对应零件"""
+        angles = np.asarray(angles, dtype=np.float64)
+        quantized = quantize_angles(angles, self.angle_step)
+        if self.rotations is not None:
+            cols = self._columns(angles, idx)
+            mask = np.asarray(self.rotations.constrained)[cols]
+            snapped = self.rotations.constrain(None, angles, cols=cols, jump_rate=0.0)
+            quantized[mask] = np.mod(snapped[mask], 360.0) + 0.0
+        return quantized
+
+    def polygons(self, angles, idx=None, min_reuse=2.0):
+        """整个种群的旋转形状：angles 为 (pop, parts)（或由 idx 给出零件序号），返回同形状的 Polygon 数组
+
+        角度向量化量化后按 (形状, 总角度) 去重，每个唯一条目只查一次缓存，未命中的条目
+        一次向量化旋转后写入缓存，再按下标展开。平均每个唯一条目被用到的次数不足
+        min_reuse 时缓存帮不上忙，返回 None，由调用方直接做向量化旋转。
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        cols = self._columns(angles, idx)
+        total = np.mod(np.round(self.quantize_many(angles, idx) + self.base_angles[cols], 9),
+                       360.0).ravel() + 0.0
+        shape_ids = self.shape_ids[cols].ravel()
+        # lexsort 去重，比 np.unique(axis=0) 快得多
+        order = np.lexsort((total, shape_ids))
+        sorted_ids, sorted_total = shape_ids[order], total[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (sorted_ids[1:] != sorted_ids[:-1]) | (sorted_total[1:] != sorted_total[:-1])
+        if first.sum() * min_reuse > len(order):
+            return None
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.cumsum(first) - 1
+        unique_ids, unique_total = sorted_ids[first], sorted_total[first]
+
+        shapes = self.library.shapes
+        keys = [(shapes[sid].key, t) for sid, t in zip(unique_ids.tolist(), unique_total.tolist())]
+        entries = np.empty(len(keys), dtype=object)
+        entries[:] = [None if entry is None else entry.polygon
+                      for entry in map(self.cache.get, keys)]
+        missing = np.flatnonzero(np.equal(entries, None))
+        if len(missing):
+            rotated = self._rotate(unique_ids[missing], unique_total[missing])
+            shapely.prepare(rotated)
+            for k, polygon, bounds, area in zip(missing.tolist(), rotated,
+                                                shapely.bounds(rotated).tolist(),
+                                                shapely.area(rotated).tolist()):
+                self.cache.put(keys[k], RotatedPart(polygon, tuple(bounds), area))
+            entries[missing] = rotated
+        return entries[inverse].reshape(angles.shape)
+
+    def _rotate(self, shape_ids, totals):
+        """规范形状分别绕原点旋转 totals 度，一次向量化变换"""
+        base = np.empty(len(shape_ids), dtype=object)
+        base[:] = [self.library.shapes[sid].polygon for sid in shape_ids.tolist()]
+        theta = np.radians(totals)
+        cos_a, sin_a = np.cos(theta), np.sin(theta)
+        geom_index = np.repeat(np.arange(len(base)), shapely.get_num_coordinates(base))
+        c, s = cos_a[geom_index], sin_a[geom_index]
+
+        def _rotate(coords):
+            return np.column_stack((c * coords[:, 0] - s * coords[:, 1],
+                                    s * coords[:, 0] + c * coords[:, 1]))
+
+        return shapely.transform(base, _rotate)
+
+    def _entry(self, shape, total):
+        """形状记录 shape 旋转到相对规范形状 total 度时的缓存条目"""
+        key = (shape.key, total)
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = RotatedPart(rotate(shape.polygon, total, origin=(0, 0)))
+            self.cache.put(key, entry)
+        return entry
+
+    def place(self, idx, angle, x, y):
+        """与 translate(rotate(part, angle, origin='centroid'), x, y) 等价，但只需一次平移"""
+        cx, cy = self.centroids[idx]
+        return translate(self.get(idx, angle).polygon, x + cx, y + cy)
@@ -0,0 +1,207 @@
+import math
+
+import numpy as np
+import shapely
+
+from .engines import ENGINES, NestingEngine, create_engine, engine_spec
+from .events import MessageEvent
+
+
+class HoleIndex:
+    """内孔索引：按面积升序排列，小零件一次二分查找即可得到面积足够的候选孔
+
+    holes 为 [(宿主零件序号, 孔多边形), ...]，孔多边形使用宿主零件的原始坐标。
+    """
+
+    def __init__(self, holes):
+        holes = list(holes)
+        areas = np.array([h.area for _, h in holes], dtype=np.float64)
+        order = np.argsort(areas, kind='stable')
+        self.hosts = [holes[k][0] for k in order]
+        self.polygons = [holes[k][1] for k in order]
+        self.areas = areas[order]
+        for polygon in self.polygons:
+            shapely.prepare(polygon)
+        self.dims = [tuple(sorted((b[2] - b[0], b[3] - b[1])))
+                     for b in (p.bounds for p in self.polygons)]
+
+    def __len__(self):
+        return len(self.polygons)
+
+    def candidates(self, area, dims):
+        """面积不小于 area、包围盒能容纳 dims（允许旋转 90 度）的孔，按面积从小到大"""
+        start = int(np.searchsorted(self.areas, area, side='left'))
+        for k in range(start, len(self.polygons)):
+            if dims[0] <= self.dims[k][0] and dims[1] <= self.dims[k][1]:
+                yield k
+
+
+def collect_holes(optimizer, circles=True):
+    """每个零件的内孔：零件多边形自身的 interiors 以及解析器收集的子多段线、圆
+
+    DXF 中的圆大多是钻孔、螺栓孔：只有能容纳最小零件包围盒（包围盒对角线不超过直径）的圆
+    才算作内孔，circles=False 时不使用圆。
+    """
+    diagonal = min(math.hypot(b[2] - b[0], b[3] - b[1])
+                   for b in (p.bounds for p in optimizer.parts))
+    holes = []
+    for i, part in enumerate(optimizer.parts):
+        rings = [shapely.Polygon(ring) for ring in part.interiors]
+        main_poly = optimizer.entities_by_id.get(optimizer.part_ids[i])
+        if main_poly is not None:
+            for child in main_poly['children']:
+                if child['type'] == 'polyline':
+                    rings.append(child['polygon'])
+                elif child['type'] == 'circle' and circles:
+                    b = child['polygon'].bounds
+                    if min(b[2] - b[0], b[3] - b[1]) >= diagonal:
+                        rings.append(child['polygon'])
+        holes += [(i, ring) for ring in rings if ring.is_valid and ring.area > 0]
+    return holes
+
+
+def _grid_place(shape, hole, occupied, spacing, max_candidates=2500):
+    """在孔内为质心位于原点的 shape 找底部-左侧的可行位置，找不到时返回 None"""
+    hx0, hy0, hx1, hy1 = hole.bounds
+    sx0, sy0, sx1, sy1 = shape.bounds
+    xs = (hx0 - sx0 + spacing, hx1 - sx1 - spacing)
+    ys = (hy0 - sy0 + spacing, hy1 - sy1 - spacing)
+    if xs[1] < xs[0] or ys[1] < ys[0]:
+        return None
+    step = max(min(sx1 - sx0, sy1 - sy0) / 8,
+               math.sqrt((xs[1] - xs[0]) * (ys[1] - ys[0]) / max_candidates), 1e-6)
+    gx = np.arange(xs[0], xs[1] + 1e-9, step)
+    gy = np.arange(ys[0], ys[1] + 1e-9, step)
+    px, py = (a.ravel() for a in np.meshgrid(gx, gy))
+    order = np.lexsort((px, py))
+    px, py = px[order], py[order]
+
+    geoms = np.full(len(px), shape, dtype=object)
+    n_coords = shapely.get_num_coordinates(shape)
+    offsets = np.repeat(np.column_stack((px, py)), n_coords, axis=0)
+    geoms = shapely.transform(geoms, lambda coords: coords + offsets)
+    ok = shapely.contains(hole, geoms)
+    if spacing > 0:
+        ok &= shapely.distance(hole.exterior, geoms) >= spacing
+    if occupied and ok.any():
+        ok &= ~shapely.dwithin(shapely.union_all(occupied), geoms, spacing)
+    hits = np.nonzero(ok)[0]
+    if not len(hits):
+        return None
+    k = hits[0]
+    return (float(px[k]), float(py[k])), geoms[k]
+
+
+def _follows_host(rotation_set, j, host, rel_angle):
+    """宿主取任一允许角度时，嵌套零件 j 的绝对角度（宿主角度 + 相对角度）都在 j 的允许范围内"""
+    choices = rotation_set.choices[j]
+    if choices is None:
+        return True
+    host_choices = rotation_set.choices[host]
+    if host_choices is None:
+        return False
+    return all((a + rel_angle) % 360.0 in choices for a in host_choices)
+
+
+def plan_hole_filling(optimizer, rotations=(0, 90, 180, 270), circles=True):
+    """为能放进其他零件内孔的小零件制定嵌套方案（circles 见 collect_holes）
+
+    返回 {零件序号: (宿主序号, 宿主坐标系下的质心位置, 相对宿主的旋转角)}。
+    零件从大到小依次选择面积最接近的候选孔；嵌套零件不再作为宿主，宿主也不会被嵌套。
+    有旋转约束的零件只尝试允许的角度，且只嵌入旋转后不会违反其约束的宿主。
+    """
+    index = HoleIndex(collect_holes(optimizer, circles))
+    plan = {}
+    if not len(index):
+        return plan
+    cache = optimizer.geometry_cache
+    spacing = optimizer.spacing
+    occupied = [[] for _ in range(len(index))]
+    hosts = set()
+    for j in sorted(range(len(optimizer.parts)), key=lambda k: optimizer.parts[k].area,
+                    reverse=True):
+        if j in hosts:
+            continue
+        b = optimizer.parts[j].bounds
+        dims = tuple(sorted((b[2] - b[0], b[3] - b[1])))
+        for k in index.candidates(optimizer.parts[j].area, dims):
+            host = index.hosts[k]
+            if host == j or host in plan:
+                continue
+            placed = None
+            for angle in optimizer.rotation_set.choices_for(j, rotations):
+                angle = cache.quantize(angle, j)
+                if not _follows_host(optimizer.rotation_set, j, host, angle):
+                    continue
+                placed = _grid_place(cache.get(j, angle).polygon, index.polygons[k],
+                                     occupied[k], spacing)
+                if placed is not None:
+                    break
+            if placed is None:
+                continue
+            position, geom = placed
+            occupied[k].append(geom)
+            plan[j] = (host, position, angle)
+            hosts.add(host)
+            break
+    return plan
+
+
+def expand_solution(optimizer, free, free_solution, plan):
+    """由宿主零件的基因推出嵌套零件的基因，返回完整的 solution"""
+    solution = [None] * len(optimizer.parts)
+    for i, gene in zip(free, free_solution):
+        solution[i] = tuple(gene)
+    centroids = optimizer.geometry_cache.centroids
+    for j, (host, (lx, ly), rel_angle) in plan.items():
+        x, y, angle, sheet_idx = solution[host]
+        angle = optimizer.geometry_cache.quantize(angle, host)
+        hx, hy = centroids[host]
+        theta = math.radians(angle)
+        dx, dy = lx - hx, ly - hy
+        # 宿主绕自身质心旋转 angle 后平移 (x, y)，嵌套零件质心随之变换
+        cx = math.cos(theta) * dx - math.sin(theta) * dy + hx + x
+        cy = math.sin(theta) * dx + math.cos(theta) * dy + hy + y
+        jx, jy = centroids[j]
+        solution[j] = (cx - jx, cy - jy, (angle + rel_angle) % 360.0, sheet_idx)
+    return solution
+
+
+class HoleFillingEngine(NestingEngine):
+    """内孔嵌套：先把小零件放进大零件的内孔，剩余零件交给 base 引擎在板材上排样
+
+    circles=False 时不把 DXF 中的圆当作内孔（默认只使用能容纳最小零件的圆）。
+    """
+
+    name = 'holes'
+
+    def __init__(self, base='auto', rotations=(0, 90, 180, 270), circles=True, **options):
+        self.base = base
+        self.rotations = tuple(rotations)
+        self.circles = circles
+        self.options = options
+
+    def config(self):
+        return dict(self.options, base=engine_spec(self.base), rotations=self.rotations,
+                    circles=self.circles)
+
+    def run(self, optimizer):
+        plan = plan_hole_filling(optimizer, self.rotations, self.circles)
+        optimizer.hole_plan = plan
+        if optimizer.events.active:
+            optimizer.events.emit(MessageEvent('info', f"{len(plan)} parts nested into holes"))
+        free = [i for i in range(len(optimizer.parts)) if i not in plan]
+        if not plan:
+            return create_engine(self.base, len(free), **self.options).run(optimizer)
+
+        sub = optimizer.subset(free)
+        free_solution = create_engine(self.base, len(free), **self.options).run(sub)
+        optimizer.evaluations += sub.evaluations
+        if getattr(sub, 'convergence', None) is not None:
+            optimizer.convergence = sub.convergence
+        solution = expand_solution(optimizer, free, free_solution, plan)
+        optimizer.sheets = optimizer._layout_sheets(solution)
+        return solution
+
+
+ENGINES[HoleFillingEngine.name] = HoleFillingEngine
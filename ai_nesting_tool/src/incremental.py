@@ -0,0 +1,208 @@
+import numpy as np
+import shapely
+
+from . import profiling
+from .batch_fitness import FITNESS_MODES, BatchFitnessEvaluator, _pair_groups, penalty_score
+from .collision import overlapping_pairs
+
+
+class EvaluationState:
+    """单个个体的评估状态：变换后的零件、包围盒、越界情况与重叠关系"""
+
+    __slots__ = ('genes', 'geoms', 'bounds', 'inside', 'outside_area', 'neighbors', 'overlaps',
+                 'overlap_area', 'score', '_tree')
+
+    def __init__(self, genes, geoms, bounds, inside, outside_area, neighbors, overlaps,
+                 overlap_area, score):
+        self.genes = genes
+        self.geoms = geoms
+        self.bounds = bounds
+        self.inside = inside
+        self.outside_area = outside_area  # 每个零件越出板材的面积（仅罚函数模式计算）
+        self.neighbors = neighbors  # neighbors[i] 为 {与零件 i 相交的零件序号: 重叠面积}
+        self.overlaps = overlaps    # 相交零件对的数量
+        self.overlap_area = overlap_area
+        self.score = score
+        self._tree = None
+
+    @property
+    def tree(self):
+        """占用索引：按需构建的包围盒 STRtree，只在该个体作为父代时使用"""
+        if self._tree is None:
+            b = self.bounds
+            self._tree = shapely.STRtree(shapely.box(b[:, 0], b[:, 1], b[:, 2], b[:, 3]))
+        return self._tree
+
+
+class IncrementalEvaluator:
+    """增量适应度计算：子代只重新评估与父代不同的基因
+
+    k 个基因变化时，只需对这 k 个零件做变换，并通过父代的占用索引查询邻居，
+    代价约为 O(k log n)，而不是整体重算的 O(n²)。零件变换交给 batch_evaluator
+    向量化执行，与整体评估得到相同的几何体；初始种群由 evaluate_many 一次批量评估。
+    """
+
+    def __init__(self, geometry_cache, sheet_set, total_area, mode='binary', penalty_weight=10.0,
+                 batch_evaluator=None):
+        if mode not in FITNESS_MODES:
+            raise ValueError(f"Unknown fitness mode: {mode}")
+        self.geometry_cache = geometry_cache
+        self.sheet_set = sheet_set
+        self.total_area = total_area
+        self.mode = mode
+        self.penalty_weight = penalty_weight
+        if batch_evaluator is None:
+            batch_evaluator = BatchFitnessEvaluator(
+                geometry_cache.parts, sheet_set,
+                geometry_cache=geometry_cache if geometry_cache.angle_step else None)
+        self.batch_evaluator = batch_evaluator
+
+    def _place(self, genes, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        return self.batch_evaluator.place(rows, genes[rows])
+
+    def _outside_area(self, geoms, sheet_idx, inside):
+        result = np.zeros(len(geoms))
+        if self.mode == 'penalty' and not inside.all():
+            result[~inside] = self.sheet_set.outside_area(geoms[~inside], sheet_idx[~inside])
+        return result
+
+    def _overlap_areas(self, left_geoms, right_geoms):
+        if self.mode != 'penalty':
+            return np.zeros(len(left_geoms))
+        return shapely.area(shapely.intersection(left_geoms, right_geoms))
+
+    def _score(self, genes, inside, overlaps, outside_area, overlap_area, used_area=None):
+        if used_area is None:
+            used_area = self.sheet_set.used_area(genes[:, 3])[0]
+        if self.mode == 'penalty':
+            return float(penalty_score(self.total_area, used_area, overlap_area,
+                                       outside_area.sum(), self.penalty_weight))
+        if overlaps or not inside.all():
+            return 0.0
+        return self.total_area / used_area if used_area > 0 else 0.0
+
+    def evaluate(self, genes):
+        """完整评估一个个体，返回 EvaluationState"""
+        genes = np.array(genes, dtype=np.float64)
+        n = len(genes)
+        sheet_idx = genes[:, 3].astype(np.int64)
+        geoms = self._place(genes, range(n))
+        bounds = shapely.bounds(geoms)
+        inside = self.sheet_set.contains(geoms, sheet_idx, bounds)
+        outside_area = self._outside_area(geoms, sheet_idx, inside)
+        left, right = overlapping_pairs(geoms, sheet_idx)
+        areas = self._overlap_areas(geoms[left], geoms[right])
+        neighbors = [{} for _ in range(n)]
+        for a, b, area in zip(left.tolist(), right.tolist(), areas.tolist()):
+            neighbors[a][b] = area
+            neighbors[b][a] = area
+        overlaps = len(left)
+        overlap_area = float(areas.sum())
+        return EvaluationState(genes, geoms, bounds, inside, outside_area, neighbors, overlaps,
+                               overlap_area,
+                               self._score(genes, inside, overlaps, outside_area, overlap_area))
+
+    def evaluate_many(self, population):
+        """完整评估整个种群：变换、包围盒、越界与重叠检测都对全部个体一次批量完成"""
+        population = self.batch_evaluator.as_population_array(population)
+        pop, n = population.shape[:2]
+        geoms = self.batch_evaluator.transform(population)
+        sheet_idx = population[..., 3].astype(np.int64)
+        bounds = shapely.bounds(geoms)
+        inside = self.sheet_set.contains(geoms, sheet_idx, bounds)
+        outside_area = np.zeros((pop, n))
+        if self.mode == 'penalty' and not inside.all():
+            outside_area[~inside] = self.sheet_set.outside_area(geoms[~inside], sheet_idx[~inside])
+        used_area = self.sheet_set.used_area(sheet_idx)
+
+        flat = geoms.ravel()
+        left, right = overlapping_pairs(flat, _pair_groups(sheet_idx))
+        areas = self._overlap_areas(flat[left], flat[right])
+        owner = left // n
+        order = np.argsort(owner, kind='stable')
+        left, right, areas, owner = left[order] % n, right[order] % n, areas[order], owner[order]
+        split = np.searchsorted(owner, np.arange(pop + 1))
+
+        states = []
+        for p in range(pop):
+            lo, hi = split[p], split[p + 1]
+            neighbors = [{} for _ in range(n)]
+            for a, b, area in zip(left[lo:hi].tolist(), right[lo:hi].tolist(),
+                                  areas[lo:hi].tolist()):
+                neighbors[a][b] = area
+                neighbors[b][a] = area
+            overlaps = int(hi - lo)
+            overlap_area = float(areas[lo:hi].sum())
+            score = self._score(population[p], inside[p], overlaps, outside_area[p],
+                                overlap_area, used_area[p])
+            states.append(EvaluationState(population[p].copy(), geoms[p], bounds[p], inside[p],
+                                          outside_area[p], neighbors, overlaps, overlap_area,
+                                          score))
+        return states
+
+    def derive(self, parent, genes):
+        """由父代状态增量计算子代状态；变化基因过多时退回完整评估"""
+        genes = np.array(genes, dtype=np.float64)
+        changed = np.nonzero((genes != parent.genes).any(axis=1))[0]
+        n = len(genes)
+        if len(changed) == 0:
+            return parent
+        if len(changed) * 2 > n:
+            return self.evaluate(genes)
+
+        changed_list = changed.tolist()
+        geoms = parent.geoms.copy()
+        bounds = parent.bounds.copy()
+        inside = parent.inside.copy()
+        outside_area = parent.outside_area.copy()
+        neighbors = list(parent.neighbors)  # 写时复制：只复制被修改的字典
+        overlaps = parent.overlaps
+        overlap_area = parent.overlap_area
+
+        # 移除变化零件原有的重叠关系
+        removed = {(min(k, m), max(k, m)) for k in changed_list for m in parent.neighbors[k]}
+        overlaps -= len(removed)
+        for a, b in removed:
+            overlap_area -= parent.neighbors[a][b]
+            for i, j in ((a, b), (b, a)):
+                if neighbors[i] is parent.neighbors[i]:
+                    neighbors[i] = dict(neighbors[i])
+                del neighbors[i][j]
+
+        sheet_idx = genes[:, 3].astype(np.int64)
+        new_geoms = self._place(genes, changed_list)
+        geoms[changed] = new_geoms
+        bounds[changed] = shapely.bounds(new_geoms)
+        inside[changed] = self.sheet_set.contains(new_geoms, sheet_idx[changed], bounds[changed])
+        outside_area[changed] = self._outside_area(new_geoms, sheet_idx[changed], inside[changed])
+
+        # 变化零件 vs 未变化零件：在父代占用索引中查询包围盒相交的候选
+        b = bounds[changed]
+        query_idx, tree_idx = parent.tree.query(shapely.box(b[:, 0], b[:, 1], b[:, 2], b[:, 3]))
+        src = changed[query_idx]
+        keep = (sheet_idx[src] == sheet_idx[tree_idx]) & ~np.isin(tree_idx, changed)
+        src, dst = src[keep], tree_idx[keep]
+        # 变化零件之间两两检测
+        if len(changed) > 1:
+            ci, cj = np.triu_indices(len(changed), k=1)
+            same = sheet_idx[changed[ci]] == sheet_idx[changed[cj]]
+            src = np.concatenate([src, changed[ci[same]]])
+            dst = np.concatenate([dst, changed[cj[same]]])
+
+        if len(src):
+            profiling.count('intersects', len(src))
+            hits = shapely.intersects(geoms[src], geoms[dst])
+            src, dst = src[hits], dst[hits]
+            areas = self._overlap_areas(geoms[src], geoms[dst])
+            for a, c, area in zip(src.tolist(), dst.tolist(), areas.tolist()):
+                for i, j in ((a, c), (c, a)):
+                    if neighbors[i] is parent.neighbors[i]:
+                        neighbors[i] = dict(neighbors[i])
+                    neighbors[i][j] = area
+                overlaps += 1
+                overlap_area += area
+
+        return EvaluationState(genes, geoms, bounds, inside, outside_area, neighbors, overlaps,
+                               overlap_area,
+                               self._score(genes, inside, overlaps, outside_area, overlap_area))
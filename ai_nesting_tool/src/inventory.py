@@ -0,0 +1,182 @@
+import json
+import math
+
+import numpy as np
+from shapely.geometry import Polygon
+
+from .sheets import Sheet, as_sheet, rectangle_sheet
+
+
+class StockItem:
+    """库存中的一种标准板：尺寸、数量与单张价格（缺省按面积计价）
+
+    quantity 为 None 表示数量不限，consume() 不会扣减。
+    """
+
+    __slots__ = ('sheet', 'quantity', 'cost')
+
+    def __init__(self, sheet, quantity=1, cost=None):
+        self.sheet = as_sheet(sheet)
+        self.quantity = None if quantity is None else int(quantity)
+        self.cost = float(self.sheet.area if cost is None else cost)
+
+    @property
+    def unlimited(self):
+        return self.quantity is None
+
+    def available(self, need):
+        """最多能提供的张数"""
+        return need if self.unlimited else min(need, self.quantity)
+
+    def __repr__(self):
+        quantity = 'unlimited' if self.unlimited else self.quantity
+        return f"StockItem({self.sheet!r}, quantity={quantity}, cost={self.cost:g})"
+
+
+def _dims(parts):
+    """每个零件包围盒的 (短边, 长边)"""
+    return [tuple(sorted((b[2] - b[0], b[3] - b[1]))) for b in (p.bounds for p in parts)]
+
+
+def _fits(dims, sheet):
+    """零件包围盒（允许旋转 90 度）能否放进板材包围盒"""
+    short, long_ = min(sheet.width, sheet.height), max(sheet.width, sheet.height)
+    return dims[0] <= short + 1e-9 and dims[1] <= long_ + 1e-9
+
+
+class SheetInventory:
+    """板材库存：多种尺寸的标准板加不规则余料
+
+    select() 为一次排样挑选板材：先用能放下零件的余料，再选总价最低的一种标准板。
+    余料按面积排序建立索引，数百块余料时也只需一次二分查找即可排除过小的余料。
+    """
+
+    def __init__(self, stock=(), remnants=()):
+        self.stock = [s if isinstance(s, StockItem) else StockItem(*s) for s in stock]
+        self.remnants = [as_sheet(r) for r in remnants]
+        self._index = None
+
+    @classmethod
+    def default(cls, width=1200, height=1200, quantity=None):
+        """单一尺寸的标准板库存，对应原来固定的板材尺寸；缺省数量不限，多次排样不会耗尽"""
+        return cls([StockItem(rectangle_sheet(width, height), quantity)])
+
+    @classmethod
+    def from_dict(cls, data):
+        """由 {"stock": [{"width", "height", "quantity", "cost"}], "remnants": [{"points", "name"}]} 构造"""
+        inventory = cls()
+        for item in data.get('stock', []):
+            inventory.add_stock(item['width'], item['height'], item.get('quantity', 1),
+                                item.get('cost'))
+        for item in data.get('remnants', []):
+            inventory.add_remnant(Polygon(item['points']), item.get('name'))
+        return inventory
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def add_stock(self, width, height, quantity=1, cost=None):
+        self.stock.append(StockItem(rectangle_sheet(width, height), quantity, cost))
+
+    def add_remnant(self, remnant, name=None):
+        sheet = remnant if isinstance(remnant, Sheet) else Sheet(remnant, name)
+        self.remnants.append(sheet)
+        self._index = None
+
+    def _remnant_index(self):
+        """余料面积索引：(升序面积数组, 对应的余料下标)"""
+        if self._index is None:
+            areas = np.array([r.area for r in self.remnants], dtype=np.float64)
+            order = np.argsort(areas, kind='stable')
+            self._index = (areas[order], order)
+        return self._index
+
+    def usable_remnants(self, min_area, min_dims=(0.0, 0.0)):
+        """面积不小于 min_area、且能放下 min_dims 包围盒的余料，按面积从大到小排列"""
+        areas, order = self._remnant_index()
+        start = np.searchsorted(areas, min_area, side='left')
+        candidates = [self.remnants[k] for k in order[start:][::-1].tolist()]
+        return [r for r in candidates if _fits(min_dims, r)]
+
+    def select(self, parts, fill_factor=0.8, spare=1):
+        """为零件挑选板材，返回 Sheet 列表（余料在前），可直接作为 NestingOptimizer 的 sheets
+
+        标准板张数按“剩余零件面积 / (板面积 × fill_factor)”估算并多留 spare 张；
+        所有零件都能放下的尺寸中选总价最低者，库存不足时优先选择能覆盖需求的尺寸。
+        """
+        parts = list(parts)
+        if not parts:
+            raise ValueError("Parts list cannot be empty")
+        areas = [p.area for p in parts]
+        dims = _dims(parts)
+        largest = (max(d[0] for d in dims), max(d[1] for d in dims))
+        smallest = min(dims)
+
+        remnants = self.usable_remnants(min(areas), smallest)
+        remaining = max(sum(areas) - sum(r.area for r in remnants) * fill_factor, 0.0)
+
+        best = None
+        for item in self.stock:
+            if item.available(1) <= 0 or not _fits(largest, item.sheet):
+                continue
+            need = math.ceil(remaining / (item.sheet.area * fill_factor)) + spare
+            count = item.available(need)
+            key = (count < need, count * item.cost)
+            if best is None or key < best[0]:
+                best = (key, item, count)
+
+        sheets = list(remnants)
+        if best is not None:
+            sheets += [best[1].sheet] * best[2]
+        if not sheets:
+            raise ValueError("No sheet in inventory can hold the parts")
+        return sheets
+
+    def stock_item(self, sheet):
+        """sheet 对应的库存标准板（按对象判断），不是库存标准板时返回 None"""
+        return next((item for item in self.stock if item.sheet is sheet), None)
+
+    def extra_sheet(self, parts, sheets=()):
+        """选出的板材不够用时补开的标准板
+
+        优先沿用 sheets 中已选的标准板，否则取放得下所有零件且仍有库存的最便宜标准板；
+        没有可用的标准板时返回 None。
+        """
+        for sheet in sheets:
+            if self.stock_item(sheet) is not None:
+                return sheet
+        dims = _dims(parts)
+        largest = (max(d[0] for d in dims), max(d[1] for d in dims))
+        items = [item for item in self.stock
+                 if item.available(1) > 0 and _fits(largest, item.sheet)]
+        return min(items, key=lambda item: item.cost).sheet if items else None
+
+    def consume(self, sheets):
+        """排样完成后从库存中扣除实际用到的板材（余料整块移除）
+
+        有板材不在库存中或用量超过库存数量时抛出 ValueError，库存保持不变。
+        """
+        remnant_ids = {id(r) for r in self.remnants}
+        used_remnants, counts = set(), {}
+        for sheet in sheets:
+            item = self.stock_item(sheet)
+            if item is not None:
+                counts[id(item)] = counts.get(id(item), 0) + 1
+            elif id(sheet) in remnant_ids:
+                used_remnants.add(id(sheet))
+            else:
+                raise ValueError(f"{sheet!r} is not in the inventory")
+        for item in self.stock:
+            used = counts.get(id(item), 0)
+            if item.available(used) < used:
+                raise ValueError(f"Inventory has {item.quantity} of {item.sheet!r}, "
+                                 f"layout uses {used}")
+
+        if used_remnants:
+            self.remnants = [r for r in self.remnants if id(r) not in used_remnants]
+            self._index = None
+        for item in self.stock:
+            if not item.unlimited:
+                item.quantity -= counts.get(id(item), 0)
@@ -0,0 +1,181 @@
+import multiprocessing
+
+import numpy as np
+import shapely
+
+from . import profiling
+from .batch_fitness import BatchFitnessEvaluator
+from .geometry_cache import PartGeometryCache
+from .population import Population, truncation_select, uniform_crossover
+from .sheets import Sheet, SheetSet
+
+
+def _island_main(conn, parts_wkb, sheets_wkb, config, seed):
+    """岛屿进程：持有独立的种群与评估器，按协调进程的指令进化若干代并交换个体
+
+    消息格式：收到 (代数, 移民数组, 移民得分)，回复 (每代最优, 每代均值, 迁出数组, 迁出得分,
+    本周期的计数器)；收到 None 时退出。初始种群的计数随第一次回复发出。
+    """
+    parts = shapely.from_wkb(parts_wkb)
+    sheet_set = SheetSet([Sheet(p) for p in shapely.from_wkb(sheets_wkb)])
+    angle_step = config['angle_step']
+    geometry_cache = None
+    if angle_step:
+        geometry_cache = PartGeometryCache(parts, angle_step, config['cache_size'],
+                                           rotations=config['rotations'])
+    evaluator = BatchFitnessEvaluator(parts, sheet_set, geometry_cache=geometry_cache,
+                                      mode=config['mode'], penalty_weight=config['penalty_weight'])
+
+    rng = np.random.default_rng(seed)
+    size = config['size']
+    n_parents = size // 2
+    population = Population.random(rng, size, len(parts), config['width'], config['height'],
+                                   len(sheet_set), angle_step, config['rotations'])
+    with profiling.collect() as counters:
+        scores = evaluator.evaluate(population.as_array())
+
+    try:
+        while True:
+            msg = conn.recv()
+            if msg is None:
+                break
+            generations, immigrants, immigrant_scores = msg
+            if immigrants is not None and len(immigrants):
+                # 移民替换本岛最差的个体，得分由来源岛屿计算，无需重新评估
+                worst = np.argsort(scores, kind='stable')[:len(immigrants)]
+                arr = population.as_array()
+                arr[worst] = immigrants
+                population = Population.from_array(arr)
+                scores[worst] = immigrant_scores
+
+            best_history, mean_history = [], []
+            with profiling.collect() as epoch_counters:
+                for _ in range(generations):
+                    elite = truncation_select(scores, n_parents)
+                    parents = population.take(elite)
+                    offspring = uniform_crossover(rng, parents, size - n_parents, angle_step,
+                                                  config['rotations'])
+                    population = parents.concat(offspring)
+                    scores = np.concatenate([scores[elite],
+                                             evaluator.evaluate(offspring.as_array())])
+                    best_history.append(float(scores.max()))
+                    mean_history.append(float(scores.mean()))
+
+            # 至少迁出一个个体，协调进程据此跟踪全局最优
+            emigrants = truncation_select(scores, max(1, config['migrants']))
+            counters.update(epoch_counters)
+            conn.send((best_history, mean_history, population.as_array()[emigrants],
+                       scores[emigrants], dict(counters)))
+            counters.clear()
+    finally:
+        conn.close()
+
+
+class IslandModel:
+    """岛屿模型遗传算法：N 个子种群在独立进程中进化，每隔若干代沿环形拓扑交换最优个体
+
+    stats 记录每个岛屿的最优值、均值历史与迁入次数。
+    """
+
+    def __init__(self, parts, sheet_set, islands, island_size, width, height,
+                 migration_interval=10, migrants=2, angle_step=None, cache_size=20000,
+                 mode='binary', penalty_weight=10.0, seed=None, rotations=None):
+        if islands < 2:
+            raise ValueError("Island model requires at least two islands")
+        self.islands = int(islands)
+        self.migration_interval = max(1, int(migration_interval))
+        island_size = max(int(island_size), 4)
+        self.parts_wkb = shapely.to_wkb(np.asarray(list(parts), dtype=object))
+        self.sheets_wkb = shapely.to_wkb(np.asarray([s.polygon for s in sheet_set], dtype=object))
+        self.config = {
+            'size': island_size,
+            'width': width,
+            'height': height,
+            'migrants': min(max(0, int(migrants)), island_size // 2),
+            'angle_step': angle_step,
+            'cache_size': cache_size,
+            'mode': mode,
+            'penalty_weight': penalty_weight,
+            'rotations': rotations,
+        }
+        self.seeds = np.random.SeedSequence(seed).spawn(self.islands)
+        self.stats = []
+
+    def run(self, generations, controller, on_generation=None):
+        """进化直到 controller 判定停止或达到 generations 代，返回 (全局最优染色体, 得分)
+
+        on_generation(代数, 全局最优, 各岛均值, 累计评估数) 在每个迁移周期结束后逐代调用。
+        """
+        ctx = multiprocessing.get_context()
+        conns, processes = [], []
+        self.stats = [{'island': i, 'best': 0.0, 'mean': 0.0, 'generations': 0,
+                       'immigrants': 0, 'best_history': []} for i in range(self.islands)]
+        best, best_score = None, -np.inf
+        size = self.config['size']
+        # 初始种群各评估一次，之后每代每岛评估 size - size // 2 个子代
+        evaluations = self.islands * size
+        per_generation = self.islands * (size - size // 2)
+        try:
+            for seed in self.seeds:
+                parent_conn, child_conn = ctx.Pipe()
+                process = ctx.Process(target=_island_main,
+                                      args=(child_conn, self.parts_wkb, self.sheets_wkb,
+                                            self.config, seed),
+                                      daemon=True)
+                process.start()
+                child_conn.close()
+                conns.append(parent_conn)
+                processes.append(process)
+
+            immigrants = [(None, None)] * self.islands
+            generations = max(1, int(generations))
+            done = 0
+            while done < generations:
+                epoch = min(self.migration_interval, generations - done)
+                for conn, (arr, scores) in zip(conns, immigrants):
+                    conn.send((epoch, arr, scores))
+                replies = [conn.recv() for conn in conns]
+                done += epoch
+
+                for stat, (best_history, mean_history, arr, scores, counters) in zip(self.stats,
+                                                                                      replies):
+                    profiling.merge(counters)
+                    stat['generations'] += epoch
+                    stat['best'] = best_history[-1]
+                    stat['mean'] = mean_history[-1]
+                    stat['best_history'].extend(best_history)
+                    if len(scores) and scores[0] > best_score:
+                        best, best_score = arr[0], float(scores[0])
+
+                # 环形迁移：岛 i 的最优个体迁入岛 i+1
+                k = self.config['migrants']
+                immigrants = [(replies[i - 1][2][:k], replies[i - 1][3][:k])
+                              for i in range(self.islands)]
+                for stat, (arr, _) in zip(self.stats, immigrants):
+                    stat['immigrants'] += len(arr)
+
+                # 各代全局最优逐代交给终止控制器，停止判断以迁移周期为粒度
+                stop = False
+                gen_means = np.mean([r[1] for r in replies], axis=0)
+                for k, gen_best in enumerate(np.max([r[0] for r in replies], axis=0)):
+                    evaluations += per_generation
+                    if on_generation is not None:
+                        on_generation(done - epoch + k, float(gen_best), float(gen_means[k]),
+                                      evaluations)
+                    stop = controller.update(gen_best)
+                    if stop:
+                        break
+                if stop:
+                    break
+
+            for conn in conns:
+                conn.send(None)
+            for process in processes:
+                process.join()
+        finally:
+            for conn in conns:
+                conn.close()
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+        return best, best_score
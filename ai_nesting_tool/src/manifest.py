@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import platform
+import time
+import uuid
+
+import numpy as np
+import shapely
+
+
+def _jsonable(value):
+    """参数转换为可写入 JSON 的形式；取消标记等运行期对象记为 None"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    return None
+
+
+def solution_hash(solution):
+    """排样结果的哈希，用于比较两次运行是否逐位一致"""
+    arr = np.asarray(solution, dtype=np.float64)
+    return hashlib.blake2b(arr.tobytes(), digest_size=16).hexdigest()
+
+
+class RunManifest:
+    """一次排样运行的清单：种子、参数、零件哈希、每代最优值与耗时
+
+    用 NestingOptimizer.replay(manifest) 以相同的种子和参数重跑，可得到完全相同的排样。
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._start = None
+
+    @classmethod
+    def start(cls, method, params, optimizer):
+        manifest = cls({
+            'method': method,
+            'seed': params.get('seed'),
+            'params': _jsonable(params),
+            'optimizer': {
+                'sheet_width': _jsonable(optimizer.sheet_width),
+                'sheet_height': _jsonable(optimizer.sheet_height),
+                'max_sheets': optimizer.max_sheets,
+                'spacing': optimizer.spacing,
+                'angle_step': optimizer.angle_step,
+                'fitness_mode': optimizer.fitness_mode,
+                'penalty_weight': optimizer.penalty_weight,
+                'rotation': _jsonable(optimizer.rotation_set.policies),
+                'sheets': [{'name': s.name, 'bounds': list(s.bounds), 'area': s.area}
+                           for s in optimizer.sheet_set],
+            },
+            'parts': [{'part_id': optimizer.part_ids[i],
+                       'hash': optimizer.library.shape(i).key,
+                       'area': float(part.area),
+                       'centroid': list(optimizer.geometry_cache.centroids[i])}
+                      for i, part in enumerate(optimizer.parts)],
+            'versions': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'shapely': shapely.__version__,
+            },
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+        manifest._start = time.perf_counter()
+        return manifest
+
+    def finish(self, optimizer, solution):
+        convergence = getattr(optimizer, 'convergence', None)
+        self.data.update({
+            'wall_time': time.perf_counter() - self._start,
+            'history': list(convergence.history) if convergence is not None else [],
+            'stop_reason': convergence.stop_reason if convergence is not None else None,
+            'solution': [list(_jsonable(gene)) for gene in solution],
+            'solution_hash': solution_hash(solution),
+            'sheets_used': len(optimizer.sheets),
+        })
+
+    @property
+    def seed(self):
+        return self.data['seed']
+
+    @property
+    def params(self):
+        return dict(self.data['params'])
+
+    def save(self, directory):
+        """写入 directory/run-<时间>-<种子>-<随机后缀>.json，返回文件路径
+
+        同一秒内的多次运行（包括 replay() 复现的同一种子）各写一个文件，不会互相覆盖。
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.data['started_at'].replace(':', '').replace('-', '')
+        path = os.path.join(directory, f"run-{stamp}-{self.seed}-{uuid.uuid4().hex[:8]}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
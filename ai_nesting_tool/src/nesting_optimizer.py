@@ -1,10 +1,37 @@
+import hashlib
+import random
+import secrets
+import time
+
 import numpy as np
-import random  # 添加这一行
-from shapely.geometry import Point
-from shapely.affinity import translate, rotate
+
+from .batch_fitness import BatchFitnessEvaluator
+from .collision import has_overlap
+from .convergence import ConvergenceController
+from .entities import transform_children
+from .engines import NestingEngine, create_engine, engine_spec
+from .events import EventBus, GenerationEvent, MessageEvent, RunFinished, RunStarted
+from .geometry_cache import PartGeometryCache
+from .holes import HoleFillingEngine
+from .incremental import EvaluationState, IncrementalEvaluator
+from .islands import IslandModel
+from .manifest import RunManifest
+from .nfp import NFPEngine
+from .parallel import ParallelFitnessPool
+from .parts import PartLibrary
+from .placement import BottomLeftDecoder, order_crossover
+from .population import Population, sparse_variation, truncation_select, uniform_crossover
+from .rectpack import RectanglePackingEngine, rectangle_indices
+from .rotation import RotationSet
+from .sheets import SheetSet, rectangle_sheet
+from .utils import LRUCache
 
 class NestingOptimizer:
-    def __init__(self, parts_data, sheet_width, sheet_height, max_sheets=10):
+    def __init__(self, parts_data, sheet_width, sheet_height, max_sheets=10,
+                 spacing=1.0, nfp_cache_size=4096, nfp_cache_dir=None, sheets=None,
+                 angle_step=None, geometry_cache_size=20000, fitness_mode='binary',
+                 penalty_weight=10.0, fitness_cache_size=100000, fitness_cache_decimals=6,
+                 inventory=None, seed=None, manifest_dir=None, events=None, rotation=None):
         if isinstance(parts_data, tuple):
             self.parts, self.main_polylines = parts_data
         else:
@@ -13,167 +40,561 @@ class NestingOptimizer:
             
         if not self.parts:
             raise ValueError("Parts list cannot be empty")
+        # 零件库：相同轮廓只保存一条几何记录，可直接传入带数量的 PartLibrary
+        if isinstance(self.parts, PartLibrary):
+            self.library = self.parts
+        else:
+            self.library = PartLibrary(self.parts)
+        self.parts = self.library.instances
+        # 稳定零件编号：第 i 件零件对应解析器的 part_id，子实体按编号索引
+        self.part_ids = list(self.library.source_ids)
+        self.entities_by_id = {main_poly.get('part_id', k): main_poly
+                               for k, main_poly in enumerate(self.main_polylines or [])}
             
+        # 板材库存：先选余料，再选总价最低的标准板
+        self.inventory = inventory
+        extra_sheet = None
+        if inventory is not None:
+            sheets = inventory.select(self.parts)
+            # 估算的板数不够时补开库存中的标准板，放置器按它的尺寸开新板
+            extra_sheet = inventory.extra_sheet(self.parts, sheets)
+            if (sheet_width is None or sheet_height is None) and extra_sheet is not None:
+                sheet_width, sheet_height = extra_sheet.width, extra_sheet.height
+            elif sheet_width is None or sheet_height is None:
+                sheet_width = max(s.width for s in sheets)
+                sheet_height = max(s.height for s in sheets)
         self.sheet_width = sheet_width
         self.sheet_height = sheet_height
+        self.spacing = spacing
+        # 板材集合：sheet_idx 对应 sheet_set 中的板材，可混合多种尺寸与不规则余料
+        if sheets:
+            self.sheet_set = SheetSet(sheets)
+            max_sheets = len(self.sheet_set)
+        else:
+            self.sheet_set = SheetSet.uniform(self.sheet_width, self.sheet_height, max_sheets)
         self.max_sheets = max_sheets
+        # 补充板：放置器用完 sheet_set 后按默认尺寸开新板，grow_sheets() 把它们并入 sheet_set；
+        # 使用库存时补充板必须是库存中同尺寸的标准板，否则无法开新板
+        if inventory is not None:
+            self.extra_sheet = extra_sheet if extra_sheet is not None and (
+                (extra_sheet.width, extra_sheet.height) == (self.sheet_width, self.sheet_height)) \
+                else None
+        elif self.sheet_width is None or self.sheet_height is None:
+            self.extra_sheet = None
+        else:
+            self.extra_sheet = rectangle_sheet(self.sheet_width, self.sheet_height)
         self.sheets = {}
         self.transformed_entities = {}  # 用于存储变换后的所有实体（包括子实体）
+        self.island_stats = []  # 岛屿模型下每个岛屿的统计信息
+        # 旋转策略：rotation 为策略名（所有零件）或每个零件的策略列表，缺省时读取解析器
+        # 按图层给出的策略；受约束零件只会出现在允许角度上
+        if rotation is None:
+            rotation = [self.entities_by_id.get(pid, {}).get('rotation', 'free')
+                        for pid in self.part_ids]
+        elif isinstance(rotation, str):
+            rotation = [rotation] * len(self.parts)
+        self.rotation_set = RotationSet(rotation)
+        if len(self.rotation_set) != len(self.parts):
+            raise ValueError("Rotation policies must match the number of parts")
+        # GA 算子只在存在受约束零件时才做角度约束，不受约束的任务随机数序列保持不变
+        self._rotations = None if self.rotation_set.free else self.rotation_set
+        # 旋转后零件形状缓存：角度按 angle_step 量化，评估时只需平移
+        self.angle_step = angle_step
+        self.geometry_cache_size = geometry_cache_size
+        self.geometry_cache = PartGeometryCache(self.parts, angle_step, geometry_cache_size,
+                                                library=self.library, rotations=self._rotations)
+        # binary：重叠或越界即为 0；penalty：按重叠/越界面积连续扣分
+        self.fitness_mode = fitness_mode
+        self.penalty_weight = penalty_weight
+        self.batch_evaluator = BatchFitnessEvaluator(
+            self.parts, self.sheet_set,
+            geometry_cache=self.geometry_cache if angle_step else None,
+            mode=fitness_mode, penalty_weight=penalty_weight)
+        # 适应度缓存：按量化后染色体的哈希记录得分，精英个体跨代不再重复评估
+        self.fitness_cache = LRUCache(fitness_cache_size)
+        self.fitness_cache_decimals = fitness_cache_decimals
+        # NFP 引擎：相同几何+角度的 NFP 只计算一次，可选持久化到磁盘
+        self.nfp_cache_size = nfp_cache_size
+        self.nfp_cache_dir = nfp_cache_dir
+        # 随机种子：所有随机步骤都由它派生；每次运行的清单写入 manifest_dir
+        self.seed = seed
+        self.manifest_dir = manifest_dir
+        self.manifest = None
+        self.convergence = None
+        self._run_seed = None
+        # 进度事件流：optimizer.events.subscribe(callback) 订阅，替代逐代 print
+        self.events = events if events is not None else EventBus()
+        self.evaluations = 0  # 本次运行的累计适应度计算次数（缓存命中不计）
+        self.hole_plan = {}  # 内孔嵌套方案：{零件序号: (宿主序号, 孔内位置, 相对角度)}
+        self.nfp_engine = NFPEngine(self.parts, self.sheet_width, self.sheet_height,
+                                    spacing=spacing, cache_size=nfp_cache_size,
+                                    cache_dir=nfp_cache_dir, geometry_cache=self.geometry_cache,
+                                    sheet_set=self.sheet_set)
 
     def fitness(self, solution):
         """计算适应度，确保返回浮点数"""
         try:
+            if self.fitness_mode == 'penalty':
+                return self.fitness_batch([solution])[0]
+
             # 如果只有一个零件，处理特殊情况
             if len(self.parts) == 1:
                 if not solution or len(solution) != 1:
                     return 0.0
                     
                 x, y, angle, sheet_idx = solution[0]
-                part = rotate(self.parts[0], angle, origin='centroid')
-                part = translate(part, x, y)
+                part = self.geometry_cache.place(0, angle, x, y)
                 
                 # 检查是否在板材内
-                sheet_boundary = Point(0, 0).buffer(self.sheet_width, self.sheet_height)
-                if not sheet_boundary.contains(part):
+                if not self.sheet_set.contains([part], [int(sheet_idx)])[0]:
                     return 0.0
                     
                 # 单个零件，计算材料利用率
                 total_area = float(part.area)
-                sheet_area = self.sheet_width * self.sheet_height
+                sheet_area = self.sheet_set[int(sheet_idx)].area
                 return total_area / sheet_area
             
             # 多个零件的处理逻辑（原代码）
             if not solution or len(solution) != len(self.parts):
-                print(f"Invalid solution in fitness: {solution}")
                 return 0.0
                 
             sheets_used = {}
             for i, (x, y, angle, sheet_idx) in enumerate(solution):
-                part = rotate(self.parts[i], angle, origin='centroid')
-                part = translate(part, x, y)
+                part = self.geometry_cache.place(i, angle, x, y)
                 if sheet_idx not in sheets_used:
                     sheets_used[sheet_idx] = []
                 sheets_used[sheet_idx].append(part)
             
             for sheet_idx, parts in sheets_used.items():
-                for i, p1 in enumerate(parts):
-                    for p2 in parts[i+1:]:
-                        if p1.intersects(p2):
-                            return 0.0
-                    if not Point(0, 0).buffer(self.sheet_width, self.sheet_height).contains(p1):
-                        return 0.0
+                if not self.sheet_set.contains(parts, [int(sheet_idx)] * len(parts)).all():
+                    return 0.0
+                # 包围盒粗检测后只对候选对做精确相交检测
+                if has_overlap(parts):
+                    return 0.0
             
             total_area = float(sum(p.area for p in self.parts))
-            total_sheet_area = len(sheets_used) * self.sheet_width * self.sheet_height
+            total_sheet_area = sum(self.sheet_set[int(i)].area for i in sheets_used)
             if total_sheet_area == 0:
                 return 0.0
             return total_area / total_sheet_area
             
         except Exception as e:
-            print(f"Error in fitness: {e}")
+            if self.events.active:
+                self.events.emit(MessageEvent('warning', f"Error in fitness: {e}"))
             return 0.0
 
-    def genetic_algorithm(self, population_size=100, generations=50):
+    def grow_sheets(self, count):
+        """排样用到了 sheet_set 之外的板材时，追加补充板使 sheet_set 至少有 count 张"""
+        if count <= len(self.sheet_set):
+            return
+        if self.extra_sheet is None:
+            raise ValueError(f"Layout needs {count} sheets but only {len(self.sheet_set)} are available")
+        if self.inventory is not None:
+            # 补开的板材同样受库存数量限制，否则 consume() 时库存对不上
+            item = self.inventory.stock_item(self.extra_sheet)
+            total = count - len(self.sheet_set) + sum(1 for s in self.sheet_set.sheets
+                                                      if s is self.extra_sheet)
+            if item.available(total) < total:
+                raise ValueError(f"Layout needs {total} sheets of {self.extra_sheet!r} "
+                                 f"but the inventory has {item.quantity}")
+        self.sheet_set.grow(count, self.extra_sheet)
+
+    def used_sheets(self):
+        """当前排样结果实际用到的板材（Sheet 对象），可交给 SheetInventory.consume 扣减库存"""
+        return [self.sheet_set[int(i)] for i in sorted(self.sheets)
+                if 0 <= int(i) < len(self.sheet_set)]
+
+    def fitness_batch(self, population):
+        """批量计算整个种群的适应度，返回与 population 等长的列表"""
+        return self.batch_evaluator.evaluate(population).tolist()
+
+    def chromosome_key(self, individual):
+        """染色体的稳定哈希：数值按 fitness_cache_decimals 取整，与进程、运行次数无关"""
+        arr = np.round(np.asarray(individual, dtype=np.float64), self.fitness_cache_decimals) + 0.0
+        return hashlib.blake2b(arr.tobytes(), digest_size=16).digest()
+
+    def _cached_evaluate(self, population, evaluate):
+        """先查适应度缓存，只把未命中的个体交给 evaluate 批量计算"""
+        population = np.asarray(population, dtype=np.float64)
+        keys = [self.chromosome_key(ind) for ind in population]
+        scores = [self.fitness_cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = evaluate(population[missing])
+            self.evaluations += len(missing)
+            for i, score in zip(missing, computed):
+                scores[i] = score
+                self.fitness_cache.put(keys[i], score)
+        return scores
+
+    def _resolve_seed(self, seed=None):
+        """显式种子 > 外层运行的种子 > 构造时的种子 > 新生成的随机种子"""
+        for candidate in (seed, self._run_seed, self.seed):
+            if candidate is not None:
+                return int(candidate)
+        return secrets.randbits(64)
+
+    def _run_with_manifest(self, method, params, run):
+        """执行一次运行并生成清单；嵌套调用（如引擎内部调用遗传算法）只由最外层记录"""
+        if self._run_seed is not None:
+            return run(**params)
+        manifest = RunManifest.start(method, params, self)
+        self.convergence = None
+        self.evaluations = 0
+        self._run_seed = params['seed']
+        if self.events.active:
+            self.events.emit(RunStarted(method, params['seed'], len(self.parts),
+                                        len(self.sheet_set)))
+        try:
+            result = run(**params)
+        finally:
+            self._run_seed = None
+        manifest.finish(self, result)
+        self.manifest = manifest
+        path = manifest.save(self.manifest_dir) if self.manifest_dir else None
+        if self.events.active:
+            conv = self.convergence
+            self.events.emit(RunFinished(
+                method, params['seed'], conv.best if conv is not None else None,
+                conv.stop_reason if conv is not None else None, len(self.sheets),
+                self.evaluations, manifest.data['wall_time'], path))
+        return result
+
+    def _report_generation(self, source, generation, best, mean):
+        """发出一代的进度事件；没有监听器时直接返回，不计算任何指标"""
+        if not self.events.active:
+            return
+        elapsed = self.convergence.elapsed if self.convergence is not None else 0.0
+        self.events.emit(GenerationEvent(
+            source, generation, float(best), float(mean), self.evaluations,
+            self.evaluations / elapsed if elapsed > 0 else 0.0,
+            self.fitness_cache.stats()['hit_rate'], elapsed))
+
+    def replay(self, manifest):
+        """按清单中的方法、参数和种子重跑，返回新的排样结果"""
+        if isinstance(manifest, str):
+            manifest = RunManifest.load(manifest)
+        method = manifest.data['method']
+        if method not in ('genetic_algorithm', 'optimize'):
+            raise ValueError(f"Cannot replay method: {method}")
+        return getattr(self, method)(**manifest.params)
+
+    def genetic_algorithm(self, population_size=100, generations=50, workers=None,
+                          decoder=None, rotations=(0, 90, 180, 270), incremental=False,
+                          mutation_rate=0.05, target_utilization=None, stall_generations=None,
+                          time_budget=None, cancel_token=None, seed=None, islands=None,
+                          migration_interval=10, migrants=2):
+        """遗传算法排样；seed 为 None 时自动生成并记入运行清单，相同种子与参数的结果逐位一致"""
+        params = dict(locals())
+        del params['self']
+        params['seed'] = self._resolve_seed(seed)
+        return self._run_with_manifest('genetic_algorithm', params, self._genetic_algorithm)
+
+    def _genetic_algorithm(self, population_size, generations, workers, decoder, rotations,
+                           incremental, mutation_rate, target_utilization, stall_generations,
+                           time_budget, cancel_token, seed, islands, migration_interval,
+                           migrants):
+        # 终止条件：达到目标利用率、连续若干代无提升、超出时间预算或被取消时提前返回当前最优解
+        self.convergence = ConvergenceController(generations, target_utilization,
+                                                 stall_generations, time_budget, cancel_token)
+
+        # 解码器模式：染色体为放置顺序+旋转索引，由底部-左侧放置器解码为合法排样
+        if decoder is not None:
+            return self._decoder_genetic_algorithm(population_size, generations, decoder,
+                                                   rotations, seed)
+
         # 对单个零件进行优化处理
         if len(self.parts) == 1:
-            print("单零件优化...")
+            rng = random.Random(seed)
             # 简化的单零件优化
             best_fitness = 0.0
             best_solution = None
-            
-            # 获取零件的边界框
-            minx, miny, maxx, maxy = self.parts[0].bounds
-            part_width = maxx - minx
-            part_height = maxy - miny
-            
-            # 生成一些随机位置和角度的候选解
-            attempts = 0
-            max_attempts = 500  # 增加尝试次数
-            
-            while attempts < max_attempts:
-                attempts += 1
-                
-                # 确保零件完全在板内
-                margin_x = max(0, self.sheet_width - part_width)
-                margin_y = max(0, self.sheet_height - part_height)
-                
-                # 如果零件太大放不进板材，使用中心位置
-                x = random.uniform(0, max(1, margin_x)) if margin_x > 0 else self.sheet_width / 2
-                y = random.uniform(0, max(1, margin_y)) if margin_y > 0 else self.sheet_height / 2
-                
-                # 使用多种角度尝试
-                angles = [0, 90, 180, 270] if attempts < 100 else [random.uniform(0, 360)]
-                
-                for angle in angles:
-                    solution = [(x, y, angle, 0)]  # 单零件总是放在第一个板上
-                    fit = self.fitness(solution)
-                    
-                    if fit > best_fitness:
-                        best_fitness = fit
-                        best_solution = solution
-                        print(f"找到更好的解决方案: 位置=({x:.2f}, {y:.2f}), 角度={angle}, 适应度={fit:.4f}")
-                        
-                        # 如果找到合理好的解决方案就提前结束
-                        if fit > 0.1:  # 根据您的需求调整阈值
+            started = time.perf_counter()
+            max_attempts = 500  # 每张板材的尝试次数
+            part_area = self.parts[0].area
+            # 按 sheet_set 的顺序（余料在前）逐张尝试，位置在该板材自身的范围内随机选取
+            for sheet_idx, sheet in enumerate(self.sheet_set.sheets):
+                if sheet.area < part_area:
+                    continue
+                sx0, sy0, sx1, sy1 = sheet.bounds
+                # 单零件在同一张板上的合法解利用率都相同，找到一个即可停止
+                best_possible = part_area / sheet.area * (1 - 1e-9)
+                budget = None if time_budget is None else max(
+                    time_budget - (time.perf_counter() - started), 0.0)
+                self.convergence = ConvergenceController(
+                    max_attempts,
+                    best_possible if target_utilization is None else min(target_utilization, best_possible),
+                    stall_generations, budget, cancel_token)
+
+                for attempt in range(max_attempts):
+                    # 使用多种角度尝试
+                    angles = [0, 90, 180, 270] if attempt < 100 else [rng.uniform(0, 360)]
+                    angles = self.rotation_set.choices_for(0, angles)
+                    fit = 0.0
+                    for angle in angles:
+                        minx, miny, maxx, maxy = self.geometry_cache.place(0, angle, 0.0, 0.0).bounds
+                        if maxx - minx > sheet.width or maxy - miny > sheet.height:
+                            continue
+                        # 确保零件包围盒完全在板材范围内
+                        x = rng.uniform(sx0 - minx, sx1 - maxx)
+                        y = rng.uniform(sy0 - miny, sy1 - maxy)
+                        solution = [(x, y, angle, sheet_idx)]
+                        fit = self.fitness(solution)
+                        self.evaluations += 1
+
+                        if fit > best_fitness:
+                            best_fitness = fit
+                            best_solution = solution
                             break
-            
+
+                    self._report_generation('single', attempt, best_fitness, fit)
+                    if self.convergence.update(best_fitness):
+                        break
+                if best_solution is not None or self.convergence.stop_reason in ('time_budget',
+                                                                                  'cancelled'):
+                    break
+
             # 如果没有找到任何有效解决方案，创建一个默认解决方案
             if best_solution is None:
-                print("警告: 未找到有效解决方案，使用默认中心位置")
-                # 默认放在板材中心
-                default_x = self.sheet_width / 2
-                default_y = self.sheet_height / 2
-                best_solution = [(default_x, default_y, 0, 0)]
-            
-            print(f"最终解决方案: {best_solution}, 适应度: {best_fitness:.4f}")
+                if self.events.active:
+                    self.events.emit(MessageEvent('warning', "未找到有效解决方案，使用默认中心位置"))
+                # 默认放在第一张板材中心
+                sx0, sy0, sx1, sy1 = self.sheet_set[0].bounds
+                cx, cy = self.geometry_cache.centroids[0]
+                best_solution = [((sx0 + sx1) / 2 - cx, (sy0 + sy1) / 2 - cy, 0, 0)]
+
             self.sheets = self._layout_sheets(best_solution)
             return best_solution
-            
-        # 多零件优化的原逻辑
-        population = [[(random.uniform(0, self.sheet_width * 0.8), 
-                        random.uniform(0, self.sheet_height * 0.8), 
-                        random.uniform(0, 360), 
-                        random.randint(0, self.max_sheets-1)) for _ in range(len(self.parts))] 
-                      for _ in range(population_size)]
-        
-        print(f"Initial population size: {len(population)}")
+
+        # 多零件优化：种群以 NumPy 数组存储，选择、交叉、变异对整个种群向量化执行
+        rng = np.random.default_rng(seed)
+        population_size = max(population_size, 4)
+        use_islands = bool(islands and islands > 1)
+        if not use_islands:
+            # 岛屿模式下各岛在子进程中生成自己的种群，主进程不创建主种群
+            population = Population.random(rng, population_size, len(self.parts),
+                                           self.sheet_width, self.sheet_height, self.max_sheets,
+                                           self.angle_step, self._rotations)
+
+        if use_islands:
+            # 岛屿模型：population_size 为每个岛屿的种群大小，各岛在独立进程中进化
+            model = IslandModel(self.parts, self.sheet_set, islands, population_size,
+                                self.sheet_width, self.sheet_height,
+                                migration_interval=migration_interval, migrants=migrants,
+                                angle_step=self.angle_step, cache_size=self.geometry_cache_size,
+                                mode=self.fitness_mode, penalty_weight=self.penalty_weight,
+                                seed=seed, rotations=self._rotations)
+            on_generation = None
+            if self.events.active:
+                def on_generation(gen, best, mean, evaluations):
+                    self.evaluations = evaluations
+                    self._report_generation('islands', gen, best, mean)
+            best, best_score = model.run(generations, self.convergence, on_generation)
+            self.island_stats = model.stats
+            population = Population.from_array(best[np.newaxis])
+            final_scores = [best_score]
+        elif incremental:
+            # 增量模式：子代只在少数基因上与父代不同，只重算变化的零件
+            population, final_scores = self._evolve_incremental(
+                rng, population, population_size, generations, mutation_rate)
+        else:
+            pool = None
+            evaluate = self.fitness_batch
+            if workers and workers > 1:
+                # 多进程模式：零件几何只传输一次，每代只分发染色体
+                pool = ParallelFitnessPool(self.parts, self.sheet_set, workers,
+                                           angle_step=self.angle_step,
+                                           cache_size=self.geometry_cache_size,
+                                           mode=self.fitness_mode,
+                                           penalty_weight=self.penalty_weight,
+                                           rotations=self._rotations)
+                evaluate = pool.evaluate
+            try:
+                def cached_evaluate(pop):
+                    return self._cached_evaluate(pop, evaluate)
+
+                population = self._evolve(rng, population, population_size, generations,
+                                          cached_evaluate)
+                final_scores = cached_evaluate(population.as_array())
+            finally:
+                if pool is not None:
+                    pool.close()
         
+        if not len(population):
+            raise ValueError("Population is empty after evolution")
+        best_solution = population.individual(int(np.argmax(final_scores)))
+        if not best_solution or len(best_solution) != len(self.parts):
+            raise ValueError(f"Invalid best_solution length: {len(best_solution)}")
+        self.sheets = self._layout_sheets(best_solution)
+        return best_solution
+
+    def optimize(self, engine='auto', fill_holes=False, seed=None, **options):
+        """用指定的搜索引擎排样：'ga'、'anneal'、'compact'、NestingEngine 实例，
+        或 'auto'（按零件数选择最快的策略），options 传给引擎构造函数；
+        fill_holes=True 时先把小零件嵌入大零件的内孔
+
+        引擎实例按名称与构造参数记入运行清单并据此重建，实例自带的种子即本次运行的种子；
+        无法按名称重建的实例抛出 ValueError。
+        """
+        if isinstance(engine, NestingEngine):
+            options = engine_spec(engine)
+            engine = options.pop('name')
+            engine_seed = options.pop('seed', None)
+            if engine_seed is not None:
+                seed = engine_seed
+        # base 等参数中的引擎实例同样转换为可记录的形式
+        options = {key: engine_spec(value) for key, value in options.items()}
+        params = dict(options, engine=engine, fill_holes=fill_holes,
+                      seed=self._resolve_seed(seed))
+        return self._run_with_manifest('optimize', params, self._optimize)
+
+    def _optimize(self, engine, fill_holes, seed, **options):
+        if engine == 'auto' and rectangle_indices(self.parts):
+            # 含轴对齐矩形零件时由矩形装箱处理，不规则零件再交给通用引擎
+            engine = RectanglePackingEngine.name
+        if fill_holes:
+            return HoleFillingEngine(engine, **options).run(self)
+        return create_engine(engine, len(self.parts), **options).run(self)
+
+    def subset(self, indices):
+        """只包含部分零件的优化器，板材与参数与当前优化器相同"""
+        sub = NestingOptimizer(
+            [self.parts[i] for i in indices], self.sheet_width, self.sheet_height,
+            max_sheets=self.max_sheets, spacing=self.spacing,
+            nfp_cache_size=self.nfp_cache_size, nfp_cache_dir=self.nfp_cache_dir,
+            sheets=list(self.sheet_set.sheets), angle_step=self.angle_step,
+            geometry_cache_size=self.geometry_cache_size, fitness_mode=self.fitness_mode,
+            penalty_weight=self.penalty_weight, fitness_cache_size=self.fitness_cache.maxsize,
+            fitness_cache_decimals=self.fitness_cache_decimals, seed=self._resolve_seed(),
+            events=self.events, rotation=[self.rotation_set.policies[i] for i in indices])
+        sub.extra_sheet = self.extra_sheet
+        return sub
+
+    def nfp_placement(self, order=None, angles=(0, 90, 180, 270)):
+        """基于 NFP 的确定性排样：按顺序直接选取可行位置，不再随机采样后剔除重叠"""
+        if order is None:
+            # 默认按面积从大到小放置
+            order = sorted(range(len(self.parts)), key=lambda i: self.parts[i].area, reverse=True)
+        order = list(order)
+        solution = self.nfp_engine.place(order, [self.rotation_set.choices_for(i, angles)
+                                                 for i in order])
+        self.sheets = self._layout_sheets(solution)
+        return solution
+
+    def _decoder_genetic_algorithm(self, population_size, generations, placer, rotations, seed):
+        """排列编码的遗传算法：每个个体都可解码为可行解，无需 max_sheets 随机分板"""
+        rng = random.Random(seed)
+        bl_decoder = BottomLeftDecoder(self.nfp_engine, self.sheet_width, self.sheet_height,
+                                       rotations=rotations, placer=placer, spacing=self.spacing,
+                                       sheet_set=self.sheet_set, rotation_set=self._rotations)
+        n = len(self.parts)
+        population_size = max(population_size, 4)
+        # 第一个个体使用“面积从大到小、不旋转”的经典启发式
+        by_area = sorted(range(n), key=lambda i: self.parts[i].area, reverse=True)
+        population = [(by_area, [0] * n)]
+        population += [(rng.sample(range(n), n), [rng.randrange(len(rotations)) for _ in range(n)])
+                       for _ in range(population_size - 1)]
+
+        def decoded_score(ind):
+            key = (placer, tuple(rotations), self.chromosome_key(np.concatenate([ind[0], ind[1]])))
+            score = self.fitness_cache.get(key)
+            if score is None:
+                score = bl_decoder.decode(*ind)[1]
+                self.evaluations += 1
+                self.fitness_cache.put(key, score)
+            return score
+
         for gen in range(generations):
-            scores = []
-            for ind in population:
-                fit = self.fitness(ind)
-                scores.append((fit, ind))
-            print(f"Generation {gen}: Sample scores = {scores[:5]}")
-            if not scores:
-                raise ValueError("Scores list is empty")
-            scores = sorted(scores, key=lambda x: x[0], reverse=True)
+            scores = sorted(((decoded_score(ind), ind) for ind in population),
+                            key=lambda x: x[0], reverse=True)
+            self._report_generation('decoder', gen, scores[0][0],
+                                    sum(sc for sc, _ in scores) / len(scores))
+            if self.convergence.update(scores[0][0]):
+                break
             parents = [ind for _, ind in scores[:population_size//2]]
             offspring = []
-            for _ in range(population_size//2):
-                p1, p2 = random.sample(parents, 2)
-                child = [(random.choice([p1[i][j], p2[i][j]]) + random.uniform(-1, 1) 
-                          if j < 3 else random.choice([p1[i][j], p2[i][j]]) 
-                          for j in range(4)) for i in range(len(self.parts))]
-                if not child or len(child) != len(self.parts):
-                    print(f"Invalid child generated: {child}")
-                    child = p1  # 回退到父代，避免空解
-                offspring.append(child)
+            for _ in range(population_size - len(parents)):
+                (o1, r1), (o2, r2) = rng.sample(parents, 2)
+                order = order_crossover(o1, o2, rng)
+                rot = [rng.choice(pair) for pair in zip(r1, r2)]
+                # 变异：交换两个零件的放置顺序，改变一个零件的旋转
+                if n > 1 and rng.random() < 0.5:
+                    i, j = rng.sample(range(n), 2)
+                    order[i], order[j] = order[j], order[i]
+                if rng.random() < 0.5:
+                    rot[rng.randrange(n)] = rng.randrange(len(rotations))
+                offspring.append((order, rot))
             population = parents + offspring
-            # 过滤无效解
-            population = [ind for ind in population if ind and len(ind) == len(self.parts)]
-            print(f"Population size after generation {gen}: {len(population)}")
-        
-        if not population:
-            raise ValueError("Population is empty after evolution")
-        print(f"Final population sample: {population[:5]}")
-        best_solution = max(population, key=self.fitness)
-        print(f"Best solution: {best_solution}")
-        if not best_solution or len(best_solution) != len(self.parts):
-            raise ValueError(f"Invalid best_solution: {best_solution}")
+
+        best = max(population, key=decoded_score)
+        best_solution, best_score = bl_decoder.decode(*best)
         self.sheets = self._layout_sheets(best_solution)
-        print(f"Generated sheets: {list(self.sheets.keys())}")
         return best_solution
 
+    def _evolve_incremental(self, rng, population, population_size, generations, mutation_rate):
+        """增量评估的世代循环：子代复制一个父代，只有少量基因来自另一父代并加扰动
+
+        初始种群一次批量评估；子代先查适应度缓存，命中的子代不计算评估状态，
+        只有在被选为父代时才由它的父代派生。
+        """
+        evaluator = IncrementalEvaluator(self.geometry_cache, self.sheet_set,
+                                         self.batch_evaluator.total_area,
+                                         mode=self.fitness_mode,
+                                         penalty_weight=self.penalty_weight,
+                                         batch_evaluator=self.batch_evaluator)
+        states = evaluator.evaluate_many(population.as_array())
+        self.evaluations += len(states)
+        scores = np.array([st.score for st in states])
+        for genes, score in zip(population.as_array(), scores.tolist()):
+            self.fitness_cache.put(self.chromosome_key(genes), score)
+        n_parents = population_size // 2
+        n_genes = max(1, int(round(len(self.parts) * mutation_rate)))
+        for gen in range(generations):
+            self._report_generation('incremental', gen, scores.max(), scores.mean())
+            elite = truncation_select(scores, n_parents)
+            if self.convergence.update(scores[elite[0]]):
+                break
+            parents = population.take(elite)
+            # 缓存命中的子代保存为 (父代状态, 基因)，被选为父代时才派生
+            parent_states = [states[i] if isinstance(states[i], EvaluationState)
+                             else evaluator.derive(*states[i]) for i in elite]
+            offspring, origin = sparse_variation(rng, parents, population_size - n_parents,
+                                                 n_genes, self.angle_step, self._rotations)
+            child_states, child_scores = [], []
+            for i, genes in zip(origin.tolist(), offspring.as_array()):
+                key = self.chromosome_key(genes)
+                score = self.fitness_cache.get(key)
+                if score is None:
+                    state = evaluator.derive(parent_states[i], genes)
+                    score = state.score
+                    self.fitness_cache.put(key, score)
+                    self.evaluations += 1
+                    child_states.append(state)
+                else:
+                    child_states.append((parent_states[i], genes))
+                child_scores.append(score)
+            states = parent_states + child_states
+            scores = np.concatenate([scores[elite], child_scores])
+            population = parents.concat(offspring)
+        return population, scores.tolist()
+
+    def _evolve(self, rng, population, population_size, generations, evaluate):
+        """执行遗传算法的世代循环，evaluate 为批量适应度函数"""
+        n_parents = population_size // 2
+        for gen in range(generations):
+            scores = np.asarray(evaluate(population.as_array()), dtype=np.float64)
+            if not len(scores):
+                raise ValueError("Scores list is empty")
+            self._report_generation('ga', gen, scores.max(), scores.mean())
+            elite = truncation_select(scores, n_parents)
+            if self.convergence.update(scores[elite[0]]):
+                break
+            parents = population.take(elite)
+            offspring = uniform_crossover(rng, parents, population_size - n_parents,
+                                          self.angle_step, self._rotations)
+            population = parents.concat(offspring)
+        return population
+
     def _layout_sheets(self, solution):
         # 增加安全检查
         if not solution:
@@ -181,14 +602,16 @@ class NestingOptimizer:
             
         if len(solution) != len(self.parts):
             raise ValueError(f"Invalid solution length: expected {len(self.parts)}, got {len(solution)}")
+        # 天际线、NFP 与矩形放置在板材用完时会开新板，排样结果落定后并入 sheet_set
+        self.grow_sheets(max(int(gene[3]) for gene in solution) + 1)
             
         sheets = {}
         self.transformed_entities = {}
+        placed = []  # (sheet_idx, 零件序号, 变换后的主轮廓, 主轮廓实体信息)
         
         for i, (x, y, angle, sheet_idx) in enumerate(solution):
             # 变换主要部件
-            part = rotate(self.parts[i], angle, origin='centroid')
-            part = translate(part, x, y)
+            part = self.geometry_cache.place(i, angle, x, y)
             
             if sheet_idx not in sheets:
                 sheets[sheet_idx] = []
@@ -196,46 +619,25 @@ class NestingOptimizer:
                 
             sheets[sheet_idx].append(part)
             
-            # 如果有子实体信息，也对它们进行变换
-            if self.main_polylines:
-                for main_poly in self.main_polylines:
-                    if main_poly['polygon'] == self.parts[i]:
-                        # 创建一个包含所有变换后实体的字典
-                        transformed_entity = {
-                            'main': part,
-                            'children': []
-                        }
-                        
-                        # 变换所有子实体
-                        for child in main_poly['children']:
-                            if child['type'] == 'circle':
-                                # 变换圆心
-                                old_center = Point(child['center'])
-                                new_center = rotate(old_center, angle, origin='centroid')
-                                new_center = translate(new_center, x, y)
-                                
-                                # 变换多边形表示
-                                transformed_poly = rotate(child['polygon'], angle, origin='centroid')
-                                transformed_poly = translate(transformed_poly, x, y)
-                                
-                                transformed_entity['children'].append({
-                                    'type': 'circle',
-                                    'center': (new_center.x, new_center.y),
-                                    'radius': child['radius'],
-                                    'polygon': transformed_poly
-                                })
-                            elif child['type'] == 'polyline':
-                                # 变换多段线
-                                transformed_poly = rotate(child['polygon'], angle, origin='centroid')
-                                transformed_poly = translate(transformed_poly, x, y)
-                                
-                                transformed_entity['children'].append({
-                                    'type': 'polyline',
-                                    'polygon': transformed_poly
-                                })
-                        
-                        self.transformed_entities[sheet_idx].append(transformed_entity)
-                        break
+            # 如果有子实体信息，按零件编号直接查找
+            main_poly = self.entities_by_id.get(self.part_ids[i])
+            if main_poly is not None:
+                placed.append((sheet_idx, i, part, main_poly))
+        
+        # 所有子实体一次性批量变换：绕父零件质心旋转（与主轮廓使用相同的量化角度）后平移
+        if placed:
+            rows = [i for _, i, _, _ in placed]
+            children = transform_children(
+                [main_poly['children'] for _, _, _, main_poly in placed],
+                [self.geometry_cache.centroids[i] for i in rows],
+                [self.geometry_cache.quantize(solution[i][2], i) for i in rows],
+                [solution[i][:2] for i in rows])
+            for (sheet_idx, i, part, _), part_children in zip(placed, children):
+                self.transformed_entities[sheet_idx].append({
+                    'part_id': self.part_ids[i],
+                    'main': part,
+                    'children': part_children
+                })
         
         if not sheets:
             raise ValueError("No sheets generated from solution")
@@ -0,0 +1,200 @@
+import hashlib
+import os
+
+import numpy as np
+import shapely
+from shapely.affinity import translate
+from shapely.geometry import MultiPoint, Polygon, box
+
+from .geometry_cache import PartGeometryCache
+from .utils import LRUCache
+
+
+def _is_convex(polygon):
+    return polygon.area >= polygon.convex_hull.area * (1 - 1e-9)
+
+
+def _edges(polygon):
+    coords = np.asarray(polygon.exterior.coords)
+    return coords[:-1], coords[1:]
+
+
+def minkowski_sum(a, b):
+    """两个简单多边形的 Minkowski 和 a ⊕ b（只考虑外轮廓）"""
+    a = Polygon(a.exterior)
+    b = Polygon(b.exterior)
+    ca = np.asarray(a.exterior.coords)[:-1]
+    cb = np.asarray(b.exterior.coords)[:-1]
+
+    # 凸多边形：顶点两两相加后的凸包即为结果
+    if _is_convex(a) and _is_convex(b):
+        return MultiPoint((ca[:, np.newaxis, :] + cb[np.newaxis, :, :]).reshape(-1, 2)).convex_hull
+
+    # 一般情况：边界由所有边对的平行四边形覆盖，内部由平移副本填充
+    a0, a1 = _edges(a)
+    b0, b1 = _edges(b)
+    p00 = (a0[:, np.newaxis] + b0[np.newaxis]).reshape(-1, 2)
+    p10 = (a1[:, np.newaxis] + b0[np.newaxis]).reshape(-1, 2)
+    p11 = (a1[:, np.newaxis] + b1[np.newaxis]).reshape(-1, 2)
+    p01 = (a0[:, np.newaxis] + b1[np.newaxis]).reshape(-1, 2)
+    rings = np.stack([p00, p10, p11, p01, p00], axis=1)
+    quads = shapely.polygons(rings)
+    quads = quads[shapely.area(quads) > 1e-12]
+    pieces = list(quads) + [translate(a, *cb[0]), translate(b, *ca[0])]
+    return shapely.union_all(pieces)
+
+
+class NFPEngine:
+    """No-Fit Polygon 计算与缓存
+
+    零件以“绕质心旋转后、质心平移到原点”的形状为参考，NFP 描述的是移动零件质心
+    不可进入的区域。结果按 (规范形状哈希, 角度) 缓存在内存 LRU 中，可选写入磁盘目录，
+    以便相同零件库的重复任务直接复用。给出 sheet_set 时第 k 张板按 sheet_set[k] 的
+    实际范围放置，不规则余料还要扣除轮廓外的区域；超出 sheet_set 的板使用
+    sheet_width × sheet_height。
+    """
+
+    def __init__(self, parts, sheet_width, sheet_height, spacing=1.0, cache_size=4096,
+                 cache_dir=None, geometry_cache=None, sheet_set=None):
+        self.parts = list(parts)
+        self.sheet_width = sheet_width
+        self.sheet_height = sheet_height
+        self.sheet_set = sheet_set
+        self.spacing = spacing
+        self.cache = LRUCache(cache_size)
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self.geometry_cache = geometry_cache or PartGeometryCache(self.parts)
+        self.centroids = self.geometry_cache.centroids
+
+    def shape(self, idx, angle):
+        """零件 idx 旋转 angle 度后、质心位于原点的形状"""
+        return self.geometry_cache.get(idx, angle).polygon
+
+    def nfp(self, a, angle_a, b, angle_b):
+        """固定零件 a、移动零件 b 的 NFP（a 的质心位于原点）"""
+        # 形状哈希与规范角度与零件在图纸中的位置、朝向无关，相同轮廓的多件零件共享 NFP
+        key_of = self.geometry_cache.key
+        key = key_of(a, angle_a) + key_of(b, angle_b) + (self.spacing,)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        path = None
+        if self.cache_dir:
+            name = hashlib.sha1(repr(key).encode()).hexdigest() + '.wkb'
+            path = os.path.join(self.cache_dir, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    result = shapely.from_wkb(f.read())
+
+        if result is None:
+            fixed = self.shape(a, angle_a)
+            if self.spacing > 0:
+                fixed = fixed.buffer(self.spacing, join_style='mitre')
+            orbiting = shapely.transform(self.shape(b, angle_b), lambda c: -c)
+            result = minkowski_sum(fixed, orbiting)
+            if path:
+                with open(path, 'wb') as f:
+                    f.write(shapely.to_wkb(result))
+
+        self.cache.put(key, result)
+        return result
+
+    def sheet(self, sheet_idx=None):
+        """第 sheet_idx 张板材；None 或超出 sheet_set 时返回 None，表示默认尺寸的矩形板"""
+        if self.sheet_set is not None and sheet_idx is not None and sheet_idx < len(self.sheet_set):
+            return self.sheet_set[sheet_idx]
+        return None
+
+    def inner_fit_rect(self, idx, angle, sheet_idx=None):
+        """移动零件质心在板材包围盒内的可行矩形 (minx, miny, maxx, maxy)，放不下时返回 None
+
+        sheet_idx 为 None 时按默认尺寸 sheet_width × sheet_height 计算。
+        """
+        minx, miny, maxx, maxy = self.shape(idx, angle).bounds
+        sheet = self.sheet(sheet_idx)
+        if sheet is None:
+            x0, y0, x1, y1 = 0.0, 0.0, self.sheet_width, self.sheet_height
+        else:
+            x0, y0, x1, y1 = sheet.bounds
+        rect = (x0 - minx, y0 - miny, x1 - maxx, y1 - maxy)
+        if rect[2] < rect[0] or rect[3] < rect[1]:
+            return None
+        return rect
+
+    def outside_nfp(self, sheet_idx, idx, angle):
+        """不规则余料：包围盒内、余料轮廓外的区域对零件 idx 的 NFP（质心不可进入的区域）"""
+        key = ('sheet', sheet_idx) + self.geometry_cache.key(idx, angle)
+        result = self.cache.get(key)
+        if result is None:
+            sheet = self.sheet_set[sheet_idx]
+            outside = box(*sheet.bounds).difference(sheet.polygon)
+            orbiting = shapely.transform(self.shape(idx, angle), lambda c: -c)
+            pieces = [minkowski_sum(piece, orbiting) for piece in shapely.get_parts(outside)
+                      if piece.area > 1e-12]
+            result = shapely.union_all(pieces) if pieces else Polygon()
+            self.cache.put(key, result)
+        return result
+
+    def feasible_region(self, placed, idx, angle, sheet_idx=None):
+        """在已放置零件 placed [(part_idx, angle, (cx, cy)), ...] 的板材上，零件 idx 的可行区域"""
+        rect = self.inner_fit_rect(idx, angle, sheet_idx)
+        if rect is None:
+            return None
+        region = box(*rect)
+        sheet = self.sheet(sheet_idx)
+        if sheet is not None and not sheet.is_rectangle:
+            region = region.difference(self.outside_nfp(sheet_idx, idx, angle))
+        if placed:
+            blocked = [translate(self.nfp(j, a, idx, angle), cx, cy) for j, a, (cx, cy) in placed]
+            region = region.difference(shapely.union_all(blocked))
+        return None if region.is_empty else region
+
+    def best_position(self, placed, idx, angles, sheet_idx=None):
+        """底部-左侧优先：返回 (质心位置, 角度)，无可行位置时返回 None"""
+        sheet = self.sheet(sheet_idx)
+        best = None
+        for angle in angles:
+            region = self.feasible_region(placed, idx, angle, sheet_idx)
+            if region is None:
+                continue
+            shape = self.shape(idx, angle)
+            _, _, maxx, maxy = shape.bounds
+            coords = shapely.get_coordinates(region)
+            if sheet is not None and not sheet.is_rectangle:
+                # 可行区域的顶点正好贴着余料边界，浮点误差可能使零件略微越界，逐个复核
+                moved = np.array([translate(shape, x, y) for x, y in coords], dtype=object)
+                coords = coords[shapely.contains(sheet.polygon, moved)]
+            for x, y in coords:
+                key = (y + maxy, x + maxx)
+                if best is None or key < best[0]:
+                    best = (key, (float(x), float(y)), angle)
+        return None if best is None else (best[1], best[2])
+
+    def place(self, order, angle_choices):
+        """按 order 依次放置零件，angle_choices[k] 为 order[k] 的候选角度
+
+        依次尝试已开的板材，放不下时按 sheet_set 的顺序开新板，返回按零件序号排列的
+        [(x, y, angle, sheet_idx), ...]
+        """
+        sheets = []
+        solution = [None] * len(self.parts)
+        for idx, angles in zip(order, angle_choices):
+            found = None
+            sheet_idx = 0
+            while found is None:
+                if sheet_idx == len(sheets):
+                    sheets.append([])
+                found = self.best_position(sheets[sheet_idx], idx, angles, sheet_idx)
+                if found is None and not sheets[sheet_idx] and self.sheet(sheet_idx) is None:
+                    # 默认尺寸的空板也放不下
+                    raise ValueError(f"Part {idx} does not fit on the sheet")
+                if found is None:
+                    sheet_idx += 1
+            (tx, ty), angle = found
+            sheets[sheet_idx].append((idx, angle, (tx, ty)))
+            cx, cy = self.centroids[idx]
+            solution[idx] = (tx - cx, ty - cy, angle, sheet_idx)
+        return solution
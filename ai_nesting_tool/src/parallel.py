@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import shapely
+
+from . import profiling
+from .batch_fitness import BatchFitnessEvaluator
+from .geometry_cache import PartGeometryCache
+from .rotation import RotationSet
+from .sheets import Sheet, SheetSet
+
+# 每个工作进程各自持有一份评估器，零件几何只在进程启动时传输一次
+_worker_evaluator = None
+
+
+def _init_worker(parts_wkb, sheets_wkb, angle_step, cache_size, mode, penalty_weight,
+                 policies=None):
+    global _worker_evaluator
+    parts = shapely.from_wkb(parts_wkb)
+    sheet_set = SheetSet([Sheet(p) for p in shapely.from_wkb(sheets_wkb)])
+    geometry_cache = None
+    if angle_step:
+        # 与主进程的缓存使用相同的旋转策略，受约束零件取同一个允许角度
+        rotations = RotationSet(policies) if policies is not None else None
+        geometry_cache = PartGeometryCache(parts, angle_step, cache_size, rotations=rotations)
+    _worker_evaluator = BatchFitnessEvaluator(parts, sheet_set, geometry_cache=geometry_cache,
+                                              mode=mode, penalty_weight=penalty_weight)
+
+
+def _evaluate_chunk(chunk):
+    # 工作进程中的 intersects 等计数随得分一起返回，由主进程计入当前阶段
+    with profiling.collect() as counters:
+        scores = _worker_evaluator.evaluate(chunk)
+    return scores, dict(counters)
+
+
+class ParallelFitnessPool:
+    """多进程适应度评估：每代只向工作进程分发染色体数组
+
+    rotations（RotationSet）的策略随零件几何一起传给工作进程，保证与串行评估结果一致。
+    """
+
+    def __init__(self, parts, sheet_set, workers, angle_step=None, cache_size=20000,
+                 mode='binary', penalty_weight=10.0, rotations=None):
+        self.workers = int(workers)
+        parts_wkb = shapely.to_wkb(np.asarray(list(parts), dtype=object))
+        sheets_wkb = shapely.to_wkb(np.asarray([s.polygon for s in sheet_set], dtype=object))
+        policies = None if rotations is None or rotations.free else rotations.policies
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(parts_wkb, sheets_wkb, angle_step, cache_size, mode, penalty_weight,
+                      policies),
+        )
+
+    def evaluate(self, population):
+        """并行计算整个种群的适应度，结果顺序与 population 一致"""
+        arr = np.asarray(population, dtype=np.float64)
+        chunks = [c for c in np.array_split(arr, self.workers) if len(c)]
+        results = list(self.executor.map(_evaluate_chunk, chunks))
+        for _, counters in results:
+            profiling.merge(counters)
+        return np.concatenate([scores for scores, _ in results]).tolist()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
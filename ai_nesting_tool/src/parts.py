@@ -0,0 +1,111 @@
+import hashlib
+import math
+
+import numpy as np
+import shapely
+from shapely.affinity import rotate, translate
+from shapely.geometry.polygon import orient
+
+
+def _ring_coords(ring, cx, cy):
+    return np.asarray(ring.coords)[:-1] - (cx, cy)
+
+
+def canonical_form(polygon, decimals=3):
+    """规范几何：返回 (哈希, 规范形状, 角度)
+
+    轮廓统一为逆时针、质心平移到原点，再旋转使最长边与 x 轴对齐（多条最长边时取
+    坐标字典序最小者）。polygon 平移到原点后旋转 angle 度即与规范形状重合，
+    因此只差平移或旋转的零件得到相同的哈希。
+    """
+    polygon = orient(polygon, 1.0)
+    c = polygon.centroid
+    ext = _ring_coords(polygon.exterior, c.x, c.y)
+    holes = [_ring_coords(ring, c.x, c.y) for ring in polygon.interiors]
+    edges = np.roll(ext, -1, axis=0) - ext
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    candidates = np.nonzero(lengths >= lengths.max() * (1 - 1e-6))[0]
+
+    best = None
+    for k in candidates.tolist():
+        phi = math.atan2(edges[k, 1], edges[k, 0])
+        cos_p, sin_p = math.cos(-phi), math.sin(-phi)
+        matrix = np.array([[cos_p, sin_p], [-sin_p, cos_p]])
+        blob = (np.round(np.roll(ext, -k, axis=0) @ matrix, decimals) + 0.0).tobytes()
+        # 孔的起点不确定，按排序后的顶点比较
+        hole_blobs = sorted((np.sort(np.round(h @ matrix, decimals) + 0.0, axis=0)).tobytes()
+                            for h in holes)
+        blob = b'|'.join([blob] + hole_blobs)
+        if best is None or blob < best[0]:
+            best = (blob, -math.degrees(phi))
+
+    blob, angle = best
+    digest = hashlib.blake2b(blob, digest_size=16).hexdigest()
+    canonical = rotate(translate(polygon, -c.x, -c.y), angle, origin=(0, 0))
+    return digest, canonical, angle
+
+
+class ShapeRecord:
+    """唯一形状的几何记录：规范形状（质心位于原点）、面积与数量"""
+
+    __slots__ = ('key', 'polygon', 'area', 'quantity')
+
+    def __init__(self, key, polygon):
+        shapely.prepare(polygon)
+        self.key = key
+        self.polygon = polygon
+        self.area = float(polygon.area)
+        self.quantity = 0
+
+
+class PartLibrary:
+    """零件库：相同轮廓（允许平移、旋转）共享一条 ShapeRecord 并记录数量
+
+    instances 为逐件展开的零件列表，与染色体中的基因一一对应；shape_ids 与
+    base_angles 给出每件零件对应的形状及其相对规范形状的旋转角，旋转、NFP 与
+    面积计算都只需按唯一形状进行一次。source_ids 为每件零件在输入列表中的下标，
+    即解析器给出的 part_id。
+    """
+
+    def __init__(self, parts, quantities=None, decimals=3):
+        parts = list(parts)
+        if quantities is None:
+            quantities = [1] * len(parts)
+        if len(quantities) != len(parts):
+            raise ValueError("quantities must match parts")
+        self.decimals = decimals
+        self.shapes = []
+        self.instances = []
+        self.shape_ids = []
+        self.base_angles = []
+        self.source_ids = []
+        index = {}
+        for source_id, (polygon, quantity) in enumerate(zip(parts, quantities)):
+            key, canonical, angle = canonical_form(polygon, decimals)
+            sid = index.get(key)
+            if sid is None:
+                sid = index[key] = len(self.shapes)
+                self.shapes.append(ShapeRecord(key, canonical))
+            self.shapes[sid].quantity += int(quantity)
+            for _ in range(int(quantity)):
+                self.instances.append(polygon)
+                self.shape_ids.append(sid)
+                self.base_angles.append(-angle)
+                self.source_ids.append(source_id)
+
+    @classmethod
+    def from_quantities(cls, items, decimals=3):
+        """由 [(polygon, 数量), ...] 构造"""
+        items = list(items)
+        return cls([p for p, _ in items], [q for _, q in items], decimals)
+
+    def __len__(self):
+        return len(self.instances)
+
+    @property
+    def total_area(self):
+        return sum(s.area * s.quantity for s in self.shapes)
+
+    def shape(self, idx):
+        """第 idx 件零件对应的 ShapeRecord"""
+        return self.shapes[self.shape_ids[idx]]
@@ -0,0 +1,60 @@
+import os
+
+from . import dxf_parser
+from . import gcode_generator
+from . import threejs_exporter
+from .engines import GeneticEngine
+from .inventory import SheetInventory
+from .nesting_optimizer import NestingOptimizer
+from .profiling import PipelineProfiler, vertex_count
+from .rectpack import RectanglePackingEngine, rectangle_indices
+
+
+def run_pipeline(dxf_path, inventory=None, profiler=None, listener=None,
+                 gcode_path="output.nc", output_dir="static", manifest_dir="runs",
+                 engine=None, **options):
+    """解析 → 排样 → G 代码 → 3D 导出，返回 (optimizer, G 代码路径, 3D 文件路径)
+
+    每个阶段在 profiler 中记录耗时与计数器；listener 订阅优化器的进度事件。
+    engine 为 None 时使用遗传算法（含矩形零件时矩形交给矩形装箱，遗传算法只处理不规则零件），
+    否则调用 optimizer.optimize(engine, **options)。
+    未给出 inventory 时使用默认的 1200×1200 标准板库存。
+    """
+    if inventory is None:
+        inventory = SheetInventory.default()
+    if profiler is None:
+        profiler = PipelineProfiler(job=os.path.basename(dxf_path))
+
+    with profiler.stage('parse'):
+        parts_data = dxf_parser.parse_dxf(dxf_path)
+        profiler.count('parts', len(parts_data[0]))
+        profiler.count('vertices', vertex_count(parts_data[0]))
+
+    with profiler.stage('nest'):
+        optimizer = NestingOptimizer(parts_data, None, None, inventory=inventory,
+                                     manifest_dir=manifest_dir)
+        if listener is not None:
+            optimizer.events.subscribe(listener)
+        if engine is None and rectangle_indices(optimizer.parts):
+            optimizer.optimize(RectanglePackingEngine.name, base=GeneticEngine.name, **options)
+        elif engine is None:
+            optimizer.genetic_algorithm(**options)
+        else:
+            optimizer.optimize(engine, **options)
+        profiler.count('fitness_evals', optimizer.evaluations)
+        profiler.count('sheets_used', len(optimizer.sheets))
+
+    with profiler.stage('gcode'):
+        gcode_path = gcode_generator.generate_gcode(optimizer.sheets,
+                                                    optimizer.transformed_entities,
+                                                    file_path=gcode_path)
+        profiler.count('bytes_written', os.path.getsize(gcode_path))
+
+    with profiler.stage('export_3d'):
+        threejs_path = threejs_exporter.export_to_threejs(optimizer.sheets, optimizer.sheet_width,
+                                                          optimizer.sheet_height,
+                                                          output_dir=output_dir)
+        if threejs_path and os.path.exists(threejs_path):
+            profiler.count('bytes_written', os.path.getsize(threejs_path))
+
+    return optimizer, gcode_path, threejs_path
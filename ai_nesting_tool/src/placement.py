@@ -0,0 +1,184 @@
+import random
+
+from shapely.affinity import translate
+
+
+class SkylineSheet:
+    """单张板材的天际线：按包围盒做底部-左侧优先放置"""
+
+    def __init__(self, width, height, spacing=0.0):
+        self.width = width
+        self.height = height
+        self.spacing = spacing
+        self.skyline = [[0.0, 0.0, float(width)]]  # [x, y, 宽度]
+
+    @property
+    def empty(self):
+        return len(self.skyline) == 1 and self.skyline[0][1] == 0.0
+
+    def find(self, w, h):
+        """返回放置 w×h 包围盒的最佳左下角 (x, y)，放不下时返回 None"""
+        w += self.spacing
+        h += self.spacing
+        best = None
+        for i, (sx, _, _) in enumerate(self.skyline):
+            if sx + w > self.width + self.spacing + 1e-9:
+                break
+            y = 0.0
+            for jx, jy, _ in self.skyline[i:]:
+                if jx >= sx + w - 1e-9:
+                    break
+                y = max(y, jy)
+            if y + h > self.height + self.spacing + 1e-9:
+                continue
+            if best is None or (y + h, sx) < best[0]:
+                best = ((y + h, sx), (sx, y))
+        return None if best is None else best[1]
+
+    def add(self, x, y, w, h):
+        """在 (x, y) 放置 w×h 包围盒并更新天际线"""
+        w += self.spacing
+        h += self.spacing
+        end = x + w
+        updated = []
+        for sx, sy, sw in self.skyline:
+            ex = sx + sw
+            if ex <= x or sx >= end:
+                updated.append([sx, sy, sw])
+                continue
+            if sx < x:
+                updated.append([sx, sy, x - sx])
+            if ex > end:
+                updated.append([end, sy, ex - end])
+        updated.append([x, y + h, w])
+        updated.sort()
+
+        merged = [updated[0]]
+        for seg in updated[1:]:
+            if abs(seg[1] - merged[-1][1]) < 1e-9:
+                merged[-1][2] += seg[2]
+            else:
+                merged.append(seg)
+        self.skyline = merged
+
+
+def order_crossover(p1, p2, rng=random):
+    """顺序交叉 (OX)：保留 p1 的一段，其余位置按 p2 中的顺序填充"""
+    n = len(p1)
+    if n < 2:
+        return list(p1)
+    a, b = sorted(rng.sample(range(n + 1), 2))
+    segment = p1[a:b]
+    kept = set(segment)
+    rest = [g for g in p2 if g not in kept]
+    return rest[:a] + list(segment) + rest[a:]
+
+
+class BottomLeftDecoder:
+    """排列+旋转索引染色体解码器：任何染色体都解码为无重叠、不越界的排样
+
+    placer='skyline' 按旋转后的包围盒放置，速度快；placer='nfp' 使用 NFP 引擎按
+    真实轮廓放置，更紧凑但更慢。给出 sheet_set 时天际线放置按各板材的实际尺寸
+    依次使用（余料需通过轮廓包含检测），超出部分使用 sheet_width × sheet_height；
+    NFP 放置使用 NFP 引擎自身的 sheet_set。
+    给出 rotation_set 时每个零件只在 rotations 中自己允许的角度里选择，旋转索引按
+    各零件的候选数取模。
+    """
+
+    def __init__(self, nfp_engine, sheet_width, sheet_height, rotations=(0, 90, 180, 270),
+                 placer='skyline', spacing=0.0, sheet_set=None, rotation_set=None):
+        if placer not in ('skyline', 'nfp'):
+            raise ValueError(f"Unknown placer: {placer}")
+        self.engine = nfp_engine
+        self.sheet_width = sheet_width
+        self.sheet_height = sheet_height
+        self.rotations = list(rotations)
+        self.placer = placer
+        self.spacing = spacing
+        self.sheet_set = sheet_set
+        self.total_area = float(sum(p.area for p in nfp_engine.parts))
+        n = len(nfp_engine.parts)
+        if rotation_set is None:
+            self.options = [tuple(self.rotations)] * n
+        else:
+            self.options = [rotation_set.choices_for(i, self.rotations) for i in range(n)]
+
+    def _sheet(self, sheet_idx):
+        """第 sheet_idx 张板材：(Sheet 或 None, 原点, 宽, 高)"""
+        if self.sheet_set is not None and sheet_idx < len(self.sheet_set):
+            sheet = self.sheet_set[sheet_idx]
+            return sheet, sheet.bounds[:2], sheet.width, sheet.height
+        return None, (0.0, 0.0), self.sheet_width, self.sheet_height
+
+    def angle(self, rotation_idx, part=0):
+        options = self.options[part]
+        return options[rotation_idx % len(options)]
+
+    def decode(self, order, rotation_idx):
+        """返回 (solution, score)，solution 按零件序号排列 [(x, y, angle, sheet_idx), ...]"""
+        angles = [self.angle(r, i) for i, r in enumerate(rotation_idx)]
+        if self.placer == 'nfp':
+            # 染色体角度放不进空板时才退回到该零件的全部候选角度
+            choices = [[angles[i]] if self.engine.inner_fit_rect(i, angles[i]) is not None
+                       else self.options[i] for i in order]
+            solution = self.engine.place(order, choices)
+        else:
+            solution = self._skyline_place(order, angles)
+        return solution, self.score(solution)
+
+    def _skyline_place(self, order, angles):
+        sheets = []
+        solution = [None] * len(self.engine.parts)
+        for idx in order:
+            # 首选染色体给出的角度，放不进空板时依次尝试其他角度
+            candidates = [angles[idx]] + [a for a in self.options[idx] if a != angles[idx]]
+            placed = None
+            for angle in candidates:
+                shape = self.engine.shape(idx, angle)
+                minx, miny, maxx, maxy = shape.bounds
+                w, h = maxx - minx, maxy - miny
+                sheet_idx = 0
+                while placed is None:
+                    if sheet_idx == len(sheets):
+                        _, _, width, height = self._sheet(sheet_idx)
+                        sheets.append(SkylineSheet(width, height, self.spacing))
+                    sheet = sheets[sheet_idx]
+                    spec, (ox, oy), _, _ = self._sheet(sheet_idx)
+                    pos = sheet.find(w, h)
+                    if pos is not None and spec is not None and not spec.is_rectangle:
+                        # 不规则余料：包围盒位置还需落在余料轮廓内
+                        moved = translate(shape, ox + pos[0] - minx, oy + pos[1] - miny)
+                        if not spec.polygon.contains(moved):
+                            pos = None
+                    if pos is not None:
+                        sheet.add(pos[0], pos[1], w, h)
+                        placed = (ox + pos[0], oy + pos[1], angle, sheet_idx, minx, miny)
+                    elif spec is None and sheet.empty:
+                        # 默认尺寸的空板也放不下
+                        break
+                    sheet_idx += 1
+                if placed is not None:
+                    break
+            if placed is None:
+                raise ValueError(f"Part {idx} does not fit on the sheet")
+
+            px, py, angle, sheet_idx, minx, miny = placed
+            cx, cy = self.engine.centroids[idx]
+            solution[idx] = (px - minx - cx, py - miny - cy, angle, sheet_idx)
+        return solution
+
+    def score(self, solution):
+        """材料利用率：最后一张板只计入已用高度，使同板数的解之间仍有差别"""
+        tops = {}
+        for idx, (x, y, angle, sheet_idx) in enumerate(solution):
+            top = y + self.engine.centroids[idx][1] + self.engine.shape(idx, angle).bounds[3]
+            tops[sheet_idx] = max(tops.get(sheet_idx, float('-inf')), top)
+        last = max(tops)
+        used_area = 0.0
+        for sheet_idx, top in tops.items():
+            spec, (_, oy), width, height = self._sheet(sheet_idx)
+            if sheet_idx == last:
+                used_area += min(top - oy, height) * width
+            else:
+                used_area += spec.area if spec is not None else width * height
+        return self.total_area / used_area if used_area > 0 else 0.0
@@ -0,0 +1,137 @@
+import numpy as np
+
+
+class Population:
+    """以连续 NumPy 数组存储的种群
+
+    positions 为 (pop, parts, 2) 的 float64 平移量，angles 为 (pop, parts) 的 float64
+    角度，sheets 为 (pop, parts) 的 int32 板材号。
+    """
+
+    def __init__(self, positions, angles, sheets):
+        self.positions = np.ascontiguousarray(positions, dtype=np.float64)
+        self.angles = np.ascontiguousarray(angles, dtype=np.float64)
+        self.sheets = np.ascontiguousarray(sheets, dtype=np.int32)
+
+    @classmethod
+    def random(cls, rng, size, n_parts, width, height, max_sheets, angle_step=None,
+               rotations=None):
+        """在板材 80% 范围内随机生成初始种群；rotations 为 RotationSet 时受约束零件随机取允许角度"""
+        positions = rng.uniform(0.0, 1.0, (size, n_parts, 2)) * (width * 0.8, height * 0.8)
+        if angle_step:
+            steps = max(1, int(round(360 / angle_step)))
+            angles = rng.integers(0, steps, (size, n_parts)) * float(angle_step)
+        else:
+            angles = rng.uniform(0.0, 360.0, (size, n_parts))
+        sheets = rng.integers(0, max_sheets, (size, n_parts))
+        if rotations is not None:
+            angles = rotations.constrain(rng, angles, jump_rate=1.0)
+        return cls(positions, angles, sheets)
+
+    @classmethod
+    def from_array(cls, arr):
+        """由 (pop, parts, 4) 数组构造"""
+        arr = np.asarray(arr, dtype=np.float64)
+        return cls(arr[..., :2], arr[..., 2], np.rint(arr[..., 3]))
+
+    def __len__(self):
+        return len(self.angles)
+
+    @property
+    def n_parts(self):
+        return self.angles.shape[1]
+
+    def as_array(self):
+        """(pop, parts, 4) 的 float64 数组，供适应度评估器使用"""
+        return np.concatenate([self.positions, self.angles[..., np.newaxis],
+                               self.sheets[..., np.newaxis].astype(np.float64)], axis=2)
+
+    def take(self, idx):
+        return Population(self.positions[idx], self.angles[idx], self.sheets[idx])
+
+    def concat(self, other):
+        return Population(np.concatenate([self.positions, other.positions]),
+                          np.concatenate([self.angles, other.angles]),
+                          np.concatenate([self.sheets, other.sheets]))
+
+    def individual(self, i):
+        """第 i 个个体的 [(x, y, angle, sheet_idx), ...] 形式"""
+        return [(float(x), float(y), float(a), int(s))
+                for (x, y), a, s in zip(self.positions[i], self.angles[i], self.sheets[i])]
+
+
+def quantize_angles(angles, angle_step):
+    """向量化的角度量化，与 PartGeometryCache.quantize 一致"""
+    if angle_step:
+        angles = np.round(angles / angle_step) * angle_step
+    return np.mod(angles, 360.0) + 0.0
+
+
+def truncation_select(scores, k):
+    """截断选择：返回得分最高的 k 个个体的下标（得分相同时保持原顺序）"""
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind='stable')
+    return order[:k]
+
+
+def _parent_pairs(rng, n_parents, n_children):
+    first = rng.integers(0, n_parents, n_children)
+    second = (first + rng.integers(1, n_parents, n_children)) % n_parents
+    return first, second
+
+
+def _mutate_angles(rng, angles, angle_step, jump_rate=0.1, rotations=None, cols=None):
+    """角度变异：连续角度加 ±1 度扰动，离散角度以小概率跳到相邻档位
+
+    rotations 为 RotationSet 时，受约束零件的角度取回允许角度，并以 jump_rate 的概率换成
+    另一个允许角度；cols 为一维 angles 中每个元素的零件序号。
+    """
+    if angle_step:
+        jump = (rng.random(angles.shape) < jump_rate) * rng.choice((-1.0, 1.0), angles.shape)
+        angles = quantize_angles(angles + jump * angle_step, angle_step)
+    else:
+        angles = angles + rng.uniform(-1.0, 1.0, angles.shape)
+    if rotations is not None:
+        angles = rotations.constrain(rng, angles, cols, jump_rate)
+    return angles
+
+
+def uniform_crossover(rng, parents, n_children, angle_step=None, rotations=None):
+    """均匀交叉 + 扰动：每个基因的每个分量独立地取自两个父代之一"""
+    if len(parents) < 2:
+        raise ValueError("At least two parents are required")
+    first, second = _parent_pairs(rng, len(parents), n_children)
+    a, b = parents.take(first), parents.take(second)
+    shape = a.angles.shape
+    pick = rng.random(shape + (4,)) < 0.5
+    positions = np.where(pick[..., :2], a.positions, b.positions)
+    positions += rng.uniform(-1.0, 1.0, positions.shape)
+    angles = _mutate_angles(rng, np.where(pick[..., 2], a.angles, b.angles), angle_step,
+                            rotations=rotations)
+    sheets = np.where(pick[..., 3], a.sheets, b.sheets)
+    return Population(positions, angles, sheets)
+
+
+def sparse_variation(rng, parents, n_children, n_genes, angle_step=None, rotations=None):
+    """稀疏变异：子代复制第一个父代，只有 n_genes 个基因取自第二个父代并加扰动
+
+    返回 (子代, 第一个父代的下标)，供增量评估从父代状态派生。
+    """
+    if len(parents) < 2:
+        raise ValueError("At least two parents are required")
+    first, second = _parent_pairs(rng, len(parents), n_children)
+    child = parents.take(first)
+    donor = parents.take(second)
+    n = parents.n_parts
+    n_genes = min(max(1, n_genes), n)
+    rows = np.repeat(np.arange(n_children), n_genes)
+    cols = np.argsort(rng.random((n_children, n)), axis=1)[:, :n_genes].ravel()
+    from_donor = rng.random(len(rows)) < 0.5
+    child.positions[rows, cols] = np.where(from_donor[:, np.newaxis], donor.positions[rows, cols],
+                                           child.positions[rows, cols])
+    child.positions[rows, cols] += rng.uniform(-1.0, 1.0, (len(rows), 2))
+    child.angles[rows, cols] = _mutate_angles(
+        rng, np.where(from_donor, donor.angles[rows, cols], child.angles[rows, cols]), angle_step,
+        rotations=rotations, cols=cols)
+    child.sheets[rows, cols] = np.where(from_donor, donor.sheets[rows, cols],
+                                        child.sheets[rows, cols])
+    return child, first
@@ -0,0 +1,134 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+import shapely
+
+# 当前正在记录的阶段计数器；为 None 时 count() 只做一次判断，热点循环中几乎没有开销
+_active = None
+
+
+def count(name, n=1):
+    """向当前阶段累加计数（intersects 次数、顶点数等），没有活动阶段时忽略"""
+    if _active is not None:
+        _active[name] += int(n)
+
+
+@contextmanager
+def collect():
+    """在当前进程中单独收集计数，供工作进程把一批评估的计数发回主进程"""
+    global _active
+    counters = Counter()
+    previous, _active = _active, counters
+    try:
+        yield counters
+    finally:
+        _active = previous
+
+
+def merge(counters):
+    """把工作进程发回的计数累加到当前阶段"""
+    for name, n in counters.items():
+        count(name, n)
+
+
+def vertex_count(geoms):
+    """几何体的坐标点总数"""
+    return int(shapely.get_num_coordinates(np.asarray(list(geoms), dtype=object)).sum())
+
+
+class PipelineProfiler:
+    """流水线分阶段计时：解析 → 排样 → G 代码 → 3D 导出
+
+    每个 stage() 记录墙钟时间、CPU 时间与计数器；profile=True 时附带该阶段 cProfile
+    耗时最多的 top 个函数，trace_memory=True 时记录 tracemalloc 峰值内存。
+    report() 返回可写入 JSON 的报告，save() 为每个任务写一个文件。
+
+    并行评估与岛屿模型的工作进程用 collect() 收集计数，随结果发回后由 merge() 计入当前阶段。
+    """
+
+    def __init__(self, job=None, profile=False, trace_memory=False, top=20):
+        self.job = job
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.top = top
+        self.stages = []
+        self.started_at = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+    @contextmanager
+    def stage(self, name):
+        global _active
+        counters = Counter()
+        record = {'name': name, 'counters': counters}
+        previous, _active = _active, counters
+        profiler = cProfile.Profile() if self.profile else None
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        except BaseException as e:
+            record['error'] = repr(e)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record['wall_time'] = time.perf_counter() - wall
+            record['cpu_time'] = time.process_time() - cpu
+            if self.trace_memory:
+                record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+                if tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                record['profile'] = self._top_functions(profiler)
+            _active = previous
+            record['counters'] = dict(counters)
+            self.stages.append(record)
+
+    def count(self, name, n=1):
+        """向当前阶段累加计数，供调用方记录阶段结束后才知道的量（如写出的字节数）"""
+        count(name, n)
+
+    def _top_functions(self, profiler):
+        stats = pstats.Stats(profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in stats.stats.items():
+            rows.append({'function': f"{os.path.basename(filename)}:{line}({func})",
+                         'calls': nc, 'tottime': tt, 'cumtime': ct})
+        rows.sort(key=lambda r: r['cumtime'], reverse=True)
+        return rows[:self.top]
+
+    def report(self):
+        return {
+            'job': self.job,
+            'started_at': self.started_at,
+            'total_time': sum(s['wall_time'] for s in self.stages),
+            'stages': self.stages,
+        }
+
+    def save(self, directory):
+        """写入 directory/profile-<时间>-<任务名>-<随机后缀>.json，返回文件路径
+
+        同一秒内的多次运行（包括同一任务）各写一个文件，不会互相覆盖。
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = self.started_at.replace(':', '').replace('-', '')
+        job = re.sub(r'[^\w.-]+', '_', self.job or 'job')
+        path = os.path.join(directory, f"profile-{stamp}-{job}-{uuid.uuid4().hex[:8]}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        return path
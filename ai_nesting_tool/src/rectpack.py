@@ -0,0 +1,310 @@
+import numpy as np
+import shapely
+
+from .engines import ENGINES, NestingEngine, create_engine, engine_spec
+from .sheets import as_sheet
+
+_EPS = 1e-9
+
+
+def is_rectangle(part, tolerance=1e-6):
+    """外轮廓是否为轴对齐矩形（内孔不影响矩形排样）"""
+    if part.geom_type != 'Polygon' or part.is_empty:
+        return False
+    minx, miny, maxx, maxy = part.bounds
+    box_area = (maxx - minx) * (maxy - miny)
+    outer = shapely.area(shapely.Polygon(part.exterior))
+    return box_area > 0 and abs(outer - box_area) <= tolerance * box_area
+
+
+def rectangle_indices(parts, tolerance=1e-6):
+    return [i for i, part in enumerate(parts) if is_rectangle(part, tolerance)]
+
+
+class MaxRectsBin:
+    """MaxRects 装箱：维护所有极大空闲矩形，按最佳短边 (best short side fit) 选择位置
+
+    spacing 的处理与 SkylineSheet 相同：每个矩形向右、向上加宽 spacing，板材也加宽
+    spacing，零件之间保持间距而不在板边留白。
+    """
+
+    def __init__(self, width, height, spacing=0.0):
+        self.width = width
+        self.height = height
+        self.spacing = spacing
+        self.free = np.array([[0.0, 0.0, width + spacing, height + spacing]])  # x, y, w, h
+        self._update_limits()
+
+    def _update_limits(self):
+        """空闲矩形的最大面积、最大宽度与最大高度，用于快速排除放不下的板材"""
+        if len(self.free):
+            self.largest = float((self.free[:, 2] * self.free[:, 3]).max())
+            self.max_w, self.max_h = self.free[:, 2:4].max(axis=0).tolist()
+        else:
+            self.largest = self.max_w = self.max_h = 0.0
+
+    def find(self, w, h, rotate=True):
+        """返回 (x, y, rotated)，放不下时返回 None"""
+        best = None
+        for rotated, (rw, rh) in ((False, (w, h)), (True, (h, w)))[:2 if rotate else 1]:
+            rw += self.spacing
+            rh += self.spacing
+            dw = self.free[:, 2] - rw
+            dh = self.free[:, 3] - rh
+            ok = (dw >= -_EPS) & (dh >= -_EPS)
+            if not ok.any():
+                continue
+            short = np.where(ok, np.minimum(dw, dh), np.inf)
+            long_ = np.where(ok, np.maximum(dw, dh), np.inf)
+            k = np.lexsort((self.free[:, 0], self.free[:, 1], long_, short))[0]
+            score = (short[k], long_[k])
+            if best is None or score < best[0]:
+                best = (score, (float(self.free[k, 0]), float(self.free[k, 1]), rotated))
+        return None if best is None else best[1]
+
+    def place(self, x, y, w, h):
+        """占用 (x, y) 处的 w×h 矩形（未含间距）"""
+        self._split(x, y, w + self.spacing, h + self.spacing)
+
+    def occupy(self, minx, miny, maxx, maxy):
+        """把已放置的障碍物（如不规则零件的包围盒）从空闲区域中扣除"""
+        self._split(minx, miny, maxx - minx + self.spacing, maxy - miny + self.spacing)
+
+    def _split(self, x, y, w, h):
+        free = self.free
+        fx, fy, fw, fh = free.T
+        hit = (x < fx + fw - _EPS) & (x + w > fx + _EPS) & (y < fy + fh - _EPS) & (y + h > fy + _EPS)
+        if not hit.any():
+            return
+        hx, hy, hw, hh = free[hit].T
+        right, top = np.full_like(hx, x + w), np.full_like(hy, y + h)
+        pieces = np.concatenate([
+            np.column_stack((hx, hy, x - hx, hh)),                  # 左
+            np.column_stack((right, hy, hx + hw - right, hh)),      # 右
+            np.column_stack((hx, hy, hw, y - hy)),                  # 下
+            np.column_stack((hx, top, hw, hy + hh - top)),          # 上
+        ])
+        pieces = np.unique(pieces[(pieces[:, 2] > _EPS) & (pieces[:, 3] > _EPS)], axis=0)
+        kept = free[~hit]
+        # 新空闲矩形只可能被其他矩形包含（未受影响的矩形原本就是极大的）
+        others = np.concatenate([kept, pieces])
+        px, py = pieces[:, 0:1], pieces[:, 1:2]
+        px1, py1 = px + pieces[:, 2:3], py + pieces[:, 3:4]
+        ox, oy = others[:, 0], others[:, 1]
+        ox1, oy1 = ox + others[:, 2], oy + others[:, 3]
+        inside = (ox <= px + _EPS) & (oy <= py + _EPS) & (ox1 >= px1 - _EPS) & (oy1 >= py1 - _EPS)
+        # 与自身比较的那一项不算包含
+        inside[np.arange(len(pieces)), len(kept) + np.arange(len(pieces))] = False
+        self.free = np.concatenate([kept, pieces[~inside.any(axis=1)]])
+        self._update_limits()
+
+
+class GuillotineBin:
+    """断头切割装箱：每次放置都把空闲矩形一刀切成两块，排样可由板锯逐刀切出
+
+    按最佳面积匹配选择空闲矩形，沿剩余较短的一边切分 (shorter leftover axis)。
+    """
+
+    def __init__(self, width, height, spacing=0.0):
+        self.width = width
+        self.height = height
+        self.spacing = spacing
+        self.free = [(0.0, 0.0, width + spacing, height + spacing)]
+        self._update_limits()
+
+    def _update_limits(self):
+        self.largest = max((fw * fh for _, _, fw, fh in self.free), default=0.0)
+        self.max_w = max((fw for _, _, fw, _ in self.free), default=0.0)
+        self.max_h = max((fh for _, _, _, fh in self.free), default=0.0)
+
+    def find(self, w, h, rotate=True):
+        best = None
+        for rotated, (rw, rh) in ((False, (w, h)), (True, (h, w)))[:2 if rotate else 1]:
+            rw += self.spacing
+            rh += self.spacing
+            for k, (fx, fy, fw, fh) in enumerate(self.free):
+                if fw >= rw - _EPS and fh >= rh - _EPS:
+                    score = (fw * fh - rw * rh, min(fw - rw, fh - rh), fy, fx)
+                    if best is None or score < best[0]:
+                        best = (score, (fx, fy, rotated))
+        return None if best is None else best[1]
+
+    def place(self, x, y, w, h):
+        w += self.spacing
+        h += self.spacing
+        for k, (fx, fy, fw, fh) in enumerate(self.free):
+            if abs(fx - x) <= _EPS and abs(fy - y) <= _EPS and fw >= w - _EPS and fh >= h - _EPS:
+                break
+        else:
+            raise ValueError("Position is not the corner of a free rectangle")
+        del self.free[k]
+        dw, dh = fw - w, fh - h
+        if dw <= dh:
+            right, top = (x + w, y, dw, h), (x, y + h, fw, dh)
+        else:
+            right, top = (x + w, y, dw, fh), (x, y + h, w, dh)
+        self.free += [r for r in (right, top) if r[2] > _EPS and r[3] > _EPS]
+        self._update_limits()
+
+
+def pack_rectangles(sizes, sheet_set, spacing=0.0, rotate=True, guillotine=False,
+                    obstacles=None, first_sheet=0, extra_sheet=None):
+    """把 (宽, 高) 列表装入 sheet_set 的矩形板材，返回每个矩形的 (sheet_idx, x, y, rotated)
+
+    x, y 为矩形左下角相对板材左下角的位置，rotate 可以是布尔值或每个矩形各自的布尔值。
+    矩形按面积从大到小依次放入第一张放得下的板材，不规则余料不参与矩形排样。
+    obstacles 为 {sheet_idx: [包围盒, ...]}：MaxRects 绕开每个包围盒；断头切割模式下
+    以板材左下角到所有包围盒右上角的整块区域为障碍，先切下这一块再排剩余部分。
+    first_sheet 之前的板材不参与排样。sheet_set 用完后按 extra_sheet（Sheet 或 (宽, 高)）
+    开新板，编号接在 sheet_set 之后；extra_sheet 为 None 时放不下即报错。
+    """
+    obstacles = obstacles or {}
+    if isinstance(rotate, bool):
+        rotate = [rotate] * len(sizes)
+    usable = [k for k in range(first_sheet, len(sheet_set)) if sheet_set[k].is_rectangle]
+    extra = None if extra_sheet is None else as_sheet(extra_sheet)
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][0] * sizes[i][1], max(sizes[i])),
+                   reverse=True)
+    bins, keys = [], []
+    result = [None] * len(sizes)
+    for i in order:
+        w, h = sizes[i]
+        rw, rh = w + spacing - _EPS, h + spacing - _EPS
+        need = rw * rh
+        slot = 0
+        while result[i] is None:
+            if slot == len(bins):
+                if slot < len(usable):
+                    k, sheet = usable[slot], sheet_set[usable[slot]]
+                elif extra is not None:
+                    k, sheet = len(sheet_set) + slot - len(usable), extra
+                else:
+                    raise ValueError(f"Rectangle {i} ({w:g} x {h:g}) does not fit on any sheet")
+                ox, oy = sheet.bounds[:2]
+                boxes = obstacles.get(k, ())
+                if guillotine:
+                    bins.append(GuillotineBin(sheet.width, sheet.height, spacing))
+                    if boxes:
+                        # 障碍物所在的左下角区域作为一块整体切下，剩余部分仍可逐刀切出
+                        maxx = min(max(b[2] for b in boxes) - ox, sheet.width)
+                        maxy = min(max(b[3] for b in boxes) - oy, sheet.height)
+                        bins[-1].place(0.0, 0.0, maxx, maxy)
+                else:
+                    bins.append(MaxRectsBin(sheet.width, sheet.height, spacing))
+                    for minx, miny, maxx, maxy in boxes:
+                        bins[-1].occupy(minx - ox, miny - oy, maxx - ox, maxy - oy)
+                keys.append(k)
+                opened = slot >= len(usable)
+            else:
+                opened = False
+            # 空闲矩形的最大面积或最大宽高不够时直接跳过，已排满的板材几乎没有开销
+            b = bins[slot]
+            pos = None
+            if b.largest >= need and ((b.max_w >= rw and b.max_h >= rh) or
+                                      (rotate[i] and b.max_w >= rh and b.max_h >= rw)):
+                pos = b.find(w, h, rotate[i])
+            if pos is not None:
+                x, y, rotated = pos
+                b.place(x, y, *((h, w) if rotated else (w, h)))
+                result[i] = (keys[slot], x, y, rotated)
+            elif opened:
+                # 新开的空板也放不下
+                raise ValueError(f"Rectangle {i} ({w:g} x {h:g}) does not fit on any sheet")
+            slot += 1
+    return result
+
+
+def compact_sheet_indices(sheet_set, sheet_idx):
+    """把用到的板材号依次换到最小的、板材完全相同的空闲编号上，返回 {原编号: 新编号}"""
+    mapping, taken = {}, set()
+    for s in sorted(set(sheet_idx)):
+        target = next((k for k in range(s) if k not in taken and sheet_set[k] is sheet_set[s]), s)
+        mapping[s] = target
+        taken.add(target)
+    return mapping
+
+
+class RectanglePackingEngine(NestingEngine):
+    """矩形零件快速排样：轴对齐矩形交给 MaxRects（或断头切割）装箱
+
+    混合任务中不规则零件先由 base 引擎排样并移到编号最小的同尺寸板材上，矩形再填入
+    剩余空间（MaxRects 绕开不规则零件的包围盒；断头切割模式下先切下不规则零件所在的
+    左下角区域）。允许角度中没有 90 度整数倍的矩形零件按不规则零件处理。
+    实测（3000 块 20–300 × 20–200 的矩形、2440×1220 板材）：pack_rectangles 约 1.0 秒
+    （断头切割 0.4 秒），整个引擎含几何缓存与分板约 2 秒（断头切割 1 秒），随机器不同
+    可达 4 秒以上。
+    """
+
+    name = 'rects'
+
+    def __init__(self, base='auto', guillotine=False, rotations=(0, 90, 180, 270), **options):
+        self.base = base
+        self.guillotine = guillotine
+        self.rotations = tuple(rotations)
+        self.options = options
+
+    def config(self):
+        return dict(self.options, base=engine_spec(self.base), guillotine=self.guillotine,
+                    rotations=self.rotations)
+
+    def run(self, optimizer):
+        cache = optimizer.geometry_cache
+        n = len(optimizer.parts)
+        # 只能斜放的矩形零件无法轴对齐装箱
+        rects = [i for i in rectangle_indices(optimizer.parts)
+                 if any(a % 90 == 0 for a in optimizer.rotation_set.choices_for(i, self.rotations))]
+        rect_set = set(rects)
+        irregular = [i for i in range(n) if i not in rect_set]
+        solution = [None] * n
+
+        obstacles = {}
+        if irregular:
+            sub = optimizer.subset(irregular)
+            engine = create_engine(self.base, len(irregular), rotations=self.rotations,
+                                   **self.options)
+            genes = engine.run(sub)
+            optimizer.grow_sheets(max(int(g[3]) for g in genes) + 1)
+            # 随机搜索可能把不规则零件放在任意编号的板材上，先移到前面的板材，矩形从头填充
+            mapping = compact_sheet_indices(optimizer.sheet_set, [int(g[3]) for g in genes])
+            for i, (x, y, angle, sheet_idx) in zip(irregular, genes):
+                sheet_idx = mapping[int(sheet_idx)]
+                solution[i] = (x, y, angle, sheet_idx)
+                obstacles.setdefault(sheet_idx, []).append(cache.place(i, angle, x, y).bounds)
+            optimizer.evaluations += sub.evaluations
+            if getattr(sub, 'convergence', None) is not None:
+                optimizer.convergence = sub.convergence
+
+        # 零件允许的角度中有 90 或 270 度时矩形可以横竖互换
+        sizes, rotate, angles = [], [], []
+        for i in rects:
+            choices = [a for a in optimizer.rotation_set.choices_for(i, self.rotations)
+                       if a % 90 == 0]
+            turn = next((a for a in choices if a % 180 == 90), None)
+            upright = next((a for a in choices if a % 180 == 0), turn)
+            angles.append((upright, turn))
+            minx, miny, maxx, maxy = cache.get(i, upright).bounds
+            sizes.append((maxx - minx, maxy - miny))
+            allowed = turn is not None and upright != turn
+            if allowed:
+                # 角度量化后不是整 90 度时旋转后的包围盒会变大，此时不允许旋转
+                tx0, ty0, tx1, ty1 = cache.get(i, turn).bounds
+                allowed = (abs(tx1 - tx0 - sizes[-1][1]) <= 1e-6
+                           and abs(ty1 - ty0 - sizes[-1][0]) <= 1e-6)
+            rotate.append(allowed)
+        # 板材用完时按优化器的补充板开新板，与天际线、NFP 放置一致
+        placements = pack_rectangles(sizes, optimizer.sheet_set, optimizer.spacing,
+                                     rotate=rotate, guillotine=self.guillotine,
+                                     obstacles=obstacles, extra_sheet=optimizer.extra_sheet)
+        optimizer.grow_sheets(max((p[0] for p in placements), default=-1) + 1)
+        for i, (upright, turn), (sheet_idx, x, y, rotated) in zip(rects, angles, placements):
+            angle = turn if rotated else upright
+            minx, miny, _, _ = cache.get(i, angle).bounds
+            ox, oy = optimizer.sheet_set[sheet_idx].bounds[:2]
+            cx, cy = cache.centroids[i]
+            solution[i] = (ox + x - minx - cx, oy + y - miny - cy, angle, sheet_idx)
+
+        optimizer.sheets = optimizer._layout_sheets(solution)
+        return solution
+
+
+ENGINES[RectanglePackingEngine.name] = RectanglePackingEngine
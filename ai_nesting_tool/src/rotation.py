@@ -0,0 +1,113 @@
+import re
+
+import numpy as np
+
+# 旋转策略：None 表示任意角度；有纹理的板材通常只允许 0/180 度
+POLICIES = {
+    'free': None,
+    'flip': (0.0, 180.0),
+    'ortho': (0.0, 90.0, 180.0, 270.0),
+    'fixed': (0.0,),
+}
+
+# 图层名中的标记（按非字母数字字符分隔，不区分大小写）到旋转策略的映射
+LAYER_TOKENS = {
+    'FREE': 'free',
+    'GRAIN': 'flip',
+    'FLIP': 'flip',
+    'R180': 'flip',
+    'ORTHO': 'ortho',
+    'R90': 'ortho',
+    'FIXED': 'fixed',
+    'NOROT': 'fixed',
+}
+
+
+def policy_angles(policy):
+    """策略名或显式角度列表 → 允许的角度元组（升序，[0, 360)），任意角度返回 None"""
+    if policy is None:
+        return None
+    if isinstance(policy, str):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown rotation policy: {policy}")
+        return POLICIES[policy]
+    angles = tuple(sorted({float(a) % 360.0 + 0.0 for a in policy}))
+    if not angles:
+        raise ValueError("Rotation policy needs at least one angle")
+    return angles
+
+
+def policy_from_layer(layer, default='free'):
+    """由 DXF 图层名推断旋转策略，例如 110OO_GRAIN → 'flip'、110OO-FIXED → 'fixed'"""
+    for token in re.split(r'[^A-Za-z0-9]+', str(layer).upper()):
+        if token in LAYER_TOKENS:
+            return LAYER_TOKENS[token]
+    return default
+
+
+class RotationSet:
+    """每个零件允许的旋转角度
+
+    policies 中每一项为策略名（'free'、'flip'、'ortho'、'fixed'）或显式角度列表。
+    受约束零件的角度总是取允许角度中的一个，几何缓存与 NFP 只会遇到这些离散角度。
+    """
+
+    def __init__(self, policies):
+        self.policies = [p if p is None or isinstance(p, str) else list(policy_angles(p))
+                         for p in policies]
+        self.choices = [policy_angles(p) for p in self.policies]
+        self.constrained = [c is not None for c in self.choices]
+        self.free = not any(self.constrained)
+        width = max((len(c) for c in self.choices if c), default=1)
+        # 允许角度表：每行一个零件，不足处填 NaN，供向量化的就近取值使用
+        self.table = np.full((len(self.choices), width), np.nan)
+        for i, c in enumerate(self.choices):
+            if c:
+                self.table[i, :len(c)] = c
+        self.counts = np.array([len(c) if c else 0 for c in self.choices])
+
+    @classmethod
+    def uniform(cls, policy, n_parts):
+        return cls([policy] * n_parts)
+
+    def __len__(self):
+        return len(self.choices)
+
+    def snap(self, idx, angle):
+        """零件 idx 最接近 angle 的允许角度；不受约束时原样返回"""
+        choices = self.choices[idx]
+        if choices is None:
+            return angle
+        return min(choices, key=lambda a: abs((angle - a + 180.0) % 360.0 - 180.0))
+
+    def choices_for(self, idx, candidates):
+        """候选角度（如解码器的 rotations）中零件 idx 允许的部分，交集为空时使用策略本身的角度"""
+        choices = self.choices[idx]
+        if choices is None:
+            return tuple(candidates)
+        allowed = tuple(a for a in candidates if float(a) % 360.0 in choices)
+        return allowed or choices
+
+    def constrain(self, rng, angles, cols=None, jump_rate=0.1):
+        """把受约束零件的角度取到最近的允许角度，并以 jump_rate 的概率随机换成另一个允许角度
+
+        angles 的最后一维对应零件；也可以是一维数组并由 cols 给出每个元素的零件序号。
+        没有受约束的零件时原样返回，不消耗随机数。
+        """
+        if self.free:
+            return angles
+        angles = np.array(angles, dtype=np.float64)
+        if cols is None:
+            cols = np.broadcast_to(np.arange(len(self.choices)), angles.shape)
+        mask = np.asarray(self.constrained)[cols]
+        if not mask.any():
+            return angles
+        parts = np.asarray(cols)[mask]
+        table = self.table[parts]
+        diff = np.abs((angles[mask][:, np.newaxis] - table + 180.0) % 360.0 - 180.0)
+        pick = np.argmin(np.where(np.isnan(table), np.inf, diff), axis=1)
+        if jump_rate:
+            jump = rng.random(len(pick)) < jump_rate
+            pick[jump] = (rng.random(int(jump.sum())) * self.counts[parts[jump]]).astype(np.int64)
+        angles[mask] = table[np.arange(len(pick)), pick]
+        return angles
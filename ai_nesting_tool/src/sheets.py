@@ -0,0 +1,130 @@
+from functools import lru_cache
+
+import numpy as np
+import shapely
+from shapely.geometry import box
+from shapely.geometry.base import BaseGeometry
+
+
+class Sheet:
+    """板材边界：标准矩形板或不规则余料，几何体预先 prepare"""
+
+    def __init__(self, polygon, name=None):
+        self.polygon = polygon
+        shapely.prepare(self.polygon)
+        self.name = name
+        self.bounds = tuple(polygon.bounds)
+        self.width = self.bounds[2] - self.bounds[0]
+        self.height = self.bounds[3] - self.bounds[1]
+        self.area = float(polygon.area)
+        # 与包围盒面积相同即为轴对齐矩形，包围盒检测即可得出精确结果
+        self.is_rectangle = abs(self.area - self.width * self.height) <= 1e-9 * max(self.area, 1.0)
+
+    def __repr__(self):
+        kind = "rect" if self.is_rectangle else "remnant"
+        return f"Sheet({kind}, {self.width:g}x{self.height:g})"
+
+
+@lru_cache(maxsize=None)
+def rectangle_sheet(width, height):
+    """同一尺寸的矩形板只构造一次"""
+    return Sheet(box(0, 0, width, height), name=f"{width:g}x{height:g}")
+
+
+def as_sheet(spec):
+    """将 Sheet、(宽, 高) 或多边形（余料）统一转换为 Sheet"""
+    if isinstance(spec, Sheet):
+        return spec
+    if isinstance(spec, BaseGeometry):
+        return Sheet(spec)
+    width, height = spec
+    return rectangle_sheet(width, height)
+
+
+class SheetSet:
+    """按 sheet_idx 编号的板材集合，提供向量化的零件包含检测"""
+
+    def __init__(self, sheets, tolerance=1e-6):
+        self.sheets = [as_sheet(s) for s in sheets]
+        if not self.sheets:
+            raise ValueError("Sheet list cannot be empty")
+        self.tolerance = tolerance
+        self.bounds = np.array([s.bounds for s in self.sheets], dtype=np.float64)
+        self.areas = np.array([s.area for s in self.sheets], dtype=np.float64)
+        self.irregular = np.array([not s.is_rectangle for s in self.sheets])
+        self.polygons = np.empty(len(self.sheets), dtype=object)
+        self.polygons[:] = [s.polygon for s in self.sheets]
+
+    @classmethod
+    def uniform(cls, width, height, count):
+        """count 张相同尺寸的矩形板"""
+        return cls([rectangle_sheet(width, height)] * max(1, count))
+
+    def __len__(self):
+        return len(self.sheets)
+
+    def grow(self, count, sheet):
+        """在末尾追加 sheet 直到共有 count 张板材
+
+        原地修改：共享同一 SheetSet 的评估器、NFP 引擎与解码器都能看到新开的板材。
+        """
+        extra = count - len(self.sheets)
+        if extra <= 0:
+            return
+        sheet = as_sheet(sheet)
+        self.sheets += [sheet] * extra
+        self.bounds = np.concatenate([self.bounds, np.tile(sheet.bounds, (extra, 1))])
+        self.areas = np.concatenate([self.areas, np.full(extra, sheet.area)])
+        self.irregular = np.concatenate([self.irregular, np.full(extra, not sheet.is_rectangle)])
+        polygons = np.empty(extra, dtype=object)
+        polygons[:] = [sheet.polygon] * extra
+        self.polygons = np.concatenate([self.polygons, polygons])
+
+    def __getitem__(self, idx):
+        return self.sheets[idx]
+
+    def contains(self, geoms, sheet_idx, bounds=None):
+        """判断每个零件是否完全位于其所在板材内，返回与 geoms 同形状的布尔数组
+
+        先用包围盒做向量化检测；只有落在不规则余料上的零件才做多边形检测。
+        """
+        geoms = np.asarray(geoms, dtype=object)
+        sheet_idx = np.asarray(sheet_idx, dtype=np.int64)
+        if bounds is None:
+            bounds = shapely.bounds(geoms)
+        in_range = (sheet_idx >= 0) & (sheet_idx < len(self.sheets))
+        idx = np.where(in_range, sheet_idx, 0)
+        sb = self.bounds[idx]
+        tol = self.tolerance
+        inside = (in_range
+                  & (bounds[..., 0] >= sb[..., 0] - tol) & (bounds[..., 1] >= sb[..., 1] - tol)
+                  & (bounds[..., 2] <= sb[..., 2] + tol) & (bounds[..., 3] <= sb[..., 3] + tol))
+
+        check = inside & self.irregular[idx]
+        if check.any():
+            for s in np.unique(idx[check]):
+                mask = check & (idx == s)
+                inside[mask] = shapely.contains(self.sheets[s].polygon, geoms[mask])
+        return inside
+
+    def outside_area(self, geoms, sheet_idx):
+        """每个零件落在其板材之外的面积；板材号无效时为零件全部面积"""
+        geoms = np.asarray(geoms, dtype=object)
+        sheet_idx = np.asarray(sheet_idx, dtype=np.int64)
+        area = shapely.area(geoms)
+        in_range = (sheet_idx >= 0) & (sheet_idx < len(self.sheets))
+        result = area.copy()
+        if in_range.any():
+            polys = self.polygons[sheet_idx[in_range]]
+            result[in_range] = area[in_range] - shapely.area(
+                shapely.intersection(geoms[in_range], polys))
+        return np.maximum(result, 0.0)
+
+    def used_area(self, sheet_idx):
+        """每个个体所用板材的总面积；sheet_idx 形状为 (pop, parts)"""
+        sheet_idx = np.atleast_2d(np.asarray(sheet_idx, dtype=np.int64))
+        used = np.zeros((sheet_idx.shape[0], len(self.sheets)), dtype=bool)
+        valid = (sheet_idx >= 0) & (sheet_idx < len(self.sheets))
+        rows = np.broadcast_to(np.arange(sheet_idx.shape[0])[:, np.newaxis], sheet_idx.shape)
+        used[rows[valid], sheet_idx[valid]] = True
+        return used @ self.areas
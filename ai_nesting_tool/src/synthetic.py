@@ -0,0 +1,68 @@
+import math
+
+import ezdxf
+import numpy as np
+import shapely
+
+# 解析器只把图层名含 110OO 的闭合多段线当作零件外轮廓
+PART_LAYER = '110OO'
+HOLE_LAYER = 'HOLES'
+
+
+def random_polygon(rng, vertices, radius):
+    """以原点为中心的星形多边形：顶点角度在等分角附近抖动，半径在 [0.8, 1] × radius 之间"""
+    vertices = max(3, int(vertices))
+    spacing = 2 * math.pi / vertices
+    angles = np.arange(vertices) * spacing + rng.uniform(-0.2, 0.2, vertices) * spacing
+    radii = radius * rng.uniform(0.8, 1.0, vertices)
+    return np.column_stack((radii * np.cos(angles), radii * np.sin(angles)))
+
+
+def hole_centers(holes, clearance):
+    """孔的圆心（相对零件中心）与半径；clearance 为零件中心到外轮廓的最近距离
+
+    一个孔居中；多个孔均匀分布在 0.5 × clearance 的圆周上，孔与孔、孔与外轮廓互不相交。
+    """
+    if holes <= 0:
+        return [], 0.0
+    if holes == 1:
+        return [(0.0, 0.0)], 0.5 * clearance
+    ring = 0.5 * clearance
+    hole_radius = min(0.3 * clearance, 0.8 * ring * math.sin(math.pi / holes))
+    return [(ring * math.cos(2 * math.pi * k / holes), ring * math.sin(2 * math.pi * k / holes))
+            for k in range(holes)], hole_radius
+
+
+def generate_dxf(path, n_parts, vertices=4, holes=0, min_size=20.0, max_size=80.0, seed=0,
+                 layer=PART_LAYER, rotation=None):
+    """生成 n_parts 个随机零件的 DXF 文件，用于基准测试
+
+    vertices 为每个零件的顶点数（4 时生成矩形），holes 为每个零件内的圆孔数；
+    零件在图纸上按网格排列互不重叠，解析器可以正确地把圆孔归属到各自的零件。
+    layer 为零件外轮廓所在的图层；rotation 为旋转策略名时写成图层名标记（如 110OO_FLIP），
+    解析器据此给出零件的旋转约束。返回写入的文件路径。
+    """
+    if rotation is not None:
+        layer = f"{layer}_{rotation.upper()}"
+    rng = np.random.default_rng(seed)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    columns = max(1, int(math.ceil(math.sqrt(n_parts))))
+    pitch = 2.0 * max_size
+    for k in range(n_parts):
+        cx = (k % columns + 0.5) * pitch
+        cy = (k // columns + 0.5) * pitch
+        size = rng.uniform(min_size, max_size)
+        if vertices == 4:
+            w, h = size / 2, rng.uniform(min_size, max_size) / 2
+            points = np.array([(-w, -h), (w, -h), (w, h), (-w, h)])
+        else:
+            points = random_polygon(rng, vertices, size / 2)
+        msp.add_lwpolyline([(cx + x, cy + y) for x, y in points], close=True,
+                           dxfattribs={'layer': layer})
+        clearance = shapely.Polygon(points).exterior.distance(shapely.Point(0, 0))
+        centers, hole_radius = hole_centers(holes, clearance)
+        for x, y in centers:
+            msp.add_circle((cx + x, cy + y), hole_radius, dxfattribs={'layer': HOLE_LAYER})
+    doc.saveas(path)
+    return path
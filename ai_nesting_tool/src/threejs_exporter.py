@@ -11,12 +11,10 @@ def export_to_threejs(sheets, sheet_width, sheet_height, output_dir="static"):
     data = {}
     try:
         for sheet_idx, parts in sheets.items():
-            print(f"Processing sheet {sheet_idx}, parts: {parts}")
             # 将原始坐标列表转换为 Polygon 对象并提取坐标
             polygons = [Polygon(part).exterior.coords[:-1] for part in parts]
-            print(f"Polygons for sheet {sheet_idx}: {polygons}")
             data[sheet_idx] = [list(coords) for coords in polygons]
-        print(f"Processed data: {data}")
+        print(f"Exporting {sum(len(v) for v in data.values())} parts on {len(data)} sheets")
     except Exception as e:
         print(f"转换数据时出错: {e}")
         return None
@@ -10,10 +10,9 @@ import json
 import threading
 
 # 修改导入方式
-from . import dxf_parser
-from . import nesting_optimizer
-from . import gcode_generator
-from . import threejs_exporter
+from . import pipeline
+from .inventory import SheetInventory
+from .profiling import PipelineProfiler
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -21,6 +20,9 @@ class MainWindow(QMainWindow):
         self.dxf_path = None
         self.threejs_path = None
         self.optimizer = None  # 添加 optimizer 属性
+        self.inventory = SheetInventory.default()  # 未加载库存文件时使用数量不限的 1200×1200 标准板
+        # 排查异常 DXF 时打开：各阶段附带 cProfile 热点函数与 tracemalloc 峰值内存
+        self.profile_options = {'profile': False, 'trace_memory': False}
         self.setup_ui()
         
     def setup_ui(self):
@@ -73,6 +75,16 @@ class MainWindow(QMainWindow):
         layout.addWidget(select_button)
         layout.addWidget(self.file_label)
         
+        # 板材库存（标准板尺寸、数量、价格与余料）
+        self.inventory_label = QLabel("Inventory: default 1200 x 1200")
+        self.inventory_label.setAlignment(Qt.AlignCenter)
+        
+        inventory_button = QPushButton("Load Sheet Inventory")
+        inventory_button.clicked.connect(self.select_inventory)
+        
+        layout.addWidget(inventory_button)
+        layout.addWidget(self.inventory_label)
+        
         # 创建运行按钮
         run_button = QPushButton("Run AI Nesting")
         run_button.setStyleSheet("""
@@ -91,6 +103,8 @@ class MainWindow(QMainWindow):
         self.progress = QProgressBar()
         self.progress.setVisible(False)
         layout.addWidget(self.progress)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
         
         # 结果区域
         self.results_widget = QWidget()
@@ -110,6 +124,19 @@ class MainWindow(QMainWindow):
             self.dxf_path = filename
             self.file_label.setText(f"Selected: {os.path.basename(filename)}")
     
+    def select_inventory(self):
+        filename, _ = QFileDialog.getOpenFileName(
+            self, "Select Sheet Inventory", "", "JSON Files (*.json)")
+        if filename:
+            try:
+                self.inventory = SheetInventory.load(filename)
+            except Exception as e:
+                QMessageBox.warning(self, "Warning", f"Unable to load inventory: {e}")
+                return
+            self.inventory_label.setText(
+                f"Inventory: {os.path.basename(filename)} "
+                f"({len(self.inventory.stock)} stock sizes, {len(self.inventory.remnants)} remnants)")
+    
     def run_nesting(self):
         if not self.dxf_path:
             QMessageBox.warning(self, "Warning", "Please select a DXF file first.")
@@ -122,26 +149,17 @@ class MainWindow(QMainWindow):
         threading.Thread(target=self.process_nesting, daemon=True).start()
     
     def process_nesting(self):
+        profiler = PipelineProfiler(job=os.path.basename(self.dxf_path),
+                                    **self.profile_options)
         try:
-            # 加载和处理 DXF 文件
-            parts_data = dxf_parser.parse_dxf(self.dxf_path)
-            print(f"Parts loaded: {len(parts_data[0])}")
-            
-            # 优化排样
-            sheet_width, sheet_height = 1200, 1200
-            self.optimizer = nesting_optimizer.NestingOptimizer(parts_data[0], sheet_width, sheet_height)
-            solution = self.optimizer.genetic_algorithm()
-            
-            # 调试信息
-            print("Sheets details:")
-            for sheet_idx, parts in self.optimizer.sheets.items():
-                print(f"Sheet {sheet_idx}:")
-                for i, part in enumerate(parts):
-                    print(f"  Part {i+1}: Type={type(part)}, Area={part.area}, Centroid={part.centroid}")
-            
-            # 生成输出
-            gcode_path = gcode_generator.generate_gcode(self.optimizer.sheets, self.optimizer.transformed_entities)
-            self.threejs_path = threejs_exporter.export_to_threejs(self.optimizer.sheets, sheet_width, sheet_height)
+            # 解析、排样、G 代码与 3D 导出；每个阶段的耗时与计数写入 runs 目录的 profile 报告，
+            # 每次排样另写一份运行清单（种子、参数、零件哈希、每代最优值与耗时），可按清单重放
+            # 进度事件在工作线程中产生，转到主线程更新状态栏
+            self.optimizer, gcode_path, self.threejs_path = pipeline.run_pipeline(
+                self.dxf_path, inventory=self.inventory, profiler=profiler,
+                listener=lambda event: QTimer.singleShot(0, lambda: self.show_progress(event)))
+            # 从库存中扣除本次用到的板材与余料
+            self.inventory.consume(self.optimizer.used_sheets())
             
             # 在主线程中更新 UI 和 3D 视图
             QTimer.singleShot(0, self.update_results)
@@ -153,8 +171,21 @@ class MainWindow(QMainWindow):
             print(traceback.format_exc())
             QTimer.singleShot(0, lambda: QMessageBox.critical(self, "Error", str(e)))
         finally:
+            print(f"Pipeline profile written to {profiler.save('runs')}")
             QTimer.singleShot(0, lambda: self.progress.setVisible(False))
     
+    def show_progress(self, event):
+        if event.kind == 'generation':
+            self.status_label.setText(
+                f"Generation {event.generation}: best = {event.best:.4f}, "
+                f"{event.evals_per_sec:.0f} evals/s, {event.elapsed:.1f}s")
+        elif event.kind == 'run_finished':
+            self.status_label.setText(
+                f"Finished ({event.stop_reason}): {event.sheets_used} sheets, "
+                f"{event.evaluations} evaluations in {event.elapsed:.1f}s")
+        elif event.kind == 'message':
+            self.status_label.setText(event.text)
+    
     def update_results(self):
         # 清除旧的结果
         while self.results_layout.count():
@@ -0,0 +1,67 @@
+"""测试共用的零件工厂、优化器工厂与排样合法性检查
+
+unittest 与 pytest 都可以运行这些测试，这里只放普通函数：
+测试模块通过 from tests.helpers import ... 使用。
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import shapely
+from shapely.geometry import Polygon, box
+
+from src.nesting_optimizer import NestingOptimizer
+
+SHEET_WIDTH = 600
+SHEET_HEIGHT = 400
+
+
+def rect_parts():
+    """三块矩形零件（其中一块不在原点），多数优化器测试的默认任务"""
+    return [box(0, 0, 100, 50), box(0, 0, 80, 80), box(10, 10, 70, 40)]
+
+
+def triangle(size):
+    return Polygon([(0, 0), (size, 0), (size * 0.3, size * 0.8)])
+
+
+def l_shape(size, arm=None):
+    """边长 size、臂宽 arm 的 L 形零件"""
+    arm = size / 4 if arm is None else arm
+    return Polygon([(0, 0), (size, 0), (size, arm), (arm, arm), (arm, size), (0, size)])
+
+
+def mixed_parts():
+    """不规则零件与矩形混合的小任务"""
+    return [triangle(120), triangle(90), box(0, 0, 80, 50), triangle(60)]
+
+
+def make_optimizer(parts=None, width=SHEET_WIDTH, height=SHEET_HEIGHT, max_sheets=2, **kwargs):
+    """默认 600×400 的两张板；parts 缺省为 rect_parts()"""
+    return NestingOptimizer(rect_parts() if parts is None else parts, width, height,
+                            max_sheets=max_sheets, **kwargs)
+
+
+def placed_geometries(optimizer, solution):
+    """排样结果中每个零件在板材坐标系下的几何体"""
+    return [optimizer.geometry_cache.place(i, angle, x, y)
+            for i, (x, y, angle, _) in enumerate(solution)]
+
+
+def assert_valid_layout(test, optimizer, solution, msg=None):
+    """排样真正可用：零件位于所在板材内（余料按轮廓判断）、同一板材上互不重叠、角度符合旋转策略"""
+    test.assertEqual(len(solution), len(optimizer.parts), msg)
+    geoms = np.array(placed_geometries(optimizer, solution), dtype=object)
+    sheet_idx = np.array([int(gene[3]) for gene in solution])
+    test.assertTrue(optimizer.sheet_set.contains(geoms, sheet_idx).all(), msg)
+    for s in np.unique(sheet_idx):
+        on_sheet = geoms[sheet_idx == s]
+        left, right = np.triu_indices(len(on_sheet), k=1)
+        overlap = shapely.area(shapely.intersection(on_sheet[left], on_sheet[right]))
+        test.assertTrue((overlap <= 1e-6).all(), msg)
+    for i, gene in enumerate(solution):
+        choices = optimizer.rotation_set.choices[i]
+        if choices is not None:
+            test.assertIn(round(gene[2] % 360.0, 6), choices, msg)
@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.parallel import ParallelFitnessPool
+from tests.helpers import assert_valid_layout, make_optimizer
+
+
+class TestBatchFitness(unittest.TestCase):
+    def setUp(self):
+        self.optimizer = make_optimizer()
+
+    def test_matches_scalar_fitness(self):
+        rng = random.Random(0)
+        population = [[(rng.uniform(0, 500), rng.uniform(0, 300), rng.choice([0, 90, 37.5]),
+                        rng.randint(0, 1)) for _ in range(3)] for _ in range(200)]
+        batch = self.optimizer.fitness_batch(population)
+        scalar = [self.optimizer.fitness(ind) for ind in population]
+        for b, s in zip(batch, scalar):
+            self.assertAlmostEqual(b, s)
+        self.assertTrue(any(s > 0 for s in scalar))
+        self.assertTrue(any(s == 0 for s in scalar))
+
+    def test_overlap_scores_zero(self):
+        overlapping = [(0, 0, 0, 0), (10, 10, 0, 0), (200, 200, 0, 0)]
+        separate = [(0, 0, 0, 0), (200, 0, 0, 0), (300, 200, 0, 0)]
+        scores = self.optimizer.fitness_batch([overlapping, separate])
+        self.assertEqual(scores[0], 0.0)
+        self.assertGreater(scores[1], 0.0)
+
+    def test_parallel_matches_serial(self):
+        runs = []
+        for workers in (None, 2):
+            optimizer = make_optimizer()
+            runs.append(optimizer.genetic_algorithm(population_size=20, generations=3,
+                                                    workers=workers, seed=42))
+            assert_valid_layout(self, optimizer, runs[-1])
+        self.assertEqual(runs[0], runs[1])
+
+    def test_parallel_matches_serial_under_rotation_policy(self):
+        # angle_step=7 时 180 度不在量化网格上，工作进程必须同样按 flip 策略取角度
+        optimizer = make_optimizer(angle_step=7, rotation='flip')
+        rng = random.Random(1)
+        population = [[(rng.uniform(0, 500), rng.uniform(0, 300), rng.choice([0, 90, 178, 183]),
+                        rng.randint(0, 1)) for _ in range(3)] for _ in range(60)]
+        serial = optimizer.fitness_batch(population)
+        with ParallelFitnessPool(optimizer.parts, optimizer.sheet_set, 2, angle_step=7,
+                                 rotations=optimizer.rotation_set) as pool:
+            parallel = pool.evaluate(population)
+        for a, b in zip(serial, parallel):
+            self.assertAlmostEqual(a, b)
+        self.assertTrue(any(s > 0 for s in serial))
+
+        runs = []
+        for workers in (None, 2):
+            optimizer = make_optimizer(angle_step=7, rotation='flip')
+            runs.append(optimizer.genetic_algorithm(population_size=20, generations=3,
+                                                    workers=workers, seed=42))
+            assert_valid_layout(self, optimizer, runs[-1])
+        self.assertEqual(runs[0], runs[1])
+
+    def test_quantized_angles_use_geometry_cache(self):
+        optimizer = make_optimizer(angle_step=90)
+        solution = optimizer.genetic_algorithm(population_size=20, generations=3, seed=5)
+        self.assertTrue(all(angle % 90 == 0 for _, _, angle, _ in solution))
+        stats = optimizer.geometry_cache.cache.stats()
+        self.assertLessEqual(stats['size'], 3 * 4)
+        self.assertGreater(stats['hits'], stats['misses'])
+
+        population = [[(x, 20, a, 0) for x, a in zip((0, 150, 300), (0, 90, 270))]]
+        self.assertAlmostEqual(optimizer.fitness_batch(population)[0],
+                               optimizer.fitness(population[0]))
+
+    def test_cached_shapes_are_deduplicated(self):
+        optimizer = make_optimizer(angle_step=90, rotation=['free', 'flip', 'free'])
+        cache = optimizer.geometry_cache
+        rng = np.random.default_rng(0)
+        angles = rng.choice([0.0, 88.0, 181.0, 272.0], (50, 3))
+        polygons = cache.polygons(angles)
+        # 每个唯一的 (形状, 角度) 只旋转一次，同一条目在种群中共享同一个几何对象
+        self.assertLessEqual(cache.cache.stats()['size'], 4 + 2 + 4)
+        for p, row in enumerate(angles):
+            for i, angle in enumerate(row):
+                self.assertIs(polygons[p, i], cache.get(i, angle).polygon)
+        # 几乎没有重复时不查缓存，由评估器直接旋转
+        free = make_optimizer(angle_step=1)
+        self.assertIsNone(free.geometry_cache.polygons(rng.uniform(0, 360, (50, 3))))
+        population = [[(rng.uniform(0, 500), rng.uniform(0, 300), a, rng.integers(0, 2))
+                       for a in rng.uniform(0, 360, 3)] for _ in range(50)]
+        scalar = [free.fitness(ind) for ind in population]
+        for b, s in zip(free.fitness_batch(population), scalar):
+            self.assertAlmostEqual(b, s)
+
+    def test_penalty_mode_is_continuous(self):
+        optimizer = make_optimizer(fitness_mode='penalty')
+        valid = [(0, 0, 0, 0), (200, 0, 0, 0), (300, 200, 0, 0)]
+        small_overlap = [(0, 0, 0, 0), (95, 0, 0, 0), (300, 200, 0, 0)]
+        large_overlap = [(0, 0, 0, 0), (20, 0, 0, 0), (300, 200, 0, 0)]
+        outside = [(0, 0, 0, 0), (200, 0, 0, 0), (560, 200, 0, 0)]
+        scores = optimizer.fitness_batch([valid, small_overlap, large_overlap, outside])
+        self.assertAlmostEqual(scores[0], self.optimizer.fitness(valid))
+        self.assertGreater(scores[1], scores[2])
+        self.assertGreater(scores[2], 0.0)
+        self.assertGreater(scores[0], scores[3])
+        self.assertGreater(scores[3], 0.0)
+        self.assertAlmostEqual(optimizer.fitness(small_overlap), scores[1])
+
+    def test_fitness_cache_skips_elites(self):
+        calls = []
+        original = self.optimizer.fitness_batch
+
+        def counting(population):
+            calls.append(len(population))
+            return original(population)
+
+        self.optimizer.fitness_batch = counting
+        self.optimizer.genetic_algorithm(population_size=20, generations=5, seed=9)
+        stats = self.optimizer.fitness_cache.stats()
+        # 第一代评估全部 20 个，之后每代只评估新产生的 10 个子代，最终评估全部命中
+        self.assertEqual(sum(calls), 20 + 4 * 10)
+        self.assertEqual(stats['misses'], sum(calls))
+        self.assertGreaterEqual(stats['hits'], 4 * 10 + 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import contextlib
+import copy
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.benchmark import LARGE_JOB_PARTS, compare, engine_options, run_benchmark
+from src.dxf_parser import parse_dxf
+from src.synthetic import generate_dxf
+
+
+class TestSyntheticDxf(unittest.TestCase):
+    def test_generated_parts_parse(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_dxf(os.path.join(tmp, 'job.dxf'), 12, vertices=7, holes=3, seed=2)
+            with contextlib.redirect_stdout(io.StringIO()):
+                parts, main_polylines = parse_dxf(path)
+        self.assertEqual(len(parts), 12)
+        for part, main_poly in zip(parts, main_polylines):
+            self.assertTrue(part.is_valid)
+            self.assertEqual(len(part.exterior.coords) - 1, 7)
+            self.assertEqual(len(main_poly['children']), 3)
+            for child in main_poly['children']:
+                self.assertTrue(part.contains(child['polygon']))
+
+    def test_same_seed_same_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = []
+            for name in ('a.dxf', 'b.dxf'):
+                path = generate_dxf(os.path.join(tmp, name), 5, seed=9)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results.append([p.wkt for p in parse_dxf(path)[0]])
+        self.assertEqual(results[0], results[1])
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_and_compare(self):
+        current = run_benchmark(sizes=(3, 8), holes=1, rotation='flip', trace_memory=False)
+        self.assertEqual(list(current['results']), ['3', '8'])
+        result = current['results']['8']
+        self.assertEqual(list(result['stages']), ['parse', 'nest', 'gcode', 'export_3d'])
+        self.assertEqual(result['stages']['parse']['counters']['parts'], 8)
+        self.assertGreater(result['utilization'], 0.0)
+        self.assertEqual(compare(current, current), [])
+
+        # 基线更快、用板更少时应报告回归
+        baseline = copy.deepcopy(current)
+        base = baseline['results']['8']
+        base['stages']['nest']['time'] = 0.1
+        result['stages']['nest']['time'] = 0.2
+        base['sheets_used'] = result['sheets_used'] - 1
+        metrics = {(size, stage, metric) for size, stage, metric, _, _ in
+                   compare(current, baseline)}
+        self.assertEqual(metrics, {('8', 'nest', 'time'), ('8', 'nest', 'sheets_used')})
+
+        # 耗时过短的阶段不参与比较
+        base['stages']['gcode']['time'] = 0.001
+        result['stages']['gcode']['time'] = 0.01
+        self.assertNotIn(('8', 'gcode', 'time'),
+                         {r[:3] for r in compare(current, baseline)})
+
+    def test_large_jobs_use_smaller_budget(self):
+        self.assertEqual(engine_options('compact', LARGE_JOB_PARTS), {})
+        self.assertEqual(engine_options('compact', 10000), {'passes': 1})
+        self.assertEqual(engine_options('compact', 10000, full_budget=True), {})
+        self.assertEqual(engine_options('rects', 10000), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src.collision import has_overlap, overlapping_pairs
+
+
+class TestCollision(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        geoms = []
+        for _ in range(150):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            geoms.append(box(x, y, x + rng.uniform(5, 40), y + rng.uniform(5, 40)))
+        groups = [rng.randint(0, 2) for _ in geoms]
+
+        expected = {(i, j) for i in range(len(geoms)) for j in range(i + 1, len(geoms))
+                    if groups[i] == groups[j] and geoms[i].intersects(geoms[j])}
+        left, right = overlapping_pairs(geoms, groups)
+        self.assertEqual(set(zip(left.tolist(), right.tolist())), expected)
+
+    def test_groups_are_independent(self):
+        geoms = [box(0, 0, 10, 10), box(5, 5, 15, 15)]
+        self.assertTrue(has_overlap(geoms))
+        self.assertFalse(has_overlap(geoms, groups=[0, 1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src.convergence import CancellationToken, ConvergenceController
+from src.nesting_optimizer import NestingOptimizer
+
+
+class TestConvergence(unittest.TestCase):
+    def test_stall(self):
+        controller = ConvergenceController(max_generations=100, stall_generations=3)
+        results = [controller.update(b) for b in (0.1, 0.2, 0.2, 0.2, 0.2)]
+        self.assertEqual(results, [False, False, False, False, True])
+        self.assertEqual(controller.stop_reason, 'stall')
+
+    def test_target_and_generations(self):
+        controller = ConvergenceController(max_generations=10, target=0.5)
+        self.assertTrue(controller.update(0.6))
+        self.assertEqual(controller.stop_reason, 'target')
+        controller = ConvergenceController(max_generations=2)
+        self.assertFalse(controller.update(0.1))
+        self.assertTrue(controller.update(0.1))
+        self.assertEqual(controller.stop_reason, 'generations')
+
+    def test_time_budget_and_cancel(self):
+        controller = ConvergenceController(time_budget=0.01)
+        time.sleep(0.02)
+        self.assertTrue(controller.update(0.0))
+        self.assertEqual(controller.stop_reason, 'time_budget')
+        token = CancellationToken()
+        controller = ConvergenceController(cancel_token=token)
+        self.assertFalse(controller.update(0.0))
+        token.cancel()
+        self.assertTrue(controller.update(0.0))
+        self.assertEqual(controller.stop_reason, 'cancelled')
+
+    def test_optimizer_reports_stop_reason(self):
+        parts = [box(0, 0, 20, 20) for _ in range(5)]
+        optimizer = NestingOptimizer(parts, 300, 300)
+        token = CancellationToken()
+        token.cancel()
+        optimizer.genetic_algorithm(population_size=10, generations=50, cancel_token=token)
+        self.assertEqual(optimizer.convergence.stop_reason, 'cancelled')
+        self.assertEqual(optimizer.convergence.generation, 1)
+
+        single = NestingOptimizer([box(0, 0, 20, 20)], 300, 300)
+        single.genetic_algorithm()
+        self.assertEqual(single.convergence.stop_reason, 'target')
+        self.assertEqual(single.convergence.generation, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
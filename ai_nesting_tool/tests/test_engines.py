@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import Polygon, box
+
+from src.engines import AnnealingEngine, CompactionEngine, GeneticEngine, compact, create_engine
+from src.nesting_optimizer import NestingOptimizer
+
+
+class TestEngines(unittest.TestCase):
+    def setUp(self):
+        self.parts = [box(0, 0, 100, 50), box(0, 0, 80, 80), box(10, 10, 70, 40),
+                      Polygon([(0, 0), (80, 0), (0, 60)])]
+        self.optimizer = NestingOptimizer(self.parts, 600, 400, max_sheets=3)
+
+    def test_compact_slides_to_corner(self):
+        # 单个零件从板材中部滑到左下角
+        optimizer = NestingOptimizer([box(0, 0, 100, 50)], 600, 400, max_sheets=1)
+        solution = compact(optimizer, [(200, 150, 0, 0)], tolerance=0.1)
+        x, y, _, _ = solution[0]
+        self.assertLess(abs(x), 0.2)
+        self.assertLess(abs(y), 0.2)
+
+    def test_compact_keeps_layout_valid(self):
+        spread = [(0, 300, 0, 0), (300, 250, 0, 0), (450, 200, 0, 0), (150, 150, 0, 0)]
+        self.assertGreater(self.optimizer.fitness(spread), 0)
+        solution = compact(self.optimizer, spread)
+        self.assertGreater(self.optimizer.fitness(solution), 0)
+        for (_, y0, _, _), (_, y1, _, _) in zip(spread, solution):
+            self.assertLessEqual(y1, y0)
+        self.assertNotEqual(solution, spread)
+
+    def test_engines_produce_valid_layouts(self):
+        for engine in (CompactionEngine(), AnnealingEngine(iterations=50, seed=1),
+                       CompactionEngine(base=AnnealingEngine(iterations=20, seed=2,
+                                                             compact=False))):
+            optimizer = NestingOptimizer(self.parts, 600, 400, max_sheets=3)
+            solution = optimizer.optimize(engine)
+            self.assertEqual(len(solution), len(self.parts))
+            self.assertGreater(optimizer.fitness(solution), 0)
+            self.assertTrue(optimizer.sheets)
+
+    def test_annealing_is_seeded(self):
+        runs = [NestingOptimizer(self.parts, 600, 400, max_sheets=3).optimize(
+            'anneal', iterations=40, seed=7) for _ in range(2)]
+        self.assertEqual(runs[0], runs[1])
+
+    def test_create_engine(self):
+        self.assertIsInstance(create_engine('auto', 5), CompactionEngine)
+        self.assertIsInstance(create_engine('auto', 500), AnnealingEngine)
+        self.assertIsInstance(create_engine('ga', 5, generations=2), GeneticEngine)
+        with self.assertRaises(ValueError):
+            create_engine('tabu', 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
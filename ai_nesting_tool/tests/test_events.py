@@ -0,0 +1,109 @@
+import contextlib
+import io
+import os
+import queue
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src.events import EventBus, GenerationEvent, console_listener
+from src.nesting_optimizer import NestingOptimizer
+
+
+class TestEventStream(unittest.TestCase):
+    def setUp(self):
+        self.parts = [box(0, 0, 100, 50), box(0, 0, 80, 80), box(10, 10, 70, 40)]
+
+    def _optimizer(self, **kwargs):
+        return NestingOptimizer(self.parts, 600, 400, max_sheets=2, **kwargs)
+
+    def test_generation_events(self):
+        optimizer = self._optimizer()
+        events = []
+        optimizer.events.subscribe(events.append)
+        optimizer.genetic_algorithm(population_size=12, generations=4, seed=3)
+
+        kinds = [e.kind for e in events]
+        self.assertEqual(kinds[0], 'run_started')
+        self.assertEqual(kinds[-1], 'run_finished')
+        generations = [e for e in events if isinstance(e, GenerationEvent)]
+        self.assertEqual([e.generation for e in generations],
+                         list(range(len(generations))))
+        self.assertLessEqual(len(generations), 4)
+        # 累计评估数单调不减，缓存命中不计入
+        counts = [e.evaluations for e in generations]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(events[-1].evaluations, optimizer.evaluations)
+        self.assertGreater(optimizer.evaluations, 0)
+        self.assertEqual(events[-1].sheets_used, len(optimizer.sheets))
+        for e in generations:
+            self.assertGreaterEqual(e.best, e.mean)
+            self.assertIsNotNone(e.cache_hit_rate)
+
+    def test_engines_report_progress(self):
+        for engine, options in (('anneal', {'iterations': 10}),
+                                ('ga', {'population_size': 8, 'generations': 2,
+                                        'incremental': True}),
+                                ('ga', {'population_size': 8, 'generations': 2,
+                                        'decoder': 'skyline'})):
+            optimizer = self._optimizer()
+            events = queue.Queue()
+            optimizer.events.subscribe(events.put)
+            optimizer.optimize(engine, seed=1, **options)
+            received = [events.get_nowait() for _ in range(events.qsize())]
+            self.assertTrue(any(e.kind == 'generation' for e in received), engine)
+            self.assertEqual(received[-1].kind, 'run_finished')
+            self.assertEqual(received[-1].method, 'optimize')
+
+    def test_island_progress(self):
+        optimizer = self._optimizer()
+        events = []
+        optimizer.events.subscribe(events.append)
+        optimizer.genetic_algorithm(population_size=12, generations=4, islands=2,
+                                    migration_interval=2, seed=6)
+        generations = [e for e in events if e.kind == 'generation']
+        self.assertTrue(generations)
+        self.assertEqual({e.source for e in generations}, {'islands'})
+        self.assertEqual([e.generation for e in generations], list(range(len(generations))))
+        self.assertEqual(events[-1].evaluations, generations[-1].evaluations)
+
+    def test_silent_without_listener(self):
+        optimizer = self._optimizer()
+        self.assertFalse(optimizer.events.active)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            optimizer.genetic_algorithm(population_size=12, generations=3, seed=2)
+            optimizer.optimize('anneal', iterations=10, seed=2)
+        self.assertEqual(out.getvalue(), '')
+
+    def test_listeners_do_not_change_results(self):
+        plain = self._optimizer().genetic_algorithm(population_size=12, generations=3, seed=5)
+        observed = self._optimizer()
+        bus_events = []
+        observed.events.subscribe(bus_events.append)
+        self.assertEqual(observed.genetic_algorithm(population_size=12, generations=3, seed=5),
+                         plain)
+
+    def test_bus_and_console_listener(self):
+        bus = EventBus()
+        received = []
+        listener = bus.subscribe(received.append)
+        event = GenerationEvent('ga', 0, 0.5, 0.25, 10, 100.0, 0.5, 0.1)
+        bus.emit(event)
+        bus.unsubscribe(listener)
+        bus.emit(event)
+        self.assertEqual(received, [event])
+        self.assertFalse(bus.active)
+        self.assertEqual(event.as_dict()['kind'], 'generation')
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            console_listener(event)
+        self.assertIn('gen 0', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import Point, Polygon, box
+
+from src.holes import HoleIndex, collect_holes, plan_hole_filling
+from src.nesting_optimizer import NestingOptimizer
+
+
+def _frame(x0=0, y0=0):
+    """400×300 的框形零件，中间 300×200 的内孔由解析器作为子多段线给出"""
+    return box(x0, y0, x0 + 400, y0 + 300), box(x0 + 50, y0 + 50, x0 + 350, y0 + 250)
+
+
+class TestHoleFilling(unittest.TestCase):
+    def setUp(self):
+        outline, hole = _frame(1000, 1000)
+        self.parts = [outline, box(0, 0, 120, 80), box(0, 0, 100, 60), box(0, 0, 500, 100)]
+        self.main_polylines = [
+            {'part_id': 0, 'polygon': outline,
+             'children': [{'type': 'polyline', 'polygon': hole}]},
+        ] + [{'part_id': k, 'polygon': p, 'children': []} for k, p in enumerate(self.parts)][1:]
+
+    def _optimizer(self, sheets=2):
+        return NestingOptimizer((self.parts, self.main_polylines), 600, 400, max_sheets=sheets)
+
+    def test_index_orders_candidates_by_area(self):
+        index = HoleIndex([(0, box(0, 0, 50, 50)), (1, box(0, 0, 10, 10)),
+                           (2, box(0, 0, 200, 20))])
+        self.assertEqual([index.hosts[k] for k in index.candidates(90, (5, 5))], [1, 0, 2])
+        # 面积足够但形状放不下
+        self.assertEqual([index.hosts[k] for k in index.candidates(900, (30, 30))], [0])
+
+    def test_plan_nests_small_parts(self):
+        plan = plan_hole_filling(self._optimizer())
+        self.assertEqual(sorted(plan), [1, 2])
+        self.assertTrue(all(host == 0 for host, _, _ in plan.values()))
+
+    def test_nested_parts_follow_host(self):
+        optimizer = self._optimizer()
+        solution = optimizer.optimize('compact', fill_holes=True)
+        self.assertEqual(len(solution), 4)
+        self.assertEqual(solution[1][3], solution[0][3])
+        # 外轮廓本身不带孔，只检查不在孔内的零件构成合法排样
+        free = [0, 3]
+        self.assertGreater(optimizer.subset(free).fitness([solution[i] for i in free]), 0)
+
+        hole = [e for sheet in optimizer.transformed_entities.values() for e in sheet
+                if e['part_id'] == 0][0]['children'][0]['polygon']
+        nested = [optimizer.geometry_cache.place(j, solution[j][2], *solution[j][:2])
+                  for j in (1, 2)]
+        for geom in nested:
+            self.assertTrue(hole.contains(geom))
+        self.assertFalse(nested[0].intersects(nested[1]))
+
+    def test_saves_a_sheet(self):
+        # 一张板只能放下框形零件和长条，小零件必须进孔
+        optimizer = NestingOptimizer((self.parts, self.main_polylines), 600, 420, max_sheets=1)
+        solution = optimizer.optimize('compact', fill_holes=True)
+        self.assertEqual({s for _, _, _, s in solution}, {0})
+
+    def test_polygon_interiors_are_holes(self):
+        frame = Polygon(box(0, 0, 400, 300).exterior, [box(50, 50, 350, 250).exterior.coords])
+        optimizer = NestingOptimizer([frame, box(0, 0, 50, 50)], 600, 400)
+        self.assertEqual(list(plan_hole_filling(optimizer)), [1])
+        solution = optimizer.optimize('anneal', fill_holes=True, iterations=10, seed=0)
+        self.assertGreater(optimizer.fitness(solution), 0)
+
+    def test_drill_holes_are_skipped(self):
+        plate = box(0, 0, 400, 300)
+        def circle(x, y, r):
+            return {'type': 'circle', 'center': (x, y), 'radius': r,
+                    'polygon': Point(x, y).buffer(r)}
+
+        drills = [circle(x, 20, 4) for x in (20, 380)]
+        big = circle(200, 150, 60)
+        main_polylines = [{'part_id': 0, 'polygon': plate, 'children': drills + [big]},
+                          {'part_id': 1, 'polygon': box(0, 0, 50, 50), 'children': []}]
+        optimizer = NestingOptimizer(([plate, box(0, 0, 50, 50)], main_polylines), 600, 400)
+        # 只保留能容纳 50×50 包围盒的大圆，螺栓孔不参与嵌套
+        holes = collect_holes(optimizer)
+        self.assertEqual(len(holes), 1)
+        self.assertAlmostEqual(holes[0][1].area, big['polygon'].area)
+        self.assertEqual(list(plan_hole_filling(optimizer)), [1])
+        self.assertEqual(collect_holes(optimizer, circles=False), [])
+        optimizer.optimize('compact', fill_holes=True, circles=False)
+        self.assertEqual(optimizer.hole_plan, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
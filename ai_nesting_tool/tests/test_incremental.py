@@ -0,0 +1,105 @@
+import os
+import random
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from shapely.geometry import box
+
+from src.incremental import IncrementalEvaluator
+from src.nesting_optimizer import NestingOptimizer
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        parts = [box(0, 0, 20 + i % 4 * 10, 15 + i % 3 * 10) for i in range(60)]
+        self.optimizer = NestingOptimizer(parts, 400, 400, max_sheets=2, angle_step=90)
+        self.evaluator = IncrementalEvaluator(self.optimizer.geometry_cache,
+                                              self.optimizer.sheet_set,
+                                              self.optimizer.batch_evaluator.total_area)
+
+    def test_derive_matches_full_evaluation(self):
+        rng = random.Random(7)
+        genes = [(rng.uniform(0, 350), rng.uniform(0, 350), rng.choice([0, 90]), rng.randint(0, 1))
+                 for _ in range(60)]
+        state = self.evaluator.evaluate(genes)
+        for _ in range(30):
+            child = list(genes)
+            for i in rng.sample(range(60), 3):
+                child[i] = (rng.uniform(0, 400), rng.uniform(0, 400), rng.choice([0, 90, 180]),
+                            rng.randint(0, 2))
+            derived = self.evaluator.derive(state, child)
+            full = self.evaluator.evaluate(child)
+            self.assertEqual(derived.overlaps, full.overlaps)
+            self.assertEqual(derived.inside.tolist(), full.inside.tolist())
+            self.assertEqual([sorted(s) for s in derived.neighbors],
+                             [sorted(s) for s in full.neighbors])
+            self.assertAlmostEqual(derived.score, full.score)
+            state, genes = derived, child
+
+    def test_penalty_derive_matches_full_evaluation(self):
+        evaluator = IncrementalEvaluator(self.optimizer.geometry_cache, self.optimizer.sheet_set,
+                                         self.optimizer.batch_evaluator.total_area,
+                                         mode='penalty')
+        rng = random.Random(11)
+        genes = [(rng.uniform(0, 380), rng.uniform(0, 380), 0, rng.randint(0, 1))
+                 for _ in range(60)]
+        state = evaluator.evaluate(genes)
+        for _ in range(20):
+            child = list(genes)
+            for i in rng.sample(range(60), 2):
+                child[i] = (rng.uniform(0, 400), rng.uniform(0, 400), 90, rng.randint(0, 1))
+            derived = evaluator.derive(state, child)
+            full = evaluator.evaluate(child)
+            self.assertAlmostEqual(derived.overlap_area, full.overlap_area, places=6)
+            self.assertAlmostEqual(derived.score, full.score)
+            self.assertGreater(derived.score, 0.0)
+            state, genes = derived, child
+
+    def test_scores_match_fitness(self):
+        genes = [(i % 6 * 60, i % 30 // 6 * 40, 0, i // 30) for i in range(60)]
+        state = self.evaluator.evaluate(genes)
+        self.assertAlmostEqual(state.score, self.optimizer.fitness(genes))
+        self.assertGreater(state.score, 0.0)
+
+    def test_evaluate_many_matches_evaluate(self):
+        rng = np.random.default_rng(5)
+        population = np.zeros((6, 60, 4))
+        population[..., 0:2] = rng.uniform(0, 380, (6, 60, 2))
+        population[..., 2] = rng.choice([0, 90], (6, 60))
+        population[..., 3] = rng.integers(0, 2, (6, 60))
+        for mode in ('binary', 'penalty'):
+            evaluator = IncrementalEvaluator(self.optimizer.geometry_cache,
+                                             self.optimizer.sheet_set,
+                                             self.optimizer.batch_evaluator.total_area, mode=mode)
+            for batched, genes in zip(evaluator.evaluate_many(population), population):
+                single = evaluator.evaluate(genes)
+                self.assertEqual(batched.overlaps, single.overlaps)
+                self.assertEqual([sorted(s) for s in batched.neighbors],
+                                 [sorted(s) for s in single.neighbors])
+                self.assertAlmostEqual(batched.overlap_area, single.overlap_area, places=6)
+                self.assertAlmostEqual(batched.score, single.score)
+
+    def test_incremental_is_faster_than_full_evaluation(self):
+        parts = [box(0, 0, 20 + i % 4 * 10, 15 + i % 3 * 10) for i in range(200)]
+        elapsed = {}
+        for incremental in (False, True):
+            optimizer = NestingOptimizer(parts, 800, 800, max_sheets=2, fitness_mode='penalty',
+                                         fitness_cache_size=0)
+            start = time.perf_counter()
+            optimizer.genetic_algorithm(population_size=40, generations=10,
+                                        incremental=incremental, seed=3)
+            elapsed[incremental] = time.perf_counter() - start
+        self.assertLess(elapsed[True], elapsed[False])
+
+    def test_incremental_genetic_algorithm(self):
+        solution = self.optimizer.genetic_algorithm(population_size=10, generations=3,
+                                                    incremental=True, seed=2)
+        self.assertEqual(len(solution), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
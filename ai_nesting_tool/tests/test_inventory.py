@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import Polygon, box
+
+from src.inventory import SheetInventory
+from src.sheets import Sheet
+from tests.helpers import assert_valid_layout, make_optimizer
+
+
+class TestSheetInventory(unittest.TestCase):
+    def setUp(self):
+        self.parts = [box(0, 0, 100, 50), box(0, 0, 80, 80), box(0, 0, 60, 30)]
+
+    def test_remnants_first_then_cheapest_stock(self):
+        inventory = SheetInventory()
+        inventory.add_stock(1200, 1200, quantity=5, cost=100)
+        inventory.add_stock(600, 400, quantity=5, cost=15)
+        inventory.add_remnant(Polygon([(0, 0), (300, 0), (300, 120), (0, 200)]), 'offcut-a')
+        inventory.add_remnant(box(0, 0, 20, 20), 'too-small')
+
+        sheets = inventory.select(self.parts)
+        self.assertEqual(sheets[0].name, 'offcut-a')
+        self.assertNotIn('too-small', [s.name for s in sheets])
+        stock = sheets[1:]
+        self.assertTrue(stock)
+        self.assertTrue(all(s.width == 600 and s.height == 400 for s in stock))
+
+    def test_stock_must_fit_largest_part(self):
+        inventory = SheetInventory()
+        inventory.add_stock(70, 70, quantity=10, cost=1)
+        inventory.add_stock(500, 500, quantity=2)
+        sheets = inventory.select(self.parts)
+        self.assertTrue(all(s.width == 500 for s in sheets))
+
+        with self.assertRaises(ValueError):
+            SheetInventory([(box(0, 0, 10, 10), 3)]).select(self.parts)
+
+    def test_remnant_index_with_many_remnants(self):
+        inventory = SheetInventory()
+        for k in range(300):
+            inventory.add_remnant(box(0, 0, 10 + k, 10 + k))
+        usable = inventory.usable_remnants(80 * 80, (80, 80))
+        self.assertEqual(len(usable), 300 - 70)
+        self.assertGreaterEqual(usable[0].area, usable[-1].area)
+
+    def test_decoder_respects_irregular_remnant(self):
+        inventory = SheetInventory()
+        inventory.add_stock(600, 400, quantity=2)
+        inventory.add_remnant(Polygon([(0, 0), (300, 0), (300, 60), (0, 200)]), 'wedge')
+        optimizer = make_optimizer(self.parts, None, None, inventory=inventory)
+        solution = optimizer.optimize('compact')
+        assert_valid_layout(self, optimizer, solution)
+        self.assertGreater(optimizer.fitness(solution), 0)
+
+    def test_default_inventory_is_unlimited(self):
+        inventory = SheetInventory.default(600, 400)
+        for _ in range(30):
+            sheets = inventory.select(self.parts)
+            inventory.consume(sheets)
+        self.assertIsNone(inventory.stock[0].quantity)
+        self.assertTrue(all(s.width == 600 for s in inventory.select(self.parts)))
+
+        # 显式给出数量时照常扣减，用尽后报错
+        limited = SheetInventory.default(600, 400, quantity=2)
+        limited.consume(limited.select(self.parts))
+        with self.assertRaises(ValueError):
+            limited.select(self.parts)
+
+    def test_single_part_uses_remnant_bounds(self):
+        # 余料在前且不在原点：单零件必须在余料自身的范围内取位置
+        inventory = SheetInventory.default(1200, 1200)
+        inventory.add_remnant(box(2000, 0, 2300, 300), 'offcut')
+        optimizer = make_optimizer([box(0, 0, 250, 250)], None, None, inventory=inventory)
+        solution = optimizer.genetic_algorithm(seed=1)
+        assert_valid_layout(self, optimizer, solution)
+        self.assertEqual(solution[0][3], 0)
+        self.assertGreater(optimizer.fitness(solution), 0)
+
+    def test_extra_sheets_come_from_stock(self):
+        # 估算的板数不够时补开的板是库存中的标准板，consume() 按实际用量扣减
+        panels = [box(0, 0, 400, 400)] * 40
+        inventory = SheetInventory()
+        inventory.add_stock(1200, 1200, quantity=12)
+        optimizer = make_optimizer(panels, None, None, inventory=inventory)
+        self.assertLess(len(optimizer.sheet_set), 10)
+        solution = optimizer.optimize('compact')
+        assert_valid_layout(self, optimizer, solution)
+        used = optimizer.used_sheets()
+        self.assertEqual(len(used), 10)
+        inventory.consume(used)
+        self.assertEqual(inventory.stock[0].quantity, 2)
+
+        # 库存不够补开时报错，而不是用库存之外的板材
+        limited = SheetInventory()
+        limited.add_stock(1200, 1200, quantity=8)
+        optimizer = make_optimizer(panels, None, None, inventory=limited)
+        with self.assertRaises(ValueError):
+            optimizer.optimize('compact')
+
+    def test_consume_rejects_unknown_sheets(self):
+        inventory = SheetInventory.default(600, 400, quantity=2)
+        with self.assertRaises(ValueError):
+            inventory.consume([Sheet(box(0, 0, 10, 10))])
+        sheet = inventory.stock[0].sheet
+        with self.assertRaises(ValueError):
+            inventory.consume([sheet] * 3)
+        self.assertEqual(inventory.stock[0].quantity, 2)
+
+    def test_optimizer_uses_inventory(self):
+        data = {'stock': [{'width': 600, 'height': 400, 'quantity': 3}],
+                'remnants': [{'points': [[0, 0], [250, 0], [250, 150], [0, 150]], 'name': 'r1'}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'inventory.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            inventory = SheetInventory.load(path)
+
+        optimizer = make_optimizer(self.parts, None, None, inventory=inventory)
+        self.assertEqual((optimizer.sheet_width, optimizer.sheet_height), (600, 400))
+        self.assertEqual(optimizer.sheet_set[0].name, 'r1')
+        solution = optimizer.optimize('compact')
+        # 天际线解码器按各板材实际尺寸放置，余料上的零件不越界
+        assert_valid_layout(self, optimizer, solution)
+        self.assertGreater(optimizer.fitness(solution), 0)
+        self.assertIn(0, [sheet_idx for _, _, _, sheet_idx in solution])
+        used = optimizer.used_sheets()
+        self.assertTrue(used)
+
+        inventory.consume(used)
+        remaining = inventory.stock[0].quantity + len(inventory.remnants)
+        self.assertEqual(remaining, 4 - len(used))
+
+
+if __name__ == '__main__':
+    unittest.main()
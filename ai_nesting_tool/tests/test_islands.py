@@ -0,0 +1,51 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tests.helpers import assert_valid_layout, make_optimizer, mixed_parts
+
+
+class TestIslandModel(unittest.TestCase):
+    def test_islands_return_valid_layout(self):
+        optimizer = make_optimizer()
+        solution = optimizer.genetic_algorithm(population_size=12, generations=6, islands=2,
+                                               migration_interval=2, migrants=1, seed=3)
+        assert_valid_layout(self, optimizer, solution)
+        self.assertAlmostEqual(optimizer.fitness(solution),
+                               optimizer.convergence.best)
+        self.assertTrue(optimizer.sheets)
+        self.assertEqual(len(optimizer.island_stats), 2)
+        for stat in optimizer.island_stats:
+            self.assertEqual(stat['generations'], 6)
+            self.assertEqual(len(stat['best_history']), 6)
+            self.assertEqual(stat['immigrants'], 3)
+
+    def test_islands_respect_rotation_policies(self):
+        # 岛屿进程各自构建缓存，必须沿用零件的旋转策略
+        optimizer = make_optimizer(mixed_parts(), 500, 400,
+                                   rotation=['flip', 'fixed', 'ortho', 'flip'])
+        solution = optimizer.genetic_algorithm(population_size=8, generations=4, islands=2,
+                                               migration_interval=2, seed=5)
+        assert_valid_layout(self, optimizer, solution)
+        self.assertAlmostEqual(optimizer.fitness(solution), optimizer.convergence.best)
+
+    def test_seeded_runs_are_reproducible(self):
+        runs = []
+        for _ in range(2):
+            optimizer = make_optimizer()
+            runs.append(optimizer.genetic_algorithm(population_size=12, generations=4,
+                                                    islands=3, migration_interval=2, seed=11))
+        self.assertEqual(runs[0], runs[1])
+
+    def test_stall_stops_all_islands(self):
+        optimizer = make_optimizer()
+        optimizer.genetic_algorithm(population_size=12, generations=200, islands=2,
+                                    migration_interval=5, stall_generations=3, seed=1)
+        self.assertEqual(optimizer.convergence.stop_reason, 'stall')
+        self.assertLess(optimizer.island_stats[0]['generations'], 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
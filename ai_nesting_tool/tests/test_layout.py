@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.affinity import rotate, translate
+from shapely.geometry import Point, box
+
+from src.nesting_optimizer import NestingOptimizer
+from src.parts import PartLibrary
+
+
+def _main_polylines(parts):
+    """与 parse_dxf 相同结构的主轮廓列表，每个零件带一个圆孔"""
+    result = []
+    for part_id, part in enumerate(parts):
+        minx, miny, _, _ = part.bounds
+        center = (minx + 10 + part_id, miny + 10)
+        result.append({
+            'part_id': part_id,
+            'polygon': part,
+            'children': [{'type': 'circle', 'center': center, 'radius': 3,
+                          'polygon': Point(center).buffer(3)}],
+        })
+    return result
+
+
+class TestLayoutSheets(unittest.TestCase):
+    def test_duplicate_outlines_keep_their_own_children(self):
+        # 三个完全相同的外轮廓，子实体不同
+        parts = [box(0, 0, 100, 50)] * 3
+        optimizer = NestingOptimizer((parts, _main_polylines(parts)), 600, 400, max_sheets=2)
+        optimizer._layout_sheets([(0, 0, 0, 0), (0, 100, 0, 0), (0, 200, 0, 1)])
+
+        entities = [e for sheet in optimizer.transformed_entities.values() for e in sheet]
+        self.assertEqual(sorted(e['part_id'] for e in entities), [0, 1, 2])
+        for entity in entities:
+            self.assertEqual(len(entity['children']), 1)
+            cx, _ = entity['children'][0]['center']
+            self.assertAlmostEqual(cx, 10 + entity['part_id'])
+        self.assertEqual(len(optimizer.transformed_entities[0]), 2)
+        self.assertEqual(len(optimizer.transformed_entities[1]), 1)
+
+    def test_children_rotate_about_parent_centroid(self):
+        part = box(0, 0, 100, 50)
+        hole = box(70, 20, 90, 30)
+        main_polylines = [{'part_id': 0, 'polygon': part, 'children': [
+            {'type': 'circle', 'center': (10, 10), 'radius': 3, 'polygon': Point(10, 10).buffer(3)},
+            {'type': 'polyline', 'polygon': hole},
+        ]}]
+        optimizer = NestingOptimizer(([part], main_polylines), 600, 400, max_sheets=1)
+        optimizer._layout_sheets([(5, 7, 90, 0)])
+
+        entity = optimizer.transformed_entities[0][0]
+        expected_part = translate(rotate(part, 90, origin=(50, 25)), 5, 7)
+        self.assertLess(entity['main'].symmetric_difference(expected_part).area, 1e-6)
+        circle, polyline = entity['children']
+        # 圆心 (10, 10) 绕零件质心 (50, 25) 旋转 90 度为 (65, -15)，再平移 (5, 7)
+        self.assertAlmostEqual(circle['center'][0], 70)
+        self.assertAlmostEqual(circle['center'][1], -8)
+        self.assertAlmostEqual(circle['polygon'].centroid.x, 70)
+        expected_hole = translate(rotate(hole, 90, origin=(50, 25)), 5, 7)
+        self.assertLess(polyline['polygon'].symmetric_difference(expected_hole).area, 1e-6)
+        self.assertTrue(expected_part.contains(polyline['polygon']))
+
+    def test_part_ids_follow_quantities(self):
+        library = PartLibrary([box(0, 0, 10, 10), box(0, 0, 20, 10)], quantities=[2, 3])
+        optimizer = NestingOptimizer(library, 600, 400)
+        self.assertEqual(optimizer.part_ids, [0, 0, 1, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src.engines import AnnealingEngine, CompactionEngine
+from src.manifest import RunManifest, solution_hash
+from src.nesting_optimizer import NestingOptimizer
+
+
+class TestSeedingAndManifest(unittest.TestCase):
+    def setUp(self):
+        self.parts = [box(0, 0, 100, 50), box(0, 0, 80, 80), box(10, 10, 70, 40)]
+
+    def _optimizer(self, parts=None, **kwargs):
+        return NestingOptimizer(parts or self.parts, 600, 400, max_sheets=2, **kwargs)
+
+    def test_seeded_runs_are_identical(self):
+        runs = [
+            lambda o: o.genetic_algorithm(population_size=12, generations=3, seed=4),
+            lambda o: o.genetic_algorithm(population_size=12, generations=3, incremental=True,
+                                          seed=4),
+            lambda o: o.genetic_algorithm(population_size=8, generations=3, decoder='skyline',
+                                          seed=4),
+            lambda o: o.optimize('anneal', iterations=30, seed=4),
+        ]
+        for run in runs:
+            self.assertEqual(run(self._optimizer()), run(self._optimizer()))
+
+        single = [self._optimizer([box(0, 0, 50, 50)]).genetic_algorithm(seed=8)
+                  for _ in range(2)]
+        self.assertEqual(single[0], single[1])
+
+    def test_constructor_seed_is_default(self):
+        a = self._optimizer(seed=21).genetic_algorithm(population_size=12, generations=2)
+        b = self._optimizer().genetic_algorithm(population_size=12, generations=2, seed=21)
+        self.assertEqual(a, b)
+
+    def test_manifest_written_and_replayed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            optimizer = self._optimizer(manifest_dir=tmp)
+            solution = optimizer.genetic_algorithm(population_size=12, generations=4)
+            files = os.listdir(tmp)
+            self.assertEqual(len(files), 1)
+            manifest = RunManifest.load(os.path.join(tmp, files[0]))
+
+        data = manifest.data
+        self.assertIsInstance(manifest.seed, int)
+        self.assertEqual(data['method'], 'genetic_algorithm')
+        self.assertEqual(data['params']['generations'], 4)
+        self.assertEqual(len(data['history']), 4)
+        self.assertEqual(len(data['parts']), 3)
+        self.assertGreaterEqual(data['wall_time'], 0)
+        self.assertEqual(data['solution_hash'], solution_hash(solution))
+
+        replayed = self._optimizer().replay(manifest)
+        self.assertEqual(solution_hash(replayed), data['solution_hash'])
+
+    def test_replay_in_same_second_keeps_both_manifests(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            optimizer = self._optimizer(manifest_dir=tmp)
+            optimizer.genetic_algorithm(population_size=12, generations=2, seed=8)
+            manifest = RunManifest.load(os.path.join(tmp, os.listdir(tmp)[0]))
+            optimizer.replay(manifest)
+            # 同一时间戳、同一种子再写一次，也不应覆盖已有文件
+            manifest.save(tmp)
+            self.assertEqual(len(os.listdir(tmp)), 3)
+
+    def test_nested_runs_write_one_manifest(self):
+        optimizer = self._optimizer()
+        optimizer.optimize('ga', population_size=12, generations=2, seed=5)
+        self.assertEqual(optimizer.manifest.data['method'], 'optimize')
+        self.assertEqual(optimizer.manifest.seed, 5)
+        self.assertEqual(len(optimizer.manifest.data['history']), 2)
+
+    def test_engine_instance_is_recorded(self):
+        optimizer = self._optimizer(seed=99)
+        solution = optimizer.optimize(AnnealingEngine(iterations=30, seed=2))
+        manifest = optimizer.manifest
+        # 记录的是实例的名称、构造参数与它实际使用的种子
+        self.assertEqual(manifest.seed, 2)
+        self.assertEqual(manifest.params['engine'], 'anneal')
+        self.assertEqual(manifest.params['iterations'], 30)
+        loaded = RunManifest(json.loads(json.dumps(manifest.data)))
+        self.assertEqual(self._optimizer().replay(loaded), solution)
+        self.assertEqual(self._optimizer().optimize('anneal', iterations=30, seed=2), solution)
+
+        optimizer.optimize('compact', base=AnnealingEngine(iterations=20, seed=3), seed=1)
+        base = optimizer.manifest.params['base']
+        self.assertEqual((base['name'], base['seed'], base['iterations']), ('anneal', 3, 20))
+        self.assertEqual(self._optimizer().replay(optimizer.manifest),
+                         self._optimizer().optimize(CompactionEngine(
+                             base=AnnealingEngine(iterations=20, seed=3)), seed=1))
+
+    def test_unregistered_engine_is_rejected(self):
+        class Custom(CompactionEngine):
+            pass
+
+        with self.assertRaises(ValueError):
+            self._optimizer().optimize(Custom())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import Polygon, box
+
+from src.nfp import NFPEngine, minkowski_sum
+from tests.helpers import assert_valid_layout, l_shape, make_optimizer
+
+
+class TestNFP(unittest.TestCase):
+    def test_square_nfp(self):
+        engine = NFPEngine([box(0, 0, 1, 1), box(5, 5, 6, 6)], 10, 10, spacing=0)
+        nfp = engine.nfp(0, 0, 1, 0)
+        self.assertAlmostEqual(nfp.area, 4.0)
+        self.assertTrue(nfp.equals(box(-1, -1, 1, 1)))
+
+    def test_concave_minkowski(self):
+        result = minkowski_sum(l_shape(4, 1), box(0, 0, 1, 1))
+        expected = Polygon([(0, 0), (5, 0), (5, 2), (2, 2), (2, 5), (0, 5)])
+        self.assertAlmostEqual(result.symmetric_difference(expected).area, 0.0)
+
+    def test_placement_is_feasible(self):
+        parts = [l_shape(40, 10), box(0, 0, 30, 20), box(0, 0, 25, 25), l_shape(40, 10),
+                 box(0, 0, 60, 15)]
+        optimizer = make_optimizer(parts, 100, 60, max_sheets=10)
+        solution = optimizer.nfp_placement()
+        assert_valid_layout(self, optimizer, solution)
+
+    def test_placement_inside_remnant_outline(self):
+        # 500×500 的 L 形余料在前，之后是较小的标准板；NFP 放置不能按最大板尺寸越界
+        remnant = l_shape(500, 200)
+        triangle = Polygon([(0, 0), (150, 0), (40, 120)])
+        parts = [box(0, 0, 180, 120), triangle, box(0, 0, 250, 90), triangle,
+                 box(0, 0, 120, 120), box(0, 0, 160, 60)] * 2
+        sheets = [remnant, (400, 300), (400, 300), (700, 300)]
+        for placement in ('nfp_placement', 'decoder'):
+            optimizer = make_optimizer(parts, 700, 500, sheets=sheets, spacing=2.0)
+            if placement == 'nfp_placement':
+                solution = optimizer.nfp_placement()
+            else:
+                solution = optimizer.genetic_algorithm(population_size=6, generations=2,
+                                                       decoder='nfp', seed=1)
+            assert_valid_layout(self, optimizer, solution, placement)
+            self.assertIn(0, [gene[3] for gene in solution], placement)
+            self.assertGreater(optimizer.fitness(solution), 0.0, placement)
+
+    def test_disk_cache(self):
+        parts = [box(0, 0, 2, 1), Polygon([(0, 0), (3, 0), (0, 3)])]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = NFPEngine(parts, 10, 10, cache_dir=cache_dir).nfp(0, 90, 1, 0)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            second = NFPEngine(parts, 10, 10, cache_dir=cache_dir).nfp(0, 90, 1, 0)
+            self.assertTrue(first.equals(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
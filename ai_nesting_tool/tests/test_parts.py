@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.affinity import rotate, translate
+from shapely.geometry import Polygon, box
+
+from src.nesting_optimizer import NestingOptimizer
+from src.parts import PartLibrary, canonical_form
+
+
+L_SHAPE = Polygon([(0, 0), (60, 0), (60, 20), (20, 20), (20, 50), (0, 50)])
+
+
+class TestPartLibrary(unittest.TestCase):
+    def test_hash_ignores_translation_and_rotation(self):
+        key = canonical_form(L_SHAPE)[0]
+        for angle in (0, 37, 90, 180, 271.5):
+            moved = translate(rotate(L_SHAPE, angle, origin='centroid'), 123.4, -56.7)
+            self.assertEqual(canonical_form(moved)[0], key)
+        # 镜像与不同尺寸不是同一形状
+        mirrored = Polygon([(-x, y) for x, y in L_SHAPE.exterior.coords])
+        self.assertNotEqual(canonical_form(mirrored)[0], key)
+        self.assertNotEqual(canonical_form(box(0, 0, 60, 50))[0], key)
+
+    def test_canonical_angle_restores_part(self):
+        moved = translate(rotate(L_SHAPE, 37, origin='centroid'), 10, 20)
+        _, canonical, angle = canonical_form(moved)
+        c = moved.centroid
+        restored = translate(rotate(canonical, -angle, origin=(0, 0)), c.x, c.y)
+        self.assertLess(restored.symmetric_difference(moved).area, 1e-6)
+
+    def test_quantities_share_records(self):
+        library = PartLibrary.from_quantities([(L_SHAPE, 200), (box(0, 0, 30, 30), 3)])
+        self.assertEqual(len(library), 203)
+        self.assertEqual(len(library.shapes), 2)
+        self.assertEqual([s.quantity for s in library.shapes], [200, 3])
+        self.assertAlmostEqual(library.total_area, 200 * L_SHAPE.area + 3 * 900)
+
+        copies = [translate(rotate(L_SHAPE, a, origin='centroid'), 100 * i, 0)
+                  for i, a in enumerate((0, 90, 0, 45))]
+        library = PartLibrary(copies)
+        self.assertEqual(len(library.shapes), 1)
+        self.assertEqual(library.shapes[0].quantity, 4)
+
+    def test_geometry_and_nfp_computed_once_per_shape(self):
+        library = PartLibrary.from_quantities([(L_SHAPE, 50)])
+        optimizer = NestingOptimizer(library, 600, 400, max_sheets=2, angle_step=90)
+        cache = optimizer.geometry_cache
+        for i in range(50):
+            cache.get(i, 90)
+        self.assertEqual(cache.cache.stats()['size'], 1)
+
+        engine = optimizer.nfp_engine
+        for i in range(1, 10):
+            engine.nfp(0, 0, i, 90)
+        self.assertEqual(engine.cache.stats()['size'], 1)
+
+    def test_placed_copies_match_rotated_originals(self):
+        parts = [translate(rotate(L_SHAPE, a, origin='centroid'), 100 * i, 50)
+                 for i, a in enumerate((0, 33, 90))]
+        optimizer = NestingOptimizer(parts, 600, 400)
+        for i, part in enumerate(parts):
+            expected = translate(rotate(part, 15, origin='centroid'), 5, 7)
+            placed = optimizer.geometry_cache.place(i, 15, 5, 7)
+            self.assertLess(placed.symmetric_difference(expected).area, 1e-6)
+
+
+if __name__ == '__main__':
+    unittest.main()
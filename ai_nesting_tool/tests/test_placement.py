@@ -0,0 +1,47 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src.placement import order_crossover
+from tests.helpers import assert_valid_layout, l_shape, make_optimizer, triangle
+
+
+class TestPlacement(unittest.TestCase):
+    def setUp(self):
+        self.parts = [l_shape(80, 20) if i % 3 == 0
+                      else box(0, 0, 30 + i % 7 * 10, 20 + i % 5 * 10) for i in range(40)]
+        self.optimizer = make_optimizer(self.parts, 300, 300, max_sheets=10)
+
+    def test_any_chromosome_decodes_to_valid_layout(self):
+        solution = self.optimizer.genetic_algorithm(population_size=10, generations=3,
+                                                    decoder='skyline', seed=3)
+        assert_valid_layout(self, self.optimizer, solution)
+        self.assertGreater(len(self.optimizer.sheets), 1)
+
+    def test_decoder_stays_inside_remnant_outline(self):
+        # 包围盒放得下但压到 L 形余料缺口的位置必须跳过
+        remnant = l_shape(400, 150)
+        parts = [box(0, 0, 120, 100), triangle(140), box(0, 0, 200, 80), triangle(100),
+                 box(0, 0, 90, 90)] * 2
+        for placer in ('skyline', 'nfp'):
+            optimizer = make_optimizer(parts, 500, 300, sheets=[remnant, (500, 300), (500, 300)])
+            solution = optimizer.genetic_algorithm(population_size=6, generations=2,
+                                                   decoder=placer, seed=2)
+            assert_valid_layout(self, optimizer, solution, placer)
+            self.assertIn(0, [gene[3] for gene in solution], placer)
+
+    def test_order_crossover_is_permutation(self):
+        rng = random.Random(0)
+        p1 = list(range(20))
+        p2 = rng.sample(p1, 20)
+        for _ in range(50):
+            self.assertEqual(sorted(order_crossover(p1, p2, rng)), p1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.population import Population, sparse_variation, truncation_select, uniform_crossover
+
+
+class TestPopulation(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.population = Population.random(self.rng, 8, 5, 500, 300, 3, angle_step=90)
+
+    def test_array_round_trip(self):
+        arr = self.population.as_array()
+        self.assertEqual(arr.shape, (8, 5, 4))
+        restored = Population.from_array(arr)
+        np.testing.assert_array_equal(restored.as_array(), arr)
+        first = self.population.individual(0)
+        self.assertEqual(len(first), 5)
+        self.assertIsInstance(first[0][3], int)
+
+    def test_random_bounds(self):
+        p = self.population
+        self.assertTrue((p.positions[..., 0] <= 400).all() and (p.positions[..., 1] <= 240).all())
+        self.assertTrue(np.isin(p.angles, (0, 90, 180, 270)).all())
+        self.assertTrue(((p.sheets >= 0) & (p.sheets < 3)).all())
+
+    def test_truncation_select(self):
+        np.testing.assert_array_equal(truncation_select([0.1, 0.5, 0.5, 0.2], 3), [1, 2, 3])
+
+    def test_uniform_crossover_keeps_discrete_angles(self):
+        children = uniform_crossover(self.rng, self.population, 12, angle_step=90)
+        self.assertEqual(len(children), 12)
+        self.assertTrue(np.isin(children.angles, (0, 90, 180, 270)).all())
+
+    def test_sparse_variation_changes_few_genes(self):
+        children, origin = sparse_variation(self.rng, self.population, 10, 1)
+        parents = self.population.as_array()[origin]
+        changed = (children.as_array() != parents).any(axis=2).sum(axis=1)
+        self.assertTrue((changed <= 1).all())
+
+    def test_seed_reproducible(self):
+        a = uniform_crossover(np.random.default_rng(3), self.population, 6)
+        b = uniform_crossover(np.random.default_rng(3), self.population, 6)
+        np.testing.assert_array_equal(a.as_array(), b.as_array())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import box
+
+from src import profiling
+from src.collision import has_overlap
+from src.nesting_optimizer import NestingOptimizer
+from src.pipeline import run_pipeline
+from src.profiling import PipelineProfiler
+
+EXAMPLE_DXF = os.path.join(os.path.dirname(__file__), '..', 'examples', 'parts.dxf')
+
+
+class TestPipelineProfiler(unittest.TestCase):
+    def test_stage_counters(self):
+        profiler = PipelineProfiler(job='unit')
+        geoms = [box(0, 0, 10, 10), box(5, 5, 15, 15), box(30, 30, 40, 40)]
+        with profiler.stage('overlap'):
+            self.assertTrue(has_overlap(geoms))
+            profiler.count('custom', 3)
+        # 阶段之外的计数被忽略
+        has_overlap(geoms)
+        profiling.count('custom')
+
+        stage = profiler.stages[0]
+        self.assertEqual(stage['name'], 'overlap')
+        self.assertEqual(stage['counters'], {'intersects': 1, 'custom': 3})
+        self.assertGreaterEqual(stage['wall_time'], 0.0)
+        self.assertNotIn('profile', stage)
+        self.assertNotIn('peak_memory', stage)
+
+    def test_profile_and_memory(self):
+        profiler = PipelineProfiler(profile=True, trace_memory=True, top=5)
+        with profiler.stage('alloc'):
+            data = [list(range(1000)) for _ in range(50)]
+        stage = profiler.stages[0]
+        self.assertGreater(stage['peak_memory'], 0)
+        self.assertLessEqual(len(stage['profile']), 5)
+        del data
+
+    def test_failed_stage_is_recorded(self):
+        profiler = PipelineProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.stage('broken'):
+                raise ValueError("bad dxf")
+        self.assertIn('bad dxf', profiler.stages[0]['error'])
+        self.assertIsNone(profiling._active)
+
+    def test_pipeline_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = PipelineProfiler(job='parts.dxf')
+            with contextlib.redirect_stdout(io.StringIO()):
+                optimizer, gcode_path, threejs_path = run_pipeline(
+                    EXAMPLE_DXF, profiler=profiler, gcode_path=os.path.join(tmp, 'out.nc'),
+                    output_dir=tmp, manifest_dir=tmp)
+            stages = {s['name']: s for s in profiler.stages}
+            self.assertEqual(list(stages), ['parse', 'nest', 'gcode', 'export_3d'])
+            self.assertEqual(stages['parse']['counters']['parts'], len(optimizer.parts))
+            self.assertGreater(stages['parse']['counters']['vertices'], 0)
+            self.assertEqual(stages['nest']['counters']['fitness_evals'], optimizer.evaluations)
+            self.assertEqual(stages['gcode']['counters']['bytes_written'],
+                             os.path.getsize(gcode_path))
+            self.assertEqual(stages['export_3d']['counters']['bytes_written'],
+                             os.path.getsize(threejs_path))
+
+            with open(profiler.save(tmp), encoding='utf-8') as f:
+                report = json.load(f)
+            self.assertEqual(report['job'], 'parts.dxf')
+            self.assertEqual(len(report['stages']), 4)
+
+    def test_reports_do_not_overwrite(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = {PipelineProfiler(job='parts.dxf').save(tmp) for _ in range(3)}
+            self.assertEqual(len(paths), 3)
+            self.assertEqual(len(os.listdir(tmp)), 3)
+            self.assertTrue(all('parts.dxf' in os.path.basename(p) for p in paths))
+
+    def test_worker_counters_are_merged(self):
+        parts = [box(0, 0, 100, 50), box(0, 0, 80, 80), box(10, 10, 70, 40)]
+        counters = {}
+        for mode, options in (('serial', {}), ('pool', {'workers': 2}),
+                              ('islands', {'islands': 2, 'migration_interval': 2})):
+            profiler = PipelineProfiler()
+            with profiler.stage('nest'):
+                optimizer = NestingOptimizer(parts, 600, 400, max_sheets=2)
+                optimizer.genetic_algorithm(population_size=12, generations=4, seed=6,
+                                            **options)
+            counters[mode] = profiler.stages[0]['counters']
+            self.assertGreater(counters[mode].get('vertices', 0), 0, mode)
+        # 并行评估与串行评估的是同样的个体，计数一致
+        self.assertEqual(counters['serial'], counters['pool'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import shapely
+from shapely.affinity import rotate
+from shapely.geometry import Polygon, box
+
+from src.nesting_optimizer import NestingOptimizer
+from src.rectpack import is_rectangle, pack_rectangles, rectangle_indices
+from src.sheets import SheetSet
+
+
+def _guillotine_cuttable(rects, x0, y0, x1, y1):
+    """矩形集合能否由贯穿的直线逐刀切开"""
+    if len(rects) <= 1:
+        return True
+    for axis in (0, 1):
+        lo, hi = (x0, x1) if axis == 0 else (y0, y1)
+        for cut in sorted({r[axis + 2] for r in rects}):
+            if not lo < cut < hi:
+                continue
+            first = [r for r in rects if r[axis + 2] <= cut + 1e-9]
+            second = [r for r in rects if r[axis] >= cut - 1e-9]
+            if len(first) + len(second) == len(rects) and first and second:
+                if axis == 0:
+                    return (_guillotine_cuttable(first, x0, y0, cut, y1)
+                            and _guillotine_cuttable(second, cut, y0, x1, y1))
+                return (_guillotine_cuttable(first, x0, y0, x1, cut)
+                        and _guillotine_cuttable(second, x0, cut, x1, y1))
+    return False
+
+
+class TestRectangleDetection(unittest.TestCase):
+    def test_is_rectangle(self):
+        self.assertTrue(is_rectangle(box(10, 20, 110, 70)))
+        # 带内孔的矩形板仍按矩形排样
+        self.assertTrue(is_rectangle(box(0, 0, 100, 100).difference(box(40, 40, 60, 60))))
+        self.assertFalse(is_rectangle(rotate(box(0, 0, 100, 50), 30)))
+        self.assertFalse(is_rectangle(Polygon([(0, 0), (100, 0), (100, 50), (50, 50),
+                                               (50, 100), (0, 100)])))
+        parts = [box(0, 0, 10, 10), Polygon([(0, 0), (10, 0), (5, 8)]), box(0, 0, 5, 20)]
+        self.assertEqual(rectangle_indices(parts), [0, 2])
+
+
+class TestPackRectangles(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.sizes = [(float(rng.uniform(20, 300)), float(rng.uniform(20, 200)))
+                      for _ in range(200)]
+        self.sheets = SheetSet.uniform(1000, 600, 20)
+
+    def _placed(self, placements, spacing=0.0):
+        boxes = {}
+        for (w, h), (k, x, y, rotated) in zip(self.sizes, placements):
+            if rotated:
+                w, h = h, w
+            boxes.setdefault(k, []).append((x, y, x + w, y + h))
+        for k, rects in boxes.items():
+            sheet = self.sheets[k]
+            for x0, y0, x1, y1 in rects:
+                self.assertGreaterEqual(x0, -1e-9)
+                self.assertGreaterEqual(y0, -1e-9)
+                self.assertLessEqual(x1, sheet.width + 1e-9)
+                self.assertLessEqual(y1, sheet.height + 1e-9)
+            geoms = np.array([box(*r) for r in rects], dtype=object)
+            left, right = np.triu_indices(len(geoms), k=1)
+            gaps = shapely.distance(geoms[left], geoms[right])
+            self.assertGreaterEqual(gaps.min(initial=np.inf), spacing - 1e-6)
+        return boxes
+
+    def test_maxrects_packs_without_overlap(self):
+        placements = pack_rectangles(self.sizes, self.sheets, spacing=2.0)
+        boxes = self._placed(placements, spacing=2.0)
+        # 利用率高于 80%：用板数接近面积下限
+        area = sum(w * h for w, h in self.sizes)
+        self.assertLessEqual(len(boxes), int(np.ceil(area / (1000 * 600) / 0.8)))
+
+    def test_guillotine_layout_is_cuttable(self):
+        placements = pack_rectangles(self.sizes, self.sheets, guillotine=True)
+        for rects in self._placed(placements).values():
+            self.assertTrue(_guillotine_cuttable(rects, 0, 0, 1000, 600))
+
+    def test_obstacles_and_rotation(self):
+        placements = pack_rectangles([(500, 100)], SheetSet.uniform(200, 600, 2),
+                                     obstacles={0: [(0, 0, 150, 600)]})
+        self.assertEqual(placements, [(1, 0.0, 0.0, True)])
+        with self.assertRaises(ValueError):
+            pack_rectangles([(500, 100)], SheetSet.uniform(200, 600, 1), rotate=False)
+
+
+class TestRectanglePackingEngine(unittest.TestCase):
+    def test_auto_routes_rectangles(self):
+        rng = np.random.default_rng(5)
+        parts = [box(0, 0, rng.uniform(30, 200), rng.uniform(30, 150)) for _ in range(60)]
+        optimizer = NestingOptimizer(parts, 800, 600, max_sheets=10, spacing=1.0)
+        solution = optimizer.optimize(seed=1)
+        self.assertGreater(optimizer.fitness(solution), 0.0)
+        self.assertEqual(optimizer.manifest.params['engine'], 'auto')
+
+        compact = NestingOptimizer(parts, 800, 600, max_sheets=10, spacing=1.0)
+        compact.optimize('compact', seed=1)
+        self.assertLessEqual(len(optimizer.sheets), len(compact.sheets))
+
+    def test_mixed_job(self):
+        triangles = [Polygon([(0, 0), (120, 0), (60, 90)]) for _ in range(3)]
+        panels = [box(0, 0, 100, 60) for _ in range(12)]
+        for guillotine in (False, True):
+            optimizer = NestingOptimizer(triangles + panels, 600, 400, max_sheets=4)
+            solution = optimizer.optimize('rects', guillotine=guillotine, base='compact',
+                                          seed=2)
+            self.assertGreater(optimizer.fitness(solution), 0.0)
+            # 两种模式都在不规则零件所在的板材上继续填充，整个任务只用一张板
+            self.assertEqual({gene[3] for gene in solution}, {0})
+            if guillotine:
+                rects = [optimizer.geometry_cache.place(i, a, x, y).bounds
+                         for i, (x, y, a, _) in enumerate(solution) if i >= 3]
+                tri = [optimizer.geometry_cache.place(i, a, x, y).bounds
+                       for i, (x, y, a, _) in enumerate(solution) if i < 3]
+                corner = (0.0, 0.0, max(b[2] for b in tri), max(b[3] for b in tri))
+                self.assertTrue(_guillotine_cuttable([corner] + rects, 0, 0, 600, 400))
+
+    def test_opens_extra_sheets(self):
+        # 面板需要的板数超过 max_sheets 时与天际线、NFP 放置一样开新的默认尺寸板
+        panels = [box(0, 0, 400, 400) for _ in range(60)]
+        for guillotine in (False, True):
+            optimizer = NestingOptimizer(panels, 1000, 1000, max_sheets=2)
+            solution = optimizer.optimize('rects', guillotine=guillotine, seed=1)
+            self.assertEqual(len(optimizer.sheets), 15)
+            self.assertEqual(len(optimizer.sheet_set), 15)
+            self.assertAlmostEqual(optimizer.fitness(solution), 0.64)
+
+        sizes = [(400, 400)] * 5
+        placements = pack_rectangles(sizes, SheetSet.uniform(1000, 1000, 1),
+                                     extra_sheet=(500, 500))
+        self.assertEqual([p[0] for p in placements], [0, 0, 0, 0, 1])
+
+    def test_irregular_sheets_are_compacted(self):
+        # 遗传算法可能把不规则零件放在任意编号的板材上，矩形不能因此跳过前面的空板
+        triangles = [Polygon([(0, 0), (120, 0), (60, 90)])]
+        panels = [box(0, 0, 100, 60) for _ in range(12)]
+        for guillotine in (False, True):
+            optimizer = NestingOptimizer(triangles + panels, 600, 400, max_sheets=8)
+            solution = optimizer.optimize('rects', guillotine=guillotine, base='ga',
+                                          population_size=10, generations=2, seed=3)
+            self.assertGreater(optimizer.fitness(solution), 0.0)
+            self.assertEqual({gene[3] for gene in solution}, {0})
+
+    def test_rectangles_without_axis_angles(self):
+        # 只允许 45/135 度的矩形无法轴对齐装箱，交给 base 引擎按不规则零件处理
+        parts = [box(0, 0, 80, 40), box(0, 0, 60, 60), box(0, 0, 50, 30)]
+        optimizer = NestingOptimizer(parts, 600, 400, max_sheets=2,
+                                     rotation=[[45, 135], 'free', 'flip'])
+        solution = optimizer.optimize('rects', base='compact', seed=1)
+        self.assertGreater(optimizer.fitness(solution), 0.0)
+        self.assertIn(solution[0][2] % 360, (45.0, 135.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from src.dxf_parser import parse_dxf
+from src.nesting_optimizer import NestingOptimizer
+from src.rotation import RotationSet, policy_angles, policy_from_layer
+from src.synthetic import generate_dxf
+from tests.helpers import assert_valid_layout, make_optimizer, mixed_parts
+
+
+class TestRotationPolicies(unittest.TestCase):
+    def test_policies_from_layer(self):
+        self.assertEqual(policy_from_layer('110OO'), 'free')
+        self.assertEqual(policy_from_layer('110OO_GRAIN'), 'flip')
+        self.assertEqual(policy_from_layer('110oo-fixed'), 'fixed')
+        self.assertEqual(policy_from_layer('PANEL R90'), 'ortho')
+        self.assertEqual(policy_from_layer('PANEL', default='fixed'), 'fixed')
+        self.assertEqual(policy_angles([270, -90, 90]), (90.0, 270.0))
+        with self.assertRaises(ValueError):
+            policy_angles('sideways')
+
+    def test_constrain(self):
+        rotations = RotationSet(['free', 'flip', 'fixed', [45, 135]])
+        angles = np.array([[10.0, 170.0, 93.0, 100.0], [359.0, 271.0, 200.0, 40.0]])
+        rng = np.random.default_rng(0)
+        snapped = rotations.constrain(rng, angles, jump_rate=0.0)
+        np.testing.assert_allclose(snapped, [[10.0, 180.0, 0.0, 135.0], [359.0, 0.0, 0.0, 45.0]])
+        jumped = rotations.constrain(rng, np.zeros((500, 4)), jump_rate=1.0)
+        self.assertEqual(set(jumped[:, 1]), {0.0, 180.0})
+        self.assertEqual(set(jumped[:, 3]), {45.0, 135.0})
+        self.assertEqual(rotations.choices_for(1, (0, 90, 180, 270)), (0, 180))
+        self.assertEqual(rotations.choices_for(3, (0, 90)), (45.0, 135.0))
+
+        # 全部不受约束时原样返回且不消耗随机数
+        free = RotationSet.uniform('free', 4)
+        rng_a, rng_b = np.random.default_rng(1), np.random.default_rng(1)
+        self.assertIs(free.constrain(rng_a, angles), angles)
+        self.assertEqual(rng_a.random(), rng_b.random())
+
+
+class TestConstrainedSearch(unittest.TestCase):
+    def setUp(self):
+        self.parts = mixed_parts()
+
+    def _angles(self, solution):
+        return [round(gene[2] % 360.0, 6) for gene in solution]
+
+    def test_ga_paths_respect_policies(self):
+        runs = {
+            'ga': {'population_size': 12, 'generations': 4},
+            'parallel': {'population_size': 12, 'generations': 4, 'workers': 2},
+            'incremental': {'population_size': 12, 'generations': 4, 'incremental': True},
+            'decoder': {'population_size': 8, 'generations': 3, 'decoder': 'skyline'},
+            'islands': {'population_size': 8, 'generations': 4, 'islands': 2,
+                        'migration_interval': 2},
+        }
+        solutions = {}
+        for name, options in runs.items():
+            optimizer = make_optimizer(self.parts, 500, 400,
+                                       rotation=['flip', 'fixed', 'ortho', 'flip'])
+            solution = optimizer.genetic_algorithm(seed=3, **options)
+            assert_valid_layout(self, optimizer, solution, name)
+            solutions[name] = solution
+            angles = self._angles(solution)
+            self.assertIn(angles[0], (0.0, 180.0), name)
+            self.assertEqual(angles[1], 0.0, name)
+            self.assertIn(angles[2], (0.0, 90.0, 180.0, 270.0), name)
+            self.assertIn(angles[3], (0.0, 180.0), name)
+        # 工作进程按同样的策略取角度，并行结果与串行一致
+        self.assertEqual(solutions['parallel'], solutions['ga'])
+
+    def test_engines_and_cache(self):
+        for engine in ('anneal', 'compact', 'rects'):
+            optimizer = make_optimizer(self.parts, 500, 400, rotation='fixed')
+            solution = optimizer.optimize(engine, iterations=20, seed=1) if engine == 'anneal' \
+                else optimizer.optimize(engine, seed=1)
+            assert_valid_layout(self, optimizer, solution, engine)
+            self.assertEqual(set(self._angles(solution)), {0.0}, engine)
+            self.assertGreater(optimizer.fitness(solution), 0.0)
+
+        optimizer = make_optimizer(self.parts, 500, 400, rotation='flip')
+        optimizer.genetic_algorithm(population_size=20, generations=5, seed=4)
+        # 每种形状最多缓存两个角度
+        self.assertLessEqual(len(optimizer.geometry_cache.cache), 2 * len(self.parts))
+        self.assertEqual(optimizer.geometry_cache.quantize(93.0, 0), 180.0)
+
+        solution = optimizer.nfp_placement()
+        assert_valid_layout(self, optimizer, solution)
+        self.assertTrue(set(self._angles(solution)) <= {0.0, 180.0})
+
+    def test_policies_from_dxf(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = generate_dxf(os.path.join(tmp, 'grain.dxf'), 6, vertices=5, seed=1,
+                                rotation='flip')
+            with contextlib.redirect_stdout(io.StringIO()):
+                parts_data = parse_dxf(path)
+                overridden = parse_dxf(path, layer_policies={'110OO_FLIP': 'fixed'})
+        self.assertEqual({m['rotation'] for m in parts_data[1]}, {'flip'})
+        self.assertEqual({m['rotation'] for m in overridden[1]}, {'fixed'})
+
+        optimizer = NestingOptimizer(parts_data, 600, 400, max_sheets=2)
+        self.assertEqual(optimizer.rotation_set.policies, ['flip'] * 6)
+        solution = optimizer.genetic_algorithm(population_size=12, generations=3, seed=2)
+        self.assertTrue(set(self._angles(solution)) <= {0.0, 180.0})
+        self.assertEqual(optimizer.manifest.data['optimizer']['rotation'], ['flip'] * 6)
+        sub = optimizer.subset([0, 2])
+        self.assertEqual(sub.rotation_set.policies, ['flip', 'flip'])
+
+        with self.assertRaises(ValueError):
+            NestingOptimizer(self.parts, 500, 400, rotation=['free'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from shapely.geometry import Polygon, box
+
+from src.nesting_optimizer import NestingOptimizer
+from src.sheets import SheetSet, rectangle_sheet
+
+
+class TestSheets(unittest.TestCase):
+    def test_sheet_is_rectangle_not_circle(self):
+        optimizer = NestingOptimizer([box(0, 0, 100, 100), box(0, 0, 50, 50)], 1200, 1200)
+        # 右上角在旧的圆形边界之外，但在矩形板材之内
+        corner = [(1100, 1100, 0, 0), (0, 0, 0, 0)]
+        self.assertGreater(optimizer.fitness(corner), 0.0)
+        self.assertGreater(optimizer.fitness_batch([corner])[0], 0.0)
+        outside = [(1150, 0, 0, 0), (0, 0, 0, 0)]
+        self.assertEqual(optimizer.fitness(outside), 0.0)
+        self.assertEqual(optimizer.fitness_batch([outside])[0], 0.0)
+
+    def test_rectangle_sheets_are_shared(self):
+        self.assertIs(rectangle_sheet(600, 400), rectangle_sheet(600, 400))
+
+    def test_remnant_uses_polygon_test(self):
+        remnant = Polygon([(0, 0), (300, 0), (300, 100), (100, 100), (100, 300), (0, 300)])
+        sheet_set = SheetSet([(300, 300), remnant])
+        part = box(150, 150, 250, 250)
+        self.assertEqual(sheet_set.contains([part, part], [0, 1]).tolist(), [True, False])
+        self.assertEqual(sheet_set.contains([part], [5]).tolist(), [False])
+
+    def test_mixed_sheet_sizes(self):
+        parts = [box(0, 0, 100, 100), box(0, 0, 100, 100)]
+        optimizer = NestingOptimizer(parts, 0, 0, sheets=[(210, 100), (400, 400)])
+        on_small = [(0, 0, 0, 0), (105, 0, 0, 0)]
+        on_large = [(0, 0, 0, 1), (150, 0, 0, 1)]
+        self.assertAlmostEqual(optimizer.fitness(on_small), 20000 / 21000)
+        self.assertAlmostEqual(optimizer.fitness_batch([on_large])[0], 20000 / 160000)
+
+
+if __name__ == "__main__":
+    unittest.main()